@@ -1,3 +1,14 @@
 from django.contrib import admin
 
-# Register your models here.
+from gestion_papier_scolarite.utils.admin_utils import DemandeAdmin
+from .models import Attestation
+
+
+@admin.register(Attestation)
+class AttestationAdmin(DemandeAdmin):
+    type_demande = 'attestation'
+    champ_numero = 'id_attestation'
+    list_display = ('id_attestation', 'etudiant', 'type_attestation', 'quantite', 'total_paye', 'statut', 'date_demande', 'date_traitement')
+
+    def get_readonly_fields(self, request, obj=None):
+        return (*super().get_readonly_fields(request, obj), 'total_paye')
@@ -0,0 +1,15 @@
+# Attestation/filters.py
+
+import django_filters
+
+from gestion_papier_scolarite.utils.filters import DemandeFilterSet
+
+from .models import Attestation
+
+
+class AttestationFilterSet(DemandeFilterSet):
+    type_attestation = django_filters.ChoiceFilter(choices=Attestation.TYPE_ATTESTATION_CHOICES)
+
+    class Meta(DemandeFilterSet.Meta):
+        model = Attestation
+        fields = ['statut', 'type_attestation']
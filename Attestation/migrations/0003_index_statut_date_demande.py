@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Attestation', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attestation',
+            index=models.Index(fields=['statut', '-date_demande'], name='att_statut_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attestation',
+            index=models.Index(fields=['-date_demande'], name='att_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attestation',
+            index=models.Index(condition=models.Q(('statut__in', ['en_attente', 'en_cours'])), fields=['-date_demande'], name='att_ouvertes_date_idx'),
+        ),
+    ]
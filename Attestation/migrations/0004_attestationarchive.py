@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Attestation', '0003_index_statut_date_demande'),
+        ('api', '0004_password_reset_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttestationArchive',
+            fields=[
+                ('id_attestation', models.CharField(blank=True, editable=False, max_length=12, unique=True)),
+                ('type_attestation', models.CharField(choices=[('reussite', 'Attestation de Réussite'), ('inscription', 'Inscription'), ('langue', 'Langue Française d’Apprentissage'), ('duree', 'Durée de Formation'), ('fin_l3', 'Fin d’Études L3'), ('fin_m2', 'Fin d’Études M2')], max_length=20)),
+                ('annee_scolaire', models.CharField(blank=True, max_length=9, null=True)),
+                ('quantite', models.PositiveIntegerField(default=1)),
+                ('prix', models.DecimalField(decimal_places=2, default=3000.0, max_digits=10, verbose_name='Prix unitaire (Ariary)')),
+                ('total_paye', models.DecimalField(decimal_places=2, editable=False, max_digits=10)),
+                ('date_traitement', models.DateTimeField(blank=True, null=True)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('pret', 'Prêt à retirer')], default='en_attente', max_length=15)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_demande', models.DateTimeField()),
+                ('archive_le', models.DateTimeField(auto_now_add=True)),
+                ('etudiant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attestations_archives', to='api.etudiant')),
+            ],
+            options={
+                'verbose_name': 'Attestation archivée',
+                'ordering': ['-date_demande'],
+                'indexes': [models.Index(fields=['statut', '-date_demande'], name='att_arch_statut_date_idx'), models.Index(fields=['-date_demande'], name='att_arch_date_idx')],
+            },
+        ),
+    ]
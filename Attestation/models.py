@@ -1,9 +1,13 @@
 # attestation/models.py
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
+from gestion_papier_scolarite.utils.model_utils import ChangeTrackingMixin
 
 
-class Attestation(models.Model):
+class AttestationBase(models.Model):
+    """Champs communs aux attestations en cours (Attestation) et archivées"""
+
     TYPE_ATTESTATION_CHOICES = [
         ('reussite', 'Attestation de Réussite'),
         ('inscription', 'Inscription'),
@@ -14,7 +18,6 @@ class Attestation(models.Model):
     ]
 
     id_attestation = models.CharField(max_length=12, unique=True, editable=False, blank=True)
-    etudiant = models.ForeignKey('api.Etudiant', on_delete=models.CASCADE, related_name='attestations')
     type_attestation = models.CharField(max_length=20, choices=TYPE_ATTESTATION_CHOICES)
     annee_scolaire = models.CharField(max_length=9, blank=True, null=True)
 
@@ -27,7 +30,6 @@ class Attestation(models.Model):
     )
     total_paye = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
 
-    date_demande = models.DateTimeField(auto_now_add=True)
     date_traitement = models.DateTimeField(null=True, blank=True)
 
     STATUT_CHOICES = [
@@ -37,18 +39,57 @@ class Attestation(models.Model):
     ]
     statut = models.CharField(max_length=15, choices=STATUT_CHOICES, default='en_attente')
 
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.id_attestation} - {self.etudiant}"
+
+
+class Attestation(ChangeTrackingMixin, AttestationBase):
+    etudiant = models.ForeignKey('api.Etudiant', on_delete=models.CASCADE, related_name='attestations')
+    date_demande = models.DateTimeField(auto_now_add=True)
+
     def save(self, *args, **kwargs):
         if not self.id_attestation:
-            dernier = Attestation.objects.order_by('-id').first()
+            # Les archives gardent leurs numéros : ne pas les réattribuer
+            dernier = Attestation.objects.order_by('-id').first() or AttestationArchive.objects.order_by('-id').first()
             numero = (dernier.id + 1) if dernier else 1
             self.id_attestation = f"A-{numero:04d}"
 
         self.total_paye = self.prix * self.quantite
         super().save(*args, **kwargs)
 
-    def __str__(self):
-        return f"{self.id_attestation} - {self.etudiant}"
-
     class Meta:
         verbose_name = "Attestation"
-        ordering = ['-date_demande']
\ No newline at end of file
+        ordering = ['-date_demande']
+        indexes = [
+            # Listes / tableau de bord : filtre statut, tri -date_demande
+            models.Index(fields=['statut', '-date_demande'], name='att_statut_date_idx'),
+            models.Index(fields=['-date_demande'], name='att_date_idx'),
+            # Demandes à traiter : petite fraction de la table
+            models.Index(
+                fields=['-date_demande'],
+                name='att_ouvertes_date_idx',
+                condition=Q(statut__in=['en_attente', 'en_cours']),
+            ),
+        ]
+
+
+class AttestationArchive(AttestationBase):
+    """
+    Attestation traitée depuis plus de ARCHIVE_APRES_ANNEES ans,
+    déplacée par manage.py archiver_demandes (même identifiant qu'à l'origine)
+    """
+    id = models.BigIntegerField(primary_key=True)
+    etudiant = models.ForeignKey('api.Etudiant', on_delete=models.CASCADE, related_name='attestations_archives')
+    date_demande = models.DateTimeField()
+    archive_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Attestation archivée"
+        ordering = ['-date_demande']
+        indexes = [
+            models.Index(fields=['statut', '-date_demande'], name='att_arch_statut_date_idx'),
+            models.Index(fields=['-date_demande'], name='att_arch_date_idx'),
+        ]
@@ -1,3 +1,86 @@
-from django.test import TestCase
+from django.core import mail
 
-# Create your tests here.
+from gestion_papier_scolarite.utils.factories import creer_attestations
+from gestion_papier_scolarite.utils.testing import RequetesBorneesTestCase
+
+from .models import Attestation
+
+
+class AttestationRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_attestations(self.etudiants, nombre)
+
+    def peupler_etudiant(self, nombre):
+        creer_attestations([self.etudiant], nombre)
+
+    def nouvelle_attestation(self):
+        return {'pk': creer_attestations([self.etudiant], 1, statut='en_attente')[0].pk}
+
+    # ---------- Étudiant ----------
+    def test_creer(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(
+            4,
+            lambda: self.client.post(
+                '/api/attestation/creer/',
+                {'type_attestation': 'inscription', 'annee_scolaire': "2024-2025", 'quantite': 2},
+                format='json',
+            ),
+            self.peupler_etudiant,
+            statuts=(201,),
+        )
+
+    def test_mes_attestations(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(
+            3,
+            lambda: self.client.get('/api/attestation/mes-attestations/'),
+            self.peupler_etudiant,
+        )
+
+    # ---------- Scolarité ----------
+    def test_liste(self):
+        self.connecter_scolarite()
+        for url in ('/api/attestation/liste/', '/api/attestation/liste/?type_attestation=reussite'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(1, lambda: self.client.get(url), self.peupler)
+
+    def test_changer_statut(self):
+        self.connecter_scolarite()
+        for url in ('/api/attestation/{pk}/statut/', '/api/attestation/changer-statut/{pk}/'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(
+                    4,
+                    lambda pk: self.client.post(url.format(pk=pk), {'statut': 'pret'}, format='json'),
+                    self.peupler,
+                    preparer=self.nouvelle_attestation,
+                )
+
+    # ---------- Admin ----------
+    def test_admin_liste(self):
+        self.connecter_admin()
+        for url in ('/admin/Attestation/attestation/', '/admin/Attestation/attestation/?statut__exact=en_attente'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(6, lambda: self.client.get(url), self.peupler)
+
+    def selection_admin(self):
+        return {'pks': [demande.pk for demande in creer_attestations(self.etudiants, 5, statut='en_attente')]}
+
+    def test_admin_action_statut(self):
+        self.connecter_admin()
+        self.assertRequetesBornees(
+            5,
+            lambda pks: self.client.post('/admin/Attestation/attestation/', {'action': 'passer_pret', '_selected_action': pks}),
+            self.peupler,
+            preparer=self.selection_admin,
+            statuts=(302,),
+        )
+
+    def test_admin_action_notifie(self):
+        self.connecter_admin()
+        pks = self.selection_admin()['pks']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/Attestation/attestation/', {'action': 'passer_en_cours', '_selected_action': pks})
+        self.assertEqual(Attestation.objects.filter(pk__in=pks, statut='en_cours').count(), 5)
+        self.assertEqual(len(mail.outbox), 5)
@@ -7,8 +7,10 @@ from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
 
-from api.models import Etudiant
-from .models import Attestation
+from gestion_papier_scolarite.utils.filters import filtrer
+from .filters import AttestationFilterSet
+from gestion_papier_scolarite.utils.archive import avec_archives
+from .models import Attestation, AttestationArchive
 from .serializers import AttestationCreateSerializer, AttestationListSerializer
 
 
@@ -19,9 +21,8 @@ class CreerAttestationView(APIView):
         if request.user.role != 'etudiant':
             return Response({"erreur": "Seuls les étudiants peuvent faire une demande."}, status=403)
 
-        try:
-            etudiant = Etudiant.objects.get(user=request.user)
-        except Etudiant.DoesNotExist:
+        etudiant = request.etudiant
+        if not etudiant:
             return Response({"erreur": "Profil étudiant manquant."}, status=403)
 
         data = request.data.copy()
@@ -48,12 +49,16 @@ class MesAttestationsView(APIView):
         if request.user.role != 'etudiant':
             return Response({"erreur": "Accès réservé aux étudiants."}, status=403)
 
-        try:
-            etudiant = Etudiant.objects.get(user=request.user)
-        except Etudiant.DoesNotExist:
+        etudiant = request.etudiant
+        if not etudiant:
             return Response({"erreur": "Profil manquant."}, status=403)
 
-        attestations = Attestation.objects.filter(etudiant=etudiant).order_by('-date_demande')
+        attestations, erreurs = filtrer(
+            AttestationFilterSet, request,
+            Attestation.objects.select_related('etudiant__user').filter(etudiant=etudiant).order_by('-date_demande')
+        )
+        if erreurs:
+            return Response({"erreur": "Filtres invalides.", "details": erreurs}, status=400)
         serializer = AttestationListSerializer(attestations, many=True)
         return Response({
             "total": attestations.count(),
@@ -63,12 +68,20 @@ class MesAttestationsView(APIView):
 
 class ListeAttestationsScolariteView(APIView):
     permission_classes = [IsAuthenticated]
+    lecture_replica = True
 
     def get(self, request):
         if request.user.role != 'scolarite':
             return Response({"erreur": "Réservé à la scolarité."}, status=403)
 
-        attestations = Attestation.objects.select_related('etudiant__user').order_by('-date_demande')
+        # ?archive=1 : attestations archivées
+        modele = AttestationArchive if avec_archives(request) else Attestation
+        attestations, erreurs = filtrer(
+            AttestationFilterSet, request,
+            modele.objects.select_related('etudiant__user').order_by('-date_demande')
+        )
+        if erreurs:
+            return Response({"erreur": "Filtres invalides.", "details": erreurs}, status=400)
         serializer = AttestationListSerializer(attestations, many=True)
         return Response(serializer.data)
 
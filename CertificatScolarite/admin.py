@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from gestion_papier_scolarite.utils.admin_utils import DemandeAdmin
+from .models import CertificatScolarite
+
+
+@admin.register(CertificatScolarite)
+class CertificatScolariteAdmin(DemandeAdmin):
+    type_demande = 'certificat'
+    champ_numero = 'id_certificat'
+    list_display = ('id_certificat', 'etudiant', 'quantite', 'statut', 'date_demande', 'date_traitement')
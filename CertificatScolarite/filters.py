@@ -0,0 +1,10 @@
+# CertificatScolarite/filters.py
+
+from gestion_papier_scolarite.utils.filters import DemandeFilterSet
+
+from .models import CertificatScolarite
+
+
+class CertificatFilterSet(DemandeFilterSet):
+    class Meta(DemandeFilterSet.Meta):
+        model = CertificatScolarite
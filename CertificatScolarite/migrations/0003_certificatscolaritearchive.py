@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CertificatScolarite', '0002_index_statut_date_demande'),
+        ('api', '0004_password_reset_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificatScolariteArchive',
+            fields=[
+                ('id_certificat', models.CharField(blank=True, editable=False, max_length=10, unique=True, verbose_name='Numéro certificat')),
+                ('nom_pere', models.CharField(default='Non spécifié', max_length=100, verbose_name='Nom du père')),
+                ('nom_mere', models.CharField(default='Non spécifiée', max_length=100, verbose_name='Nom de la mère')),
+                ('date_naissance', models.DateField(blank=True, help_text='Format: JJ/MM/AAAA', null=True, verbose_name='Date de naissance')),
+                ('lieu_naissance', models.CharField(blank=True, help_text='Ville ou commune de naissance', max_length=150, null=True, verbose_name='Lieu de naissance')),
+                ('quantite', models.PositiveIntegerField(default=1, help_text='Nombre de certificats demandés', verbose_name="Nombre d'exemplaires")),
+                ('date_traitement', models.DateTimeField(blank=True, null=True)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours de traitement'), ('pret', 'Prêt à retirer')], default='en_attente', max_length=15, verbose_name='Statut de la demande')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_demande', models.DateTimeField()),
+                ('archive_le', models.DateTimeField(auto_now_add=True)),
+                ('etudiant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificats_archives', to='api.etudiant', verbose_name='Étudiant')),
+            ],
+            options={
+                'verbose_name': 'Certificat de scolarité archivé',
+                'verbose_name_plural': 'Certificats de scolarité archivés',
+                'ordering': ['-date_demande'],
+                'indexes': [models.Index(fields=['statut', '-date_demande'], name='cert_arch_statut_date_idx'), models.Index(fields=['-date_demande'], name='cert_arch_date_idx')],
+            },
+        ),
+    ]
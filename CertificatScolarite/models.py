@@ -1,8 +1,12 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
+from gestion_papier_scolarite.utils.model_utils import ChangeTrackingMixin
 
 
-class CertificatScolarite(models.Model):
+class CertificatScolariteBase(models.Model):
+    """Champs communs aux certificats en cours (CertificatScolarite) et archivés"""
+
     id_certificat = models.CharField(
         max_length=10,
         unique=True,
@@ -10,12 +14,6 @@ class CertificatScolarite(models.Model):
         blank=True,
         verbose_name="Numéro certificat"
     )
-    etudiant = models.ForeignKey(
-        'api.Etudiant',
-        on_delete=models.CASCADE,
-        related_name='certificats_scolarite',
-        verbose_name="Étudiant"
-    )
     nom_pere = models.CharField(
         max_length=100, 
         verbose_name="Nom du père",
@@ -44,7 +42,6 @@ class CertificatScolarite(models.Model):
         verbose_name="Nombre d'exemplaires",
         help_text="Nombre de certificats demandés"
     )
-    date_demande = models.DateTimeField(auto_now_add=True)
     date_traitement = models.DateTimeField(null=True, blank=True)
     STATUT_CHOICES = [
         ('en_attente', 'En attente'),
@@ -57,17 +54,71 @@ class CertificatScolarite(models.Model):
         default='en_attente',
         verbose_name="Statut de la demande"
     )
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.id_certificat} - {self.etudiant}"
+
+
+class CertificatScolarite(ChangeTrackingMixin, CertificatScolariteBase):
+    etudiant = models.ForeignKey(
+        'api.Etudiant',
+        on_delete=models.CASCADE,
+        related_name='certificats_scolarite',
+        verbose_name="Étudiant"
+    )
+    date_demande = models.DateTimeField(auto_now_add=True)
+
     def save(self, *args, **kwargs):
         if not self.id_certificat:
-            dernier = CertificatScolarite.objects.order_by('-id').first()
+            # Les archives gardent leurs numéros : ne pas les réattribuer
+            dernier = (
+                CertificatScolarite.objects.order_by('-id').first()
+                or CertificatScolariteArchive.objects.order_by('-id').first()
+            )
             numero = (dernier.id + 1) if dernier else 1
             self.id_certificat = f"CERT-{numero:04d}"
         super().save(*args, **kwargs)
 
-    def __str__(self):
-        return f"{self.id_certificat} - {self.etudiant}"
-
     class Meta:
         verbose_name = "Certificat de scolarité"
         verbose_name_plural = "Certificats de scolarité"
-        ordering = ['-date_demande']
\ No newline at end of file
+        ordering = ['-date_demande']
+        indexes = [
+            # Listes / tableau de bord : filtre statut, tri -date_demande
+            models.Index(fields=['statut', '-date_demande'], name='cert_statut_date_idx'),
+            models.Index(fields=['-date_demande'], name='cert_date_idx'),
+            # Demandes à traiter : petite fraction de la table
+            models.Index(
+                fields=['-date_demande'],
+                name='cert_ouvertes_date_idx',
+                condition=Q(statut__in=['en_attente', 'en_cours']),
+            ),
+        ]
+
+
+class CertificatScolariteArchive(CertificatScolariteBase):
+    """
+    Certificat traité depuis plus de ARCHIVE_APRES_ANNEES ans,
+    déplacé par manage.py archiver_demandes (même identifiant qu'à l'origine)
+    """
+    id = models.BigIntegerField(primary_key=True)
+    etudiant = models.ForeignKey(
+        'api.Etudiant',
+        on_delete=models.CASCADE,
+        related_name='certificats_archives',
+        verbose_name="Étudiant"
+    )
+    date_demande = models.DateTimeField()
+    archive_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Certificat de scolarité archivé"
+        verbose_name_plural = "Certificats de scolarité archivés"
+        ordering = ['-date_demande']
+        indexes = [
+            models.Index(fields=['statut', '-date_demande'], name='cert_arch_statut_date_idx'),
+            models.Index(fields=['-date_demande'], name='cert_arch_date_idx'),
+        ]
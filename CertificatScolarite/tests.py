@@ -1,3 +1,107 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from gestion_papier_scolarite.utils.factories import creer_certificats
+from gestion_papier_scolarite.utils.testing import RequetesBorneesTestCase
+
+from .models import CertificatScolarite, CertificatScolariteArchive
+
+
+class CertificatRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_certificats(self.etudiants, nombre)
+
+    def peupler_etudiant(self, nombre):
+        creer_certificats([self.etudiant], nombre)
+
+    # ---------- Étudiant ----------
+    def test_creer(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(
+            5,
+            lambda: self.client.post(
+                '/api/certificat/creer/',
+                {'nom_pere': "Rakoto", 'nom_mere': "Rasoa", 'date_naissance': "01/02/2000",
+                 'lieu_naissance': "Antsirabe", 'quantite': 2},
+                format='json',
+            ),
+            self.peupler_etudiant,
+            statuts=(201,),
+        )
+
+    def test_mes_demandes(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(6, lambda: self.client.get('/api/certificat/mes-demandes/'), self.peupler_etudiant)
+
+    # ---------- Scolarité ----------
+    def test_liste(self):
+        self.connecter_scolarite()
+        for url in ('/api/certificat/liste/', '/api/certificat/liste/?statut=en_attente'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(5, lambda: self.client.get(url), self.peupler)
+
+    def test_changer_statut(self):
+        self.connecter_scolarite()
+        self.assertRequetesBornees(
+            2,
+            lambda pk: self.client.patch(f'/api/certificat/{pk}/statut/', {'statut': 'pret'}, format='json'),
+            self.peupler,
+            preparer=lambda: {'pk': creer_certificats([self.etudiant], 1, statut='en_attente')[0].pk},
+        )
+
+    # ---------- Admin ----------
+    def test_admin_liste(self):
+        self.connecter_admin()
+        for url in ('/admin/CertificatScolarite/certificatscolarite/', '/admin/CertificatScolarite/certificatscolarite/?statut__exact=en_attente'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(6, lambda: self.client.get(url), self.peupler)
+
+    def selection_admin(self):
+        return {'pks': [demande.pk for demande in creer_certificats(self.etudiants, 5, statut='en_attente')]}
+
+    def test_admin_action_statut(self):
+        self.connecter_admin()
+        self.assertRequetesBornees(
+            5,
+            lambda pks: self.client.post('/admin/CertificatScolarite/certificatscolarite/', {'action': 'passer_pret', '_selected_action': pks}),
+            self.peupler,
+            preparer=self.selection_admin,
+            statuts=(302,),
+        )
+
+    def test_admin_action_notifie(self):
+        self.connecter_admin()
+        pks = self.selection_admin()['pks']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/CertificatScolarite/certificatscolarite/', {'action': 'passer_en_cours', '_selected_action': pks})
+        self.assertEqual(CertificatScolarite.objects.filter(pk__in=pks, statut='en_cours').count(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+
+# ====================== ARCHIVAGE ======================
+class ArchivageTests(RequetesBorneesTestCase):
+
+    def test_identifiant_deja_archive(self):
+        certificats = creer_certificats(self.etudiants, 3, statut='retire')
+        CertificatScolarite.objects.update(date_traitement=timezone.now() - timedelta(days=365 * 3))
+        conserve = certificats[0]
+        champs = [field.attname for field in CertificatScolariteArchive._meta.concrete_fields if field.attname != 'archive_le']
+        ancienne = CertificatScolarite.objects.filter(pk=conserve.pk).values(*champs).get()
+        CertificatScolariteArchive.objects.create(**dict(ancienne, lieu_naissance="Ancienne copie"))
+
+        sortie = StringIO()
+        call_command('archiver_demandes', batch_size=2, stdout=sortie)
+
+        # La demande courante reste en place, la copie d'archive n'est pas remplacée
+        self.assertTrue(CertificatScolarite.objects.filter(pk=conserve.pk).exists())
+        self.assertEqual(CertificatScolariteArchive.objects.get(pk=conserve.pk).lieu_naissance, "Ancienne copie")
+        self.assertEqual(
+            set(CertificatScolariteArchive.objects.values_list('pk', flat=True)),
+            {certificat.pk for certificat in certificats},
+        )
+        self.assertIn("1 demande(s) laissée(s) en place", sortie.getvalue())
@@ -6,13 +6,18 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
-from api.models import Etudiant
-from .models import CertificatScolarite
+from gestion_papier_scolarite.utils.filters import filtrer
+from .filters import CertificatFilterSet
+from gestion_papier_scolarite.utils.archive import avec_archives
+from .models import CertificatScolarite, CertificatScolariteArchive
 from .serializers import (
     CertificatScolariteCreateSerializer,
     CertificatScolariteListSerializer,
     ChangerStatutCertificatSerializer
 )
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # 1. Créer une demande (étudiant)
@@ -24,9 +29,8 @@ class CreerCertificatView(APIView):
                 {"erreur": "Seuls les étudiants peuvent créer une demande de certificat."},
                 status=status.HTTP_403_FORBIDDEN
             )
-        try:
-            etudiant = Etudiant.objects.get(user=request.user)
-        except Etudiant.DoesNotExist:
+        etudiant = request.etudiant
+        if not etudiant:
             return Response(
                 {"erreur": "Profil étudiant non trouvé. Veuillez contacter l'administration."},
                 status=status.HTTP_404_NOT_FOUND
@@ -74,8 +78,8 @@ class CreerCertificatView(APIView):
                 recipient_list=[user.email],
                 fail_silently=True,
             )
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email de confirmation : {e}")
+        except Exception:
+            logger.exception("Erreur lors de l'envoi de l'email de confirmation à %s", user.email)
 
 
 # 2. Mes certificats (étudiant)
@@ -88,16 +92,23 @@ class MesCertificatsView(APIView):
                 {"erreur": "Accès réservé aux étudiants."},
                 status=status.HTTP_403_FORBIDDEN
             )
-        try:
-            etudiant = Etudiant.objects.get(user=request.user)
-        except Etudiant.DoesNotExist:
+        etudiant = request.etudiant
+        if not etudiant:
             return Response(
                 {"erreur": "Profil étudiant non trouvé."},
                 status=status.HTTP_404_NOT_FOUND
             )
-        certificats = CertificatScolarite.objects.filter(
-            etudiant=etudiant
-        ).select_related('etudiant', 'etudiant__user').order_by('-date_demande')
+        certificats, erreurs = filtrer(
+            CertificatFilterSet, request,
+            CertificatScolarite.objects.filter(
+                etudiant=etudiant
+            ).select_related('etudiant', 'etudiant__user').order_by('-date_demande')
+        )
+        if erreurs:
+            return Response(
+                {"erreur": "Filtres invalides.", "details": erreurs},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         serializer = CertificatScolariteListSerializer(certificats, many=True)        
         stats = {
             'total': certificats.count(),
@@ -114,6 +125,7 @@ class MesCertificatsView(APIView):
 # 3. Liste pour scolarité
 class ListeCertificatsScolariteView(APIView):
     permission_classes = [IsAuthenticated]
+    lecture_replica = True
 
     def get(self, request):
         if request.user.role != 'scolarite':
@@ -121,29 +133,19 @@ class ListeCertificatsScolariteView(APIView):
                 {"erreur": "Accès réservé au personnel de la scolarité."},
                 status=status.HTTP_403_FORBIDDEN
             )
-        statut = request.query_params.get('statut')
-        date_debut = request.query_params.get('date_debut')
-        date_fin = request.query_params.get('date_fin')        
-        queryset = CertificatScolarite.objects.select_related(
-            'etudiant', 'etudiant__user'
-        ).order_by('-date_demande')
-        
-        if statut and statut in dict(CertificatScolarite.STATUT_CHOICES):
-            queryset = queryset.filter(statut=statut)
-        
-        if date_debut:
-            try:
-                date_obj = timezone.datetime.strptime(date_debut, '%Y-%m-%d').date()
-                queryset = queryset.filter(date_demande__date__gte=date_obj)
-            except ValueError:
-                pass
-        
-        if date_fin:
-            try:
-                date_obj = timezone.datetime.strptime(date_fin, '%Y-%m-%d').date()
-                queryset = queryset.filter(date_demande__date__lte=date_obj)
-            except ValueError:
-                pass
+        # ?archive=1 : certificats archivés
+        modele = CertificatScolariteArchive if avec_archives(request) else CertificatScolarite
+        queryset, erreurs = filtrer(
+            CertificatFilterSet, request,
+            modele.objects.select_related(
+                'etudiant', 'etudiant__user'
+            ).order_by('-date_demande')
+        )
+        if erreurs:
+            return Response(
+                {"erreur": "Filtres invalides.", "details": erreurs},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         serializer = CertificatScolariteListSerializer(queryset, many=True)
         total = queryset.count()
         stats = {
@@ -305,6 +307,6 @@ class ChangerStatutCertificatView(APIView):
                 fail_silently=True,
             )
             return True
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email de notification : {e}")
+        except Exception:
+            logger.exception("Erreur lors de l'envoi de l'email de notification à %s", user.email)
             return False
\ No newline at end of file
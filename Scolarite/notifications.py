@@ -0,0 +1,178 @@
+# Scolarite/notifications.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# ====================== EMAIL DE CHANGEMENT DE STATUT ======================
+def numero_demande(demande, type_demande):
+    if type_demande == 'releve':
+        return demande.id_releve
+    elif type_demande == 'certificat':
+        return demande.id_certificat
+    else:
+        return demande.id_attestation
+
+
+def envoyer_notification_statut(demande, type_demande, ancien_statut, nouveau_statut, motif=''):
+    """Email à l'étudiant après un changement de statut ; False si l'envoi échoue"""
+    try:
+        user = demande.etudiant.user
+        nom = f"{user.nom} {user.prenoms}".strip()
+        numero = numero_demande(demande, type_demande)
+
+        type_labels = {
+            'releve': 'relevé de notes',
+            'certificat': 'certificat de scolarité',
+            'attestation': 'attestation'
+        }
+
+        type_label = type_labels.get(type_demande, type_demande)
+
+
+        if nouveau_statut == 'pret':
+            sujet = f" Votre {type_label} {numero} est prêt !"
+            message = f"""Bonjour {nom},
+
+            Bonne nouvelle ! Votre {type_label} est maintenant prêt à être retiré.
+
+            Numéro : {numero}
+            Date de traitement : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
+
+            Merci de passer à la scolarité pendant les heures d'ouverture pour le récupérer.
+
+            Cordialement,
+            Le Service de la Scolarité"""
+
+        elif nouveau_statut == 'en_cours':
+            sujet = f" Votre {type_label} {numero} est en cours de traitement"
+            message = f"""Bonjour {nom},
+
+            Votre demande de {type_label} est actuellement en cours de traitement.
+
+             Numéro : {numero}
+             Mise à jour : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
+
+            Nous vous préviendrons dès qu'elle sera prête.
+
+            Cordialement,
+            Le Service de la Scolarité"""
+
+        elif nouveau_statut == 'rejete':
+            sujet = f" Votre demande {numero} a été refusée"
+            message = f"""Bonjour {nom},
+
+        Votre demande de {type_label} a malheureusement été refusée.
+
+        Numéro : {numero}
+        Date : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
+        Motif : {motif}
+
+        Merci de contacter la scolarité pour plus d'informations.
+
+        Cordialement,
+        Le Service de la Scolarité"""
+
+        elif nouveau_statut == 'retire':
+            sujet = f" Confirmation de retrait - {type_label} {numero}"
+            message = f"""Bonjour {nom},
+
+        Nous confirmons le retrait de votre {type_label}.
+
+        Numéro : {numero}
+        Date de retrait : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
+
+        Merci et bonne continuation !
+
+        Cordialement,
+        Le Service de la Scolarité"""
+
+        else:
+            # Message générique
+            sujet = f"Mise à jour - {type_label} {numero}"
+            message = f"""Bonjour {nom},
+
+    Le statut de votre {type_label} a été mis à jour.
+
+    Numéro : {numero}
+    Ancien statut : {ancien_statut}
+    Nouveau statut : {demande.get_statut_display()}
+    Date : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
+
+    Cordialement,
+    Le Service de la Scolarité"""
+
+        # Envoi de l'email
+        send_mail(
+            subject=sujet,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL or 'scolarite@ecole.com',
+            recipient_list=[user.email],
+            fail_silently=False,
+        )
+        return True
+    except Exception:
+        logger.exception("Erreur envoi email (%s %s)", type_demande, demande.pk)
+        return False
+
+
+# ====================== FILE D'ENVOI ======================
+# Changements de statut en masse (actions de l'admin) : les emails partent
+# après le commit, hors requête, dans un thread dédié (NOTIFICATIONS_ASYNC)
+_executor = None
+_executor_lock = threading.Lock()
+_en_attente = 0
+
+
+def notifications_en_attente():
+    """Emails mis en file et pas encore envoyés (profondeur de la file, cf. /readyz)"""
+    return _en_attente
+
+
+def _compter_en_attente(delta):
+    global _en_attente
+    with _executor_lock:
+        _en_attente += delta
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notifications')
+        return _executor
+
+
+def _envoyer_lot(model, type_demande, anciens_statuts, nouveau_statut):
+    """anciens_statuts : {pk: libellé du statut avant la mise à jour}"""
+    try:
+        demandes = model.objects.select_related('etudiant__user').filter(pk__in=list(anciens_statuts))
+        for demande in demandes.iterator(chunk_size=500):
+            envoyer_notification_statut(demande, type_demande, anciens_statuts[demande.pk], nouveau_statut)
+    finally:
+        _compter_en_attente(-len(anciens_statuts))
+        if getattr(settings, 'NOTIFICATIONS_ASYNC', True):
+            connections.close_all()
+
+
+def notifier_changements_statut(model, type_demande, anciens_statuts, nouveau_statut):
+    """Met en file les emails d'un changement de statut en masse, envoyés après le commit"""
+    if not anciens_statuts:
+        return
+    _compter_en_attente(len(anciens_statuts))
+
+    def soumettre():
+        if getattr(settings, 'NOTIFICATIONS_ASYNC', True):
+            _get_executor().submit(_envoyer_lot, model, type_demande, anciens_statuts, nouveau_statut)
+        else:
+            _envoyer_lot(model, type_demande, anciens_statuts, nouveau_statut)
+
+    transaction.on_commit(soumettre)
@@ -1,3 +1,54 @@
-from django.test import TestCase
+from gestion_papier_scolarite.utils.factories import creer_attestations, creer_certificats, creer_releves
+from gestion_papier_scolarite.utils.testing import RequetesBorneesTestCase
 
-# Create your tests here.
+
+class ScolariteRequetesTests(RequetesBorneesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.connecter_scolarite()
+
+    def peupler(self, nombre):
+        """`nombre` demandes de chaque type"""
+        creer_releves(self.etudiants, nombre)
+        creer_certificats(self.etudiants, nombre)
+        creer_attestations(self.etudiants, nombre)
+
+    def test_toutes_demandes(self):
+        for url in (
+            '/api/scolarite/toutes-demandes/',
+            '/api/scolarite/toutes-demandes/?statut=en_attente',
+            '/api/scolarite/toutes-demandes/?type=releve',
+        ):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(3, lambda: self.client.get(url), self.peupler)
+
+    def test_changer_statut(self):
+        creations = {
+            'releve': creer_releves,
+            'certificat': creer_certificats,
+            'attestation': creer_attestations,
+        }
+        for type_demande, creer in creations.items():
+            with self.subTest(type_demande=type_demande):
+                self.assertRequetesBornees(
+                    6,
+                    lambda pk: self.client.post(
+                        '/api/scolarite/changer-statut/',
+                        {'type_demande': type_demande, 'id': pk, 'nouveau_statut': 'pret'},
+                        format='json',
+                    ),
+                    self.peupler,
+                    preparer=lambda: {'pk': creer([self.etudiant], 1, statut='en_attente')[0].pk},
+                )
+
+    def test_statistiques(self):
+        self.assertRequetesBornees(41, lambda: self.client.get('/api/scolarite/statistiques/'), self.peupler)
+
+    def test_rechercher_demande(self):
+        self.assertRequetesBornees(
+            3,
+            lambda numero: self.client.get('/api/scolarite/rechercher-demande/', {'numero': numero}),
+            self.peupler,
+            preparer=lambda: {'numero': creer_certificats([self.etudiant], 1)[0].id_certificat},
+        )
@@ -4,21 +4,28 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Q, Sum
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.conf import settings
 from datetime import datetime, timedelta
 from api.models import Etudiant
-from releveNote.models import ReleveNote
-from CertificatScolarite.models import CertificatScolarite
-from Attestation.models import Attestation
+from releveNote.models import ReleveNote, ReleveNoteAnnee, ReleveNoteArchive, ReleveNoteLigne
+from CertificatScolarite.models import CertificatScolarite, CertificatScolariteArchive
+from Attestation.models import Attestation, AttestationArchive
+from Attestation.filters import AttestationFilterSet
+from CertificatScolarite.filters import CertificatFilterSet
+from releveNote.filters import ReleveNoteFilterSet
+from gestion_papier_scolarite.utils.archive import avec_archives
+from gestion_papier_scolarite.utils.filters import filtrer, plage_jours
+from .notifications import envoyer_notification_statut, numero_demande
+
+TYPES_DEMANDE = ['releve', 'certificat', 'attestation']
 
 
 # 1. TABLEAU DE BORD UNIFIÉ - SCOLARITÉ UNIQUEMENT
 
 class ToutesLesDemandesScolariteView(APIView):
     permission_classes = [IsAuthenticated]
+    lecture_replica = True
 
     def get(self, request):
         if request.user.role != 'scolarite':
@@ -33,25 +40,37 @@ class ToutesLesDemandesScolariteView(APIView):
         date_fin = request.query_params.get('date_fin', None)
         demandes_unifiees = []
 
+        if type_filter and type_filter not in TYPES_DEMANDE:
+            return Response({
+                "erreur": f"Type invalide. Types valides: {', '.join(TYPES_DEMANDE)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # ?archive=1 : historique (demandes archivées) au lieu des demandes en cours
+        archive = avec_archives(request)
+        modele_releve = ReleveNoteArchive if archive else ReleveNote
+        modele_certificat = CertificatScolariteArchive if archive else CertificatScolarite
+        modele_attestation = AttestationArchive if archive else Attestation
+
+        # Mêmes paramètres (statut, date_debut, date_fin) validés pour les trois types
+        releves, erreurs = filtrer(ReleveNoteFilterSet, request, modele_releve.objects.select_related('etudiant__user'))
+        certificats, erreurs_cert = filtrer(CertificatFilterSet, request, modele_certificat.objects.select_related('etudiant__user'))
+        attestations, erreurs_att = filtrer(AttestationFilterSet, request, modele_attestation.objects.select_related('etudiant__user'))
+        erreurs = erreurs or erreurs_cert or erreurs_att
+        if erreurs:
+            return Response({
+                "erreur": "Filtres invalides.",
+                "details": erreurs
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Seuls les types demandés sont chargés
+        if type_filter and type_filter != 'releve':
+            releves = releves.none()
+        if type_filter and type_filter != 'certificat':
+            certificats = certificats.none()
+        if type_filter and type_filter != 'attestation':
+            attestations = attestations.none()
+
         # 1. RELEVÉS DE NOTES
-        releves = ReleveNote.objects.select_related('etudiant__user').all()
-        
-        if statut_filter:
-            releves = releves.filter(statut=statut_filter)
-        if date_debut:
-            try:
-                date_obj = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                releves = releves.filter(date_demande__date__gte=date_obj)
-            except ValueError:
-                pass
-        
-        if date_fin:
-            try:
-                date_obj = datetime.strptime(date_fin, '%Y-%m-%d').date()
-                releves = releves.filter(date_demande__date__lte=date_obj)
-            except ValueError:
-                pass
-        
         for releve in releves:
             demandes_unifiees.append({
                 'id': releve.id,
@@ -74,24 +93,6 @@ class ToutesLesDemandesScolariteView(APIView):
                 'date_traitement': releve.date_traitement.strftime("%d/%m/%Y %H:%M") if releve.date_traitement else None
             })
 
-        certificats = CertificatScolarite.objects.select_related('etudiant__user').all()
-        
-        if statut_filter:
-            certificats = certificats.filter(statut=statut_filter)
-        if date_debut:
-            try:
-                date_obj = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                certificats = certificats.filter(date_demande__date__gte=date_obj)
-            except ValueError:
-                pass
-        
-        if date_fin:
-            try:
-                date_obj = datetime.strptime(date_fin, '%Y-%m-%d').date()
-                certificats = certificats.filter(date_demande__date__lte=date_obj)
-            except ValueError:
-                pass
-        
         for cert in certificats:
             demandes_unifiees.append({
                 'id': cert.id,
@@ -117,26 +118,6 @@ class ToutesLesDemandesScolariteView(APIView):
             })
 
         # 3. ATTESTATIONS (CORRIGÉ - avec annee_scolaire au lieu de annee_universitaire)
-        attestations = Attestation.objects.select_related('etudiant__user').all()
-        
-        if statut_filter:
-            attestations = attestations.filter(statut=statut_filter)
-        
-        # Filtre par date
-        if date_debut:
-            try:
-                date_obj = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                attestations = attestations.filter(date_demande__date__gte=date_obj)
-            except ValueError:
-                pass
-        
-        if date_fin:
-            try:
-                date_obj = datetime.strptime(date_fin, '%Y-%m-%d').date()
-                attestations = attestations.filter(date_demande__date__lte=date_obj)
-            except ValueError:
-                pass
-        
         for att in attestations:
             demandes_unifiees.append({
                 'id': att.id,
@@ -162,9 +143,6 @@ class ToutesLesDemandesScolariteView(APIView):
                 'date_traitement': att.date_traitement.strftime("%d/%m/%Y %H:%M") if att.date_traitement else None
             })
 
-        if type_filter:
-            demandes_unifiees = [d for d in demandes_unifiees if d['type_demande'] == type_filter]
-
         try:
             demandes_unifiees.sort(key=lambda x: datetime.strptime(x['date_demande'], "%d/%m/%Y %H:%M") 
                                   if x['date_demande'] else datetime.min, reverse=True)
@@ -195,7 +173,8 @@ class ToutesLesDemandesScolariteView(APIView):
                 "statut": statut_filter,
                 "type": type_filter,
                 "date_debut": date_debut,
-                "date_fin": date_fin
+                "date_fin": date_fin,
+                "archive": archive
             }
         }, status=status.HTTP_200_OK)
 
@@ -264,7 +243,7 @@ class ChangerStatutDemandeUnifieeView(APIView):
             
             demande.save()
 
-            email_envoye = self._envoyer_notification(demande, type_demande, ancien_statut, nouveau_statut, motif)
+            email_envoye = envoyer_notification_statut(demande, type_demande, ancien_statut, nouveau_statut, motif)
 
             return Response({
                 "success": True,
@@ -272,7 +251,7 @@ class ChangerStatutDemandeUnifieeView(APIView):
                 "demande": {
                     "type": type_demande,
                     "id": demande.id,
-                    "numero": self._get_numero(demande, type_demande),
+                    "numero": numero_demande(demande, type_demande),
                     "ancien_statut": ancien_statut,
                     "nouveau_statut": demande.get_statut_display()
                 },
@@ -286,119 +265,12 @@ class ChangerStatutDemandeUnifieeView(APIView):
                 "id": demande_id
             }, status=status.HTTP_404_NOT_FOUND)
 
-    def _get_numero(self, demande, type_demande):
-        if type_demande == 'releve':
-            return demande.id_releve
-        elif type_demande == 'certificat':
-            return demande.id_certificat
-        else:
-            return demande.id_attestation
-
-    def _envoyer_notification(self, demande, type_demande, ancien_statut, nouveau_statut, motif):
-        try:
-            user = demande.etudiant.user
-            nom = f"{user.nom} {user.prenoms}".strip()
-            numero = self._get_numero(demande, type_demande)
-
-            type_labels = {
-                'releve': 'relevé de notes',
-                'certificat': 'certificat de scolarité',
-                'attestation': 'attestation'
-            }
-            
-            type_label = type_labels.get(type_demande, type_demande)
-
-           
-            if nouveau_statut == 'pret':
-                sujet = f" Votre {type_label} {numero} est prêt !"
-                message = f"""Bonjour {nom},
-
-                Bonne nouvelle ! Votre {type_label} est maintenant prêt à être retiré.
-
-                Numéro : {numero}
-                Date de traitement : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
-
-                Merci de passer à la scolarité pendant les heures d'ouverture pour le récupérer.
-
-                Cordialement,
-                Le Service de la Scolarité"""
-
-            elif nouveau_statut == 'en_cours':
-                sujet = f" Votre {type_label} {numero} est en cours de traitement"
-                message = f"""Bonjour {nom},
-
-                Votre demande de {type_label} est actuellement en cours de traitement.
-
-                 Numéro : {numero}
-                 Mise à jour : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
-
-                Nous vous préviendrons dès qu'elle sera prête.
-
-                Cordialement,
-                Le Service de la Scolarité"""
-
-            elif nouveau_statut == 'rejete':
-                sujet = f" Votre demande {numero} a été refusée"
-                message = f"""Bonjour {nom},
-
-            Votre demande de {type_label} a malheureusement été refusée.
-
-            Numéro : {numero}
-            Date : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
-            Motif : {motif}
-
-            Merci de contacter la scolarité pour plus d'informations.
-
-            Cordialement,
-            Le Service de la Scolarité"""
-
-            elif nouveau_statut == 'retire':
-                sujet = f" Confirmation de retrait - {type_label} {numero}"
-                message = f"""Bonjour {nom},
-
-            Nous confirmons le retrait de votre {type_label}.
-
-            Numéro : {numero}
-            Date de retrait : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
-
-            Merci et bonne continuation !
-
-            Cordialement,
-            Le Service de la Scolarité"""
-
-            else:
-                # Message générique
-                sujet = f"Mise à jour - {type_label} {numero}"
-                message = f"""Bonjour {nom},
-
-        Le statut de votre {type_label} a été mis à jour.
-
-        Numéro : {numero}
-        Ancien statut : {ancien_statut}
-        Nouveau statut : {demande.get_statut_display()}
-        Date : {timezone.now().strftime('%d/%m/%Y à %H:%M')}
-
-        Cordialement,
-        Le Service de la Scolarité"""
-
-            # Envoi de l'email
-            send_mail(
-                subject=sujet,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL or 'scolarite@ecole.com',
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f" Erreur envoi email : {e}")
-            return False
-
 
 # 3. STATISTIQUES - SCOLARITÉ UNIQUEMENT
 
 class StatistiquesScolariteView(APIView):
     permission_classes = [IsAuthenticated]
+    lecture_replica = True
 
     def get(self, request):
         if request.user.role != 'scolarite':
@@ -407,7 +279,7 @@ class StatistiquesScolariteView(APIView):
                 "votre_role": request.user.role
             }, status=status.HTTP_403_FORBIDDEN)
 
-        aujourd_hui = timezone.now().date()
+        aujourd_hui = timezone.localdate()
         debut_semaine = aujourd_hui - timedelta(days=aujourd_hui.weekday())
         debut_mois = aujourd_hui.replace(day=1)
 
@@ -442,23 +314,35 @@ class StatistiquesScolariteView(APIView):
             )
 
         stats['demandes_recentes']['aujourdhui'] = (
-            ReleveNote.objects.filter(date_demande__date=aujourd_hui).count() +
-            CertificatScolarite.objects.filter(date_demande__date=aujourd_hui).count() +
-            Attestation.objects.filter(date_demande__date=aujourd_hui).count()
+            ReleveNote.objects.filter(**plage_jours('date_demande', aujourd_hui, aujourd_hui)).count() +
+            CertificatScolarite.objects.filter(**plage_jours('date_demande', aujourd_hui, aujourd_hui)).count() +
+            Attestation.objects.filter(**plage_jours('date_demande', aujourd_hui, aujourd_hui)).count()
         )
 
         stats['demandes_recentes']['cette_semaine'] = (
-            ReleveNote.objects.filter(date_demande__date__gte=debut_semaine).count() +
-            CertificatScolarite.objects.filter(date_demande__date__gte=debut_semaine).count() +
-            Attestation.objects.filter(date_demande__date__gte=debut_semaine).count()
+            ReleveNote.objects.filter(**plage_jours('date_demande', debut=debut_semaine)).count() +
+            CertificatScolarite.objects.filter(**plage_jours('date_demande', debut=debut_semaine)).count() +
+            Attestation.objects.filter(**plage_jours('date_demande', debut=debut_semaine)).count()
         )
 
         stats['demandes_recentes']['ce_mois'] = (
-            ReleveNote.objects.filter(date_demande__date__gte=debut_mois).count() +
-            CertificatScolarite.objects.filter(date_demande__date__gte=debut_mois).count() +
-            Attestation.objects.filter(date_demande__date__gte=debut_mois).count()
+            ReleveNote.objects.filter(**plage_jours('date_demande', debut=debut_mois)).count() +
+            CertificatScolarite.objects.filter(**plage_jours('date_demande', debut=debut_mois)).count() +
+            Attestation.objects.filter(**plage_jours('date_demande', debut=debut_mois)).count()
         )
 
+        # Relevés : exemplaires par niveau (somme = total_exemplaires() de tous les relevés)
+        # et par année (un relevé sur deux années compte dans chacune) : agrégats SQL
+        stats['releves_par_niveau'] = {
+            ligne['niveau']: ligne['total']
+            for ligne in ReleveNoteLigne.objects.values('niveau').annotate(total=Sum('quantite')).order_by('niveau')
+        }
+        stats['releves_par_annee'] = {
+            str(ligne['annee']): ligne['total']
+            for ligne in ReleveNoteAnnee.objects.values('annee')
+            .annotate(total=Sum('releve__lignes__quantite')).order_by('annee')
+        }
+
         if stats['total_demandes'] > 0:
             pourcentages = {}
             for statut, count in stats['par_statut'].items():
@@ -471,9 +355,9 @@ class StatistiquesScolariteView(APIView):
             fin = debut + timedelta(days=6)
             
             total_semaine = (
-                ReleveNote.objects.filter(date_demande__date__range=[debut, fin]).count() +
-                CertificatScolarite.objects.filter(date_demande__date__range=[debut, fin]).count() +
-                Attestation.objects.filter(date_demande__date__range=[debut, fin]).count()
+                ReleveNote.objects.filter(**plage_jours('date_demande', debut, fin)).count() +
+                CertificatScolarite.objects.filter(**plage_jours('date_demande', debut, fin)).count() +
+                Attestation.objects.filter(**plage_jours('date_demande', debut, fin)).count()
             )
             
             evolution.append({
@@ -502,6 +386,7 @@ class StatistiquesScolariteView(APIView):
 class RechercherDemandeParNumeroView(APIView):
 
     permission_classes = [IsAuthenticated]
+    lecture_replica = True
 
     def get(self, request):
         if request.user.role != 'scolarite':
@@ -524,8 +409,14 @@ class RechercherDemandeParNumeroView(APIView):
 
         resultats = []
 
+        # ?archive=1 : recherche dans les demandes archivées
+        archive = avec_archives(request)
+        modele_releve = ReleveNoteArchive if archive else ReleveNote
+        modele_certificat = CertificatScolariteArchive if archive else CertificatScolarite
+        modele_attestation = AttestationArchive if archive else Attestation
+
         try:
-            releve = ReleveNote.objects.select_related('etudiant__user').get(id_releve__iexact=numero)
+            releve = modele_releve.objects.select_related('etudiant__user').get(id_releve__iexact=numero)
             resultats.append({
                 'type': 'releve',
                 'id': releve.id,
@@ -543,11 +434,11 @@ class RechercherDemandeParNumeroView(APIView):
                 'statut': releve.get_statut_display(),
                 'date_demande': releve.date_demande.strftime("%d/%m/%Y %H:%M") if releve.date_demande else None
             })
-        except ReleveNote.DoesNotExist:
+        except modele_releve.DoesNotExist:
             pass
 
         try:
-            cert = CertificatScolarite.objects.select_related('etudiant__user').get(id_certificat__iexact=numero)
+            cert = modele_certificat.objects.select_related('etudiant__user').get(id_certificat__iexact=numero)
             resultats.append({
                 'type': 'certificat',
                 'id': cert.id,
@@ -565,11 +456,11 @@ class RechercherDemandeParNumeroView(APIView):
                 'statut': cert.get_statut_display(),
                 'date_demande': cert.date_demande.strftime("%d/%m/%Y %H:%M") if cert.date_demande else None
             })
-        except CertificatScolarite.DoesNotExist:
+        except modele_certificat.DoesNotExist:
             pass
 
         try:
-            att = Attestation.objects.select_related('etudiant__user').get(id_attestation__iexact=numero)
+            att = modele_attestation.objects.select_related('etudiant__user').get(id_attestation__iexact=numero)
             resultats.append({
                 'type': 'attestation',
                 'id': att.id,
@@ -589,7 +480,7 @@ class RechercherDemandeParNumeroView(APIView):
                 'statut': att.get_statut_display(),
                 'date_demande': att.date_demande.strftime("%d/%m/%Y %H:%M") if att.date_demande else None
             })
-        except Attestation.DoesNotExist:
+        except modele_attestation.DoesNotExist:
             pass
 
         if not resultats:
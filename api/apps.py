@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        if getattr(settings, 'METRICS_ENABLED', False):
+            from gestion_papier_scolarite.utils.metrics import connecter_signaux
+            connecter_signaux()
@@ -0,0 +1,127 @@
+# api/authentication.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import LazyObject, empty
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+# ====================== CACHE UTILISATEURS (PAR PROCESSUS) ======================
+_cache_utilisateurs = {}
+_cache_lock = threading.Lock()
+TAILLE_MAX_CACHE = 10000
+
+
+def _entree_cache(user_id):
+    """
+    (expiration, noms des colonnes, valeurs) de l'utilisateur, lue dans le cache local
+    au processus (durée JWT_USER_CACHE_TTL). Clé : str(user_id), car le claim du token
+    et instance.pk (invalidation) n'ont pas le même type.
+    """
+    cle = str(user_id)
+    maintenant = time.monotonic()
+    entree = _cache_utilisateurs.get(cle)
+    if entree is None or entree[0] < maintenant:
+        try:
+            user = User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("Utilisateur introuvable", code='user_not_found')
+        noms = [field.attname for field in User._meta.concrete_fields]
+        entree = (
+            maintenant + getattr(settings, 'JWT_USER_CACHE_TTL', 30),
+            noms,
+            [getattr(user, nom) for nom in noms],
+        )
+        with _cache_lock:
+            if len(_cache_utilisateurs) >= TAILLE_MAX_CACHE:
+                _cache_utilisateurs.clear()
+            _cache_utilisateurs[cle] = entree
+    return entree
+
+
+def get_cached_user(user_id):
+    """
+    Instance User chargée depuis le cache local au processus.
+    Chaque appel renvoie une nouvelle instance : aucune modification n'est partagée entre requêtes.
+    La copie peut dater de JWT_USER_CACHE_TTL et l'invalidation ne touche que le
+    processus qui écrit : save() n'y écrit donc que les colonnes modifiées, pour ne
+    pas réécrire un mot de passe, un rôle ou un is_active changé ailleurs.
+    """
+    _, noms, valeurs = _entree_cache(user_id)
+    user = User.from_db(DEFAULT_DB_ALIAS, noms, list(valeurs))
+    user.save_dirty_fields_only = True
+    return user
+
+
+def is_cached_user_active(user_id):
+    """is_active lu dans la ligne en cache, sans construire d'instance"""
+    _, noms, valeurs = _entree_cache(user_id)
+    return valeurs[noms.index('is_active')]
+
+
+def invalidate_cached_user(user_id):
+    with _cache_lock:
+        _cache_utilisateurs.pop(str(user_id), None)
+
+
+# ====================== UTILISATEUR CONSTRUIT DEPUIS LE TOKEN ======================
+class UtilisateurJWT(LazyObject):
+    """
+    Utilisateur léger construit à partir des claims du token d'accès.
+    id, pk et role sont lus dans le token sans requête ;
+    tout autre attribut charge le modèle User complet (via le cache par processus)
+    et l'objet se comporte alors exactement comme l'instance User.
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        self.__dict__['_claims'] = {
+            'id': user_id,
+            'pk': user_id,
+            'role': token.get('role'),
+            'is_authenticated': True,
+            'is_anonymous': False,
+            # Vérifié par StatelessJWTAuthentication.get_user() avant construction
+            'is_active': True,
+        }
+        super().__init__()
+
+    def _setup(self):
+        self._wrapped = get_cached_user(self._claims['pk'])
+
+    def __getattr__(self, name):
+        if self._wrapped is empty and name in self._claims:
+            return self._claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        if self._wrapped is empty:
+            return f"<UtilisateurJWT: {self._claims['pk']} ({self._claims['role']})>"
+        return repr(self._wrapped)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Authentification JWT sans requête SQL : l'utilisateur est construit depuis
+    le claim 'role' ajouté par RoleTokenObtainPairSerializer (relu en base à chaque
+    rafraîchissement par RoleTokenRefreshSerializer). Le compte doit être actif :
+    is_active est lu dans le cache utilisateur (une requête par TTL et par processus).
+    Les anciens tokens (sans claim 'role') passent par le chargement classique.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token or api_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        if not is_cached_user_active(validated_token[api_settings.USER_ID_CLAIM]):
+            raise AuthenticationFailed("Utilisateur inactif", code='user_inactive')
+        return UtilisateurJWT(validated_token)
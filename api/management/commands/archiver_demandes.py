@@ -0,0 +1,59 @@
+# api/management/commands/archiver_demandes.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from Attestation.models import Attestation, AttestationArchive
+from CertificatScolarite.models import CertificatScolarite, CertificatScolariteArchive
+from gestion_papier_scolarite.utils.archive import archiver_lot, date_limite_archivage, demandes_archivables
+from releveNote.models import ReleveNote, ReleveNoteArchive
+
+MODELES = [
+    (ReleveNote, ReleveNoteArchive),
+    (CertificatScolarite, CertificatScolariteArchive),
+    (Attestation, AttestationArchive),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplace par lots les demandes terminées depuis plus de N ans "
+        "vers les tables d'archive (consultables avec ?archive=1)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--annees', type=int, default=None, help="Défaut : ARCHIVE_APRES_ANNEES")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help="Pause en secondes entre deux lots")
+        parser.add_argument('--dry-run', action='store_true', help="Compte sans rien déplacer")
+
+    def handle(self, *args, **options):
+        avant = date_limite_archivage(options['annees'])
+        taille = options['batch_size']
+
+        for model, modele_archive in MODELES:
+            archivables = demandes_archivables(model, avant)
+            if options['dry_run']:
+                self.stdout.write(f"{model.__name__} : {archivables.count()} demande(s) à archiver")
+                continue
+
+            total, conflits, dernier = 0, [], 0
+            while True:
+                # Pagination par clé : les demandes laissées en place ne sont pas reprises
+                ids = list(archivables.filter(pk__gt=dernier).order_by('pk').values_list('pk', flat=True)[:taille])
+                if not ids:
+                    break
+                dernier = ids[-1]
+                archivees, en_conflit = archiver_lot(archivables, modele_archive, ids)
+                total += archivees
+                conflits += en_conflit
+                if options['pause']:
+                    time.sleep(options['pause'])
+
+            self.stdout.write(self.style.SUCCESS(f"{model.__name__} : {total} demande(s) archivée(s)"))
+            if conflits:
+                self.stdout.write(self.style.WARNING(
+                    f"{model.__name__} : {len(conflits)} demande(s) laissée(s) en place, identifiant déjà "
+                    f"présent dans {modele_archive.__name__} : {', '.join(map(str, conflits[:20]))}"
+                ))
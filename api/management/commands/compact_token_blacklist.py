@@ -0,0 +1,59 @@
+# api/management/commands/compact_token_blacklist.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime par lots les tokens de rafraîchissement expirés "
+        "(OutstandingToken et BlacklistedToken associés)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--pause', type=float, default=0.0,
+            help="Pause en secondes entre deux lots (laisse respirer la base en production)"
+        )
+
+    def handle(self, *args, **options):
+        maintenant = timezone.now()
+        taille = options['batch_size']
+        pause = options['pause']
+        total_outstanding = total_blacklisted = 0
+        dernier_id = 0
+
+        while True:
+            # Parcours par clé primaire (index) : les plus anciens tokens
+            # sont en tête, sans balayer toute la table à chaque lot.
+            ids = list(
+                OutstandingToken.objects
+                .filter(pk__gt=dernier_id, expires_at__lte=maintenant)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:taille]
+            )
+            if not ids:
+                break
+            dernier_id = ids[-1]
+
+            # Transaction courte par lot : verrous limités à ces lignes.
+            # Un token expiré ne peut plus être rafraîchi, donc aucune
+            # requête en cours ne peut le modifier en même temps.
+            # only('pk') : la cascade n'a pas besoin de charger le texte des tokens.
+            with transaction.atomic():
+                _, par_modele = OutstandingToken.objects.filter(pk__in=ids).only('pk').delete()
+            total_outstanding += par_modele.get(OutstandingToken._meta.label, 0)
+            total_blacklisted += par_modele.get(BlacklistedToken._meta.label, 0)
+
+            if pause:
+                time.sleep(pause)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_outstanding} token(s) expiré(s) et "
+            f"{total_blacklisted} entrée(s) de liste noire supprimé(s)"
+        ))
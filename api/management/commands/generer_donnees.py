@@ -0,0 +1,80 @@
+# api/management/commands/generer_donnees.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import User
+from Attestation.models import Attestation
+from CertificatScolarite.models import CertificatScolarite
+from gestion_papier_scolarite.utils.factories import (
+    creer_attestations,
+    creer_certificats,
+    creer_etudiants,
+    creer_releves,
+    reprendre_sequence,
+)
+from releveNote.models import ReleveNote
+
+# Surtout des demandes traitées, comme en production (attribués à tour de rôle)
+STATUTS_PONDERES = ['en_attente', 'en_cours'] + ['pret'] * 8
+
+# Part de chaque type dans --demandes
+REPARTITION = [
+    (ReleveNote, creer_releves, 0.4),
+    (CertificatScolarite, creer_certificats, 0.3),
+    (Attestation, creer_attestations, 0.3),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données synthétique (bulk_create) pour les benchmarks : "
+        "étudiants et demandes réparties sur plusieurs années et statuts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--etudiants', type=int, default=100_000)
+        parser.add_argument('--demandes', type=int, default=1_000_000, help="Total, tous types confondus")
+        parser.add_argument('--annees', type=int, default=3, help="Dates de demande sur les N dernières années")
+        parser.add_argument('--graine', type=int, default=42, help="Graine aléatoire (jeu reproductible)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--force', action='store_true', help="Autorise l'exécution avec DEBUG=False (hors profil perf)")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and getattr(settings, 'PROFIL', None) != 'perf' and not options['force']:
+            raise CommandError("DEBUG=False : base de production ? Relancer avec --force pour confirmer.")
+
+        taille = options['batch_size']
+        # Numéros (emails, immatricules, R-F…) après ceux d'une génération précédente
+        reprendre_sequence(1 + User.objects.count() + sum(model.objects.count() for model, _, _ in REPARTITION))
+
+        debut = time.perf_counter()
+        etudiants = []
+        for offset in range(0, options['etudiants'], taille):
+            with transaction.atomic():
+                etudiants += creer_etudiants(min(taille, options['etudiants'] - offset), batch_size=taille)
+        self.stdout.write(f"{len(etudiants)} étudiant(s) ({time.perf_counter() - debut:.1f} s)")
+        if not etudiants:
+            return
+
+        for model, creer, part in REPARTITION:
+            debut = time.perf_counter()
+            nombre = int(options['demandes'] * part)
+            for offset in range(0, nombre, taille):
+                lot = min(taille, nombre - offset)
+                # Rotation : chaque lot continue la répartition sur tous les étudiants
+                proprietaires = [etudiants[(offset + i) % len(etudiants)] for i in range(lot)]
+                with transaction.atomic():
+                    creer(
+                        proprietaires, lot,
+                        statuts=STATUTS_PONDERES,
+                        jours=options['annees'] * 365,
+                        graine=options['graine'] + offset,
+                        batch_size=taille,
+                    )
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__} : {nombre} demande(s) ({time.perf_counter() - debut:.1f} s)"
+            ))
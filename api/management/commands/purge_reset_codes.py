@@ -0,0 +1,31 @@
+# api/management/commands/purge_reset_codes.py
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import PasswordResetCode
+
+
+class Command(BaseCommand):
+    help = "Supprime les codes de réinitialisation expirés (par lots)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        maintenant = timezone.now()
+        taille = options['batch_size']
+        total = 0
+
+        while True:
+            ids = list(
+                PasswordResetCode.objects
+                .filter(expires_at__lt=maintenant)
+                .values_list('pk', flat=True)[:taille]
+            )
+            if not ids:
+                break
+            supprimes, _ = PasswordResetCode.objects.filter(pk__in=ids).delete()
+            total += supprimes
+
+        self.stdout.write(self.style.SUCCESS(f"{total} code(s) expiré(s) supprimé(s)"))
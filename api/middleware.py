@@ -0,0 +1,265 @@
+# api/middleware.py
+
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+from rest_framework.permissions import SAFE_METHODS
+
+from gestion_papier_scolarite.utils.db_router import (
+    activer_lecture_replica,
+    lecture_replica,
+    replica_disponible,
+)
+from gestion_papier_scolarite.utils.instrumentation import Mesure, mesurer, server_timing
+from gestion_papier_scolarite.utils.logging_utils import definir_correlation_id, reinitialiser_correlation_id
+from gestion_papier_scolarite.utils.metrics import registre as registre_metriques
+from gestion_papier_scolarite.utils.profiling import enregistrer as enregistrer_profil, lire_jeton, profiler
+from gestion_papier_scolarite.utils.slow_queries import DetecteurRequetesLentes, _vue_courante
+
+from .permissions import get_etudiant
+
+logger_instrumentation = logging.getLogger('gestion_papier_scolarite.instrumentation')
+
+
+class CorrelationIdMiddleware:
+    """
+    Identifiant de corrélation de la requête : X-Request-ID du proxy s'il est
+    valide, sinon généré. Ajouté à chaque log (CorrelationIdFilter) et renvoyé
+    dans l'en-tête X-Request-ID de la réponse.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        jeton = definir_correlation_id(request.headers.get('X-Request-ID'))
+        try:
+            request.correlation_id = jeton.var.get()
+            response = self.get_response(request)
+        finally:
+            reinitialiser_correlation_id(jeton)
+        response['X-Request-ID'] = request.correlation_id
+        return response
+
+
+class EtudiantMiddleware:
+    """
+    Ajoute request.etudiant : profil étudiant de l'utilisateur connecté,
+    chargé à la première utilisation (après l'authentification DRF/JWT)
+    puis mis en cache pour le reste de la requête.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.etudiant = SimpleLazyObject(lambda: get_etudiant(request))
+        return self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """
+    Lectures sur le réplica pour les vues déclarant lecture_replica = True
+    (tableaux de bord, statistiques, listes), en GET/HEAD uniquement.
+
+    Lecture de ses propres écritures : après une requête d'écriture réussie,
+    un cookie de courte durée (REPLICA_STICKY_SECONDS) renvoie les lectures
+    de ce client sur la base principale le temps que le réplica rattrape son retard.
+    """
+    COOKIE = 'lecture_primaire'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Le contexte est rétabli en fin de requête, quoi que fasse process_view
+        with lecture_replica(actif=False):
+            response = self.get_response(request)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_disponible():
+            response.set_cookie(
+                self.COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 5),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        vue = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if (
+            getattr(vue, 'lecture_replica', False)
+            and request.method in SAFE_METHODS
+            and self.COOKIE not in request.COOKIES
+        ):
+            activer_lecture_replica()
+        return None
+
+
+class InstrumentationMiddleware:
+    """
+    Mesure par requête (INSTRUMENTATION_ENABLED) : nombre et durée des requêtes SQL,
+    requêtes les plus lentes, sérialisation JSON, envois d'email.
+    Résultat dans l'en-tête Server-Timing et une ligne de log clé=valeur.
+
+    Désactivée, la middleware est retirée de la chaîne au démarrage (aucun coût) ;
+    activée, seule une fraction INSTRUMENTATION_SAMPLE_RATE des requêtes est mesurée.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.taux = getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 1.0)
+        self.nb_lentes = getattr(settings, 'INSTRUMENTATION_SLOW_QUERIES', 3)
+
+    def __call__(self, request):
+        if self.taux < 1 and random.random() >= self.taux:
+            return self.get_response(request)
+
+        with ExitStack() as pile:
+            mesure = pile.enter_context(mesurer(Mesure(self.nb_lentes)))
+            for connexion in connections.all():
+                pile.enter_context(connexion.execute_wrapper(mesure))
+            response = self.get_response(request)
+
+        response['Server-Timing'] = server_timing(mesure)
+        self.journaliser(request, response, mesure)
+        return response
+
+    def journaliser(self, request, response, mesure):
+        champs = {
+            'methode': request.method,
+            'chemin': request.path,
+            'statut': response.status_code,
+            'requetes': mesure.requetes,
+            'db_ms': round(mesure.duree_sql * 1000, 1),
+            'total_ms': round(mesure.duree_totale() * 1000, 1),
+            **{f'{etape}_ms': round(duree * 1000, 1) for etape, duree in mesure.etapes.items()},
+        }
+        logger_instrumentation.info(
+            ' '.join(f'{cle}={valeur}' for cle, valeur in champs.items()),
+            extra={
+                'mesure': champs,
+                'requetes_lentes': [
+                    {'ms': round(duree * 1000, 1), 'sql': sql} for duree, sql in mesure.requetes_lentes()
+                ],
+            },
+        )
+
+
+class SlowQueryMiddleware:
+    """
+    Détection des requêtes SQL lentes (SLOW_QUERY_ENABLED) : au-delà de
+    SLOW_QUERY_THRESHOLD_MS, la requête est journalisée avec ses paramètres,
+    la vue appelante et son plan EXPLAIN (une fois par empreinte),
+    puis agrégée dans le registre consultable par la scolarité.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SLOW_QUERY_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.seuil_ms = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200)
+
+    def __call__(self, request):
+        jeton = _vue_courante.set(None)
+        try:
+            with ExitStack() as pile:
+                for connexion in connections.all():
+                    pile.enter_context(connexion.execute_wrapper(DetecteurRequetesLentes(connexion, self.seuil_ms)))
+                return self.get_response(request)
+        finally:
+            _vue_courante.reset(jeton)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        vue = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+        _vue_courante.set(f"{vue.__module__}.{vue.__qualname__}")
+        return None
+
+
+class MetricsMiddleware:
+    """
+    Métriques Prometheus par requête (METRICS_ENABLED), exposées sur /metrics :
+    nombre, durée et taille des réponses par route, requêtes SQL par requête.
+    La route (motif d'URL) sert de label : cardinalité bornée par urls.py.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        compteur = [0]
+
+        def compter(execute, sql, params, many, context):
+            compteur[0] += 1
+            return execute(sql, params, many, context)
+
+        debut = time.perf_counter()
+        with ExitStack() as pile:
+            for connexion in connections.all():
+                pile.enter_context(connexion.execute_wrapper(compter))
+            response = self.get_response(request)
+        duree = time.perf_counter() - debut
+
+        match = getattr(request, 'resolver_match', None)
+        vue = getattr(match, 'route', None) or 'non_resolue'
+        registre_metriques.incrementer(
+            'http_requests_total', vue=vue, methode=request.method, statut=response.status_code,
+        )
+        registre_metriques.observer('http_request_duration_seconds', duree, vue=vue, methode=request.method)
+        registre_metriques.observer('db_queries_per_request', compteur[0], vue=vue)
+        if not response.streaming:
+            registre_metriques.observer('http_response_size_bytes', len(response.content), vue=vue)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profilage à la demande (PROFILING_ENABLED) : une requête portant un jeton signé
+    (en-tête X-Profilage uniquement, jamais en paramètre d'URL qui finirait dans
+    les logs d'accès ; délivré à la scolarité par POST /api/supervision/profils/)
+    est exécutée sous cProfile ou tracemalloc, selon PROFILING_SAMPLE_RATE.
+    Le rapport n'est conservé que si la requête est authentifiée par le compte
+    à qui le jeton a été délivré : il est alors écrit dans PROFILING_DIR et son
+    identifiant renvoyé dans l'en-tête X-Profil-Id.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        jeton = request.headers.get('X-Profilage')
+        donnees = lire_jeton(jeton) if jeton else None
+        if donnees is None or random.random() >= getattr(settings, 'PROFILING_SAMPLE_RATE', 1.0):
+            return self.get_response(request)
+
+        response, rapport, profil, duree = profiler(donnees['mode'], lambda: self.get_response(request))
+        if rapport is None:
+            return response  # un autre profilage est en cours dans ce processus
+        # request.user n'est connu qu'après l'authentification DRF (dans la vue)
+        user = getattr(request, 'user', None)
+        if not getattr(user, 'is_authenticated', False) or str(user.pk) != str(donnees['user']):
+            return response
+
+        match = getattr(request, 'resolver_match', None)
+        response['X-Profil-Id'] = enregistrer_profil({
+            'mode': donnees['mode'],
+            'methode': request.method,
+            'chemin': request.path,
+            'vue': getattr(match, 'view_name', None) or getattr(match, 'route', None),
+            'statut': response.status_code,
+            'duree_ms': round(duree * 1000, 1),
+            'user': donnees['user'],
+            'correlation_id': getattr(request, 'correlation_id', None),
+        }, rapport, profil)
+        return response
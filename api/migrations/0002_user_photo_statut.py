@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='photo_statut',
+            field=models.CharField(blank=True, choices=[('en_traitement', 'En traitement'), ('prete', 'Prête'), ('echec', 'Échec du traitement')], default='', help_text='État du traitement de la photo (redimensionnement et miniatures)', max_length=15),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:28
+
+import api.models
+import django.core.validators
+import gestion_papier_scolarite.utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_user_photo_statut'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='photo_profil',
+            field=models.ImageField(blank=True, help_text='Photo de profil (optionnel). Formats acceptés: JPG, PNG, GIF', null=True, storage=gestion_papier_scolarite.utils.storage.ContentAddressedStorage(), upload_to=api.models.user_profile_image_path, validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'gif'])]),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_user_photo_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='reset_token',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='reset_token_expiration',
+        ),
+        migrations.CreateModel(
+            name='PasswordResetCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('code_hash', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField()),
+                ('tentatives', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['email', 'expires_at'], name='reset_code_email_exp_idx'), models.Index(fields=['expires_at'], name='reset_code_expires_idx')],
+            },
+        ),
+    ]
@@ -3,21 +3,36 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.contrib.auth.base_user import BaseUserManager
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.validators import FileExtensionValidator
-import os
+import logging
+
+from gestion_papier_scolarite.utils.model_utils import ChangeTrackingMixin
+from gestion_papier_scolarite.utils.storage import ContentAddressedStorage, content_addressed_name
+from gestion_papier_scolarite.utils.upload_handlers import content_hash
+from gestion_papier_scolarite.utils.image_utils import (
+    DOSSIER_PHOTOS,
+    delete_photo_variants,
+    get_formats_miniatures,
+    get_tailles_miniatures,
+    nom_miniature,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # ====================== FONCTION POUR LE CHEMIN DE L'IMAGE ======================
 def user_profile_image_path(instance, filename):
     """
-    Génère un chemin personnalisé pour les photos de profil
-    Exemple: profile_photos/user_123/photo.jpg
+    Génère un chemin adressé par contenu pour les photos de profil
+    Exemple: profile_photos/ab/ab12...ef.jpg (SHA-256 du fichier uploadé)
+    Deux uploads identiques partagent le même fichier ; la version traitée
+    prend ensuite le nom de sa propre empreinte (image_utils.traiter_image).
     """
     ext = filename.split('.')[-1]
-    filename = f"photo_{instance.id}.{ext}"
-    return os.path.join('profile_photos', f'user_{instance.id}', filename)
+    digest = content_hash(instance.photo_profil.file)
+    return content_addressed_name(DOSSIER_PHOTOS, digest, ext)
 
 
 # ====================== USER MANAGER ======================
@@ -39,7 +54,7 @@ class UserManager(BaseUserManager):
 
 
 # ====================== USER MODEL ======================
-class User(AbstractBaseUser, PermissionsMixin):
+class User(ChangeTrackingMixin, AbstractBaseUser, PermissionsMixin):
     ROLE_CHOICES = (
         ('etudiant', 'Étudiant'),
         ('scolarite', 'Scolarité'),
@@ -53,22 +68,30 @@ class User(AbstractBaseUser, PermissionsMixin):
     # ============ PHOTO DE PROFIL (NOUVEAU) ============
     photo_profil = models.ImageField(
         upload_to=user_profile_image_path,
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
         validators=[FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'gif'])],
         help_text="Photo de profil (optionnel). Formats acceptés: JPG, PNG, GIF"
     )
+    PHOTO_STATUT_CHOICES = (
+        ('en_traitement', 'En traitement'),
+        ('prete', 'Prête'),
+        ('echec', 'Échec du traitement'),
+    )
+    photo_statut = models.CharField(
+        max_length=15,
+        choices=PHOTO_STATUT_CHOICES,
+        blank=True,
+        default='',
+        help_text="État du traitement de la photo (redimensionnement et miniatures)"
+    )
     # ===================================================
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     is_superuser = models.BooleanField(default=False)
 
-    # ============ CHAMPS POUR LA RÉINITIALISATION ============
-    reset_token = models.CharField(max_length=10, blank=True, null=True)
-    reset_token_expiration = models.DateTimeField(blank=True, null=True)
-    # =========================================================
-
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["nom", "prenoms", "role"]
 
@@ -77,6 +100,21 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.nom} {self.prenoms} ({self.get_role_display()})"
 
+    def save(self, *args, **kwargs):
+        # Seuls les comptes 'scolarite' ont les droits admin Django.
+        # Appliqué avant super().save() : avec save_dirty_fields_only, is_staff /
+        # is_superuser font ainsi partie des champs modifiés enregistrés.
+        if self.role == 'scolarite':
+            self.is_staff = True
+            self.is_superuser = True
+        super().save(*args, **kwargs)
+
+    def get_full_name(self):
+        return f"{self.nom} {self.prenoms}".strip()
+
+    def get_short_name(self):
+        return self.prenoms or self.nom
+
     def get_photo_url(self):
         """
         Retourne l'URL de la photo de profil ou None si pas de photo
@@ -85,6 +123,22 @@ class User(AbstractBaseUser, PermissionsMixin):
             return self.photo_profil.url
         return None
 
+    def get_photo_variants(self):
+        """
+        Retourne les URLs des miniatures {taille: {format: url}}
+        ou None si pas de photo ou si le traitement n'est pas terminé
+        """
+        if not self.photo_profil or self.photo_statut != 'prete':
+            return None
+        storage = self.photo_profil.storage
+        return {
+            str(taille): {
+                ext: storage.url(nom_miniature(self.photo_profil.name, taille, ext))
+                for ext in get_formats_miniatures()
+            }
+            for taille in get_tailles_miniatures()
+        }
+
     def has_photo(self):
         """
         Vérifie si l'utilisateur a une photo de profil
@@ -93,39 +147,47 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 
 # ====================== SIGNAL CORRIGÉ ======================
-@receiver(pre_save, sender=User)
-def rendre_scolarite_admin_complet(sender, instance, **kwargs):
-    """Seuls les comptes 'scolarite' ont les droits admin Django"""
-    if instance.role == 'scolarite':
-        instance.is_staff = True
-        instance.is_superuser = True
-
-
 @receiver(post_save, sender=User)
 def log_creation_scolarite(sender, instance, created, **kwargs):
     if created and instance.role == 'scolarite':
-        print(f"\n✅ SCOLARITÉ CRÉÉE → {instance.email} | Accès admin activé !\n")
+        logger.info("Compte scolarité créé : %s (accès admin activé)", instance.email, extra={'user_id': instance.pk})
+
+
+# ====================== CACHE D'AUTHENTIFICATION JWT ======================
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalider_cache_utilisateur(sender, instance, **kwargs):
+    """Le cache utilisateur de StatelessJWTAuthentication ne doit pas survivre à une modification"""
+    from api.authentication import invalidate_cached_user
+    invalidate_cached_user(instance.pk)
 
 
 # ====================== SIGNAL POUR SUPPRIMER L'ANCIENNE PHOTO ======================
-@receiver(pre_save, sender=User)
-def delete_old_profile_photo(sender, instance, **kwargs):
+@receiver(post_save, sender=User)
+def delete_old_profile_photo(sender, instance, created, **kwargs):
     """
-    Supprime l'ancienne photo de profil lorsqu'une nouvelle est uploadée
+    Supprime l'ancienne photo de profil lorsqu'une nouvelle est enregistrée
+    (post_save : le nom définitif de la nouvelle photo est alors connu)
     """
-    if not instance.pk:
+    if created:
         return False
 
-    try:
-        old_user = User.objects.get(pk=instance.pk)
-    except User.DoesNotExist:
+    # Valeurs mémorisées au chargement : pas de requête supplémentaire
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'photo_profil' not in update_fields:
+        return False
+    if not instance.has_changed('photo_profil'):
         return False
 
-    # Si l'ancienne photo existe et qu'elle est différente de la nouvelle
-    if old_user.photo_profil and old_user.photo_profil != instance.photo_profil:
-        # Supprimer l'ancien fichier du système de fichiers
-        if os.path.isfile(old_user.photo_profil.path):
-            os.remove(old_user.photo_profil.path)
+    ancienne = instance.get_original('photo_profil')
+    # Stockage adressé par contenu : le fichier peut être partagé par d'autres comptes
+    if ancienne and not User.objects.filter(photo_profil=ancienne).exists():
+        # Supprimer l'ancien fichier et ses miniatures
+        old_photo = instance.photo_profil.field.attr_class(
+            instance, instance.photo_profil.field, ancienne
+        )
+        delete_photo_variants(old_photo)
+        old_photo.storage.delete(ancienne)
 
 
 # ====================== PROFILS ETUDIANT ======================
@@ -152,4 +214,27 @@ class Scolarite(models.Model):
 
     def get_photo_url(self):
         """Raccourci pour accéder à la photo via le profil scolarité"""
-        return self.user.get_photo_url()
\ No newline at end of file
+        return self.user.get_photo_url()
+
+
+# ====================== CODES DE RÉINITIALISATION ======================
+class PasswordResetCode(models.Model):
+    """
+    Code de réinitialisation de mot de passe, stocké haché (HMAC) et
+    séparé de la table User : demander ou vérifier un code ne réécrit
+    pas la ligne utilisateur. Purge : manage.py purge_reset_codes
+    """
+    email = models.EmailField()
+    code_hash = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['email', 'expires_at'], name='reset_code_email_exp_idx'),
+            models.Index(fields=['expires_at'], name='reset_code_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"Code de réinitialisation - {self.email}"
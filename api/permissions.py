@@ -0,0 +1,67 @@
+# api/permissions.py
+
+from rest_framework.permissions import BasePermission
+
+from .models import Etudiant
+
+
+def get_etudiant(request):
+    """
+    Profil étudiant de l'utilisateur connecté, résolu une seule fois par requête
+    (une requête avec select_related('user')). None pour la scolarité ou un anonyme.
+    """
+    http_request = getattr(request, '_request', request)
+    if not hasattr(http_request, '_etudiant_cache'):
+        user = getattr(http_request, 'user', None)
+        etudiant = None
+        if user is not None and user.is_authenticated and getattr(user, 'role', None) == 'etudiant':
+            etudiant = Etudiant.objects.select_related('user').filter(user_id=user.pk).first()
+        http_request._etudiant_cache = etudiant
+    return http_request._etudiant_cache
+
+
+def filtrer_demandes_accessibles(request, queryset):
+    """
+    Restreint un queryset de demandes à celles visibles par l'utilisateur :
+    toutes pour la scolarité, les siennes pour un étudiant.
+    La vérification de propriété devient un simple filtre SQL
+    (filter(pk=..., etudiant__user=request.user)) au lieu d'une comparaison en Python.
+    """
+    user = request.user
+    if user.role == 'scolarite':
+        return queryset
+    if user.role == 'etudiant':
+        return queryset.filter(etudiant__user_id=user.pk)
+    return queryset.none()
+
+
+class IsEtudiant(BasePermission):
+    """Utilisateur connecté avec un profil étudiant (disponible dans request.etudiant)"""
+    message = "Accès réservé aux étudiants."
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and get_etudiant(request))
+
+
+class IsScolarite(BasePermission):
+    """Personnel de la scolarité uniquement"""
+    message = "Réservé à la scolarité."
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role == 'scolarite')
+
+
+class IsEtudiantOrScolarite(BasePermission):
+    """Étudiant (sur ses propres demandes) ou scolarité (sur toutes)"""
+    message = "Accès refusé."
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user and request.user.is_authenticated
+            and request.user.role in ('etudiant', 'scolarite')
+        )
+
+    def has_object_permission(self, request, view, obj):
+        if request.user.role == 'scolarite':
+            return True
+        return getattr(obj, 'etudiant_id', None) == getattr(get_etudiant(request), 'pk', None)
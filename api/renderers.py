@@ -0,0 +1,13 @@
+# api/renderers.py
+
+from rest_framework.renderers import JSONRenderer
+
+from gestion_papier_scolarite.utils.instrumentation import chronometre
+
+
+class JSONRendererMesure(JSONRenderer):
+    """JSONRenderer dont la durée est rapportée dans l'étape 'serialisation' (Server-Timing)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with chronometre('serialisation'):
+            return super().render(data, accepted_media_type, renderer_context)
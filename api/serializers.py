@@ -5,6 +5,22 @@ from api.models import User, Etudiant, Scolarite
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.contrib.auth.hashers import make_password, check_password
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def get_photo_variants_urls(user, request=None):
+    """
+    URLs (absolues si la requête est disponible) des miniatures de la photo de profil
+    """
+    variants = user.get_photo_variants()
+    if not variants or not request:
+        return variants
+    return {
+        taille: {ext: request.build_absolute_uri(url) for ext, url in formats.items()}
+        for taille, formats in variants.items()
+    }
 
 
 # ===================================================================
@@ -12,6 +28,7 @@ from django.contrib.auth.hashers import make_password, check_password
 # ===================================================================
 class UserSerializer(serializers.ModelSerializer):
     photo_url = serializers.SerializerMethodField()
+    photo_variants = serializers.SerializerMethodField()
     password = serializers.CharField(
         write_only=True, 
         required=True, 
@@ -28,12 +45,15 @@ class UserSerializer(serializers.ModelSerializer):
             'role', 
             'photo_profil',  # Champ pour l'upload
             'photo_url',     # URL pour l'affichage
+            'photo_variants',  # Miniatures 64/256 px (WebP, JPEG)
+            'photo_statut',    # en_traitement → prete
             'is_active',
             'password'
         ]
         extra_kwargs = {
             'password': {'write_only': True},
             'photo_profil': {'required': False},
+            'photo_statut': {'read_only': True},
             'role': {'required': False},
             'email': {'required': True},
             'nom': {'required': True},
@@ -51,6 +71,9 @@ class UserSerializer(serializers.ModelSerializer):
             return obj.photo_profil.url
         return None
 
+    def get_photo_variants(self, obj):
+        return get_photo_variants_urls(obj, self.context.get('request'))
+
     def validate_password(self, value):
         """Valider le mot de passe avec les validateurs Django"""
         try:
@@ -149,7 +172,9 @@ class EtudiantSerializer(serializers.ModelSerializer):
         if 'photo_profil' in validated_data:
             user.photo_profil = validated_data['photo_profil']
         
-        user.save()
+        # Aucune donnée du compte modifiée (ex. contact seul) : pas d'UPDATE
+        if user.get_dirty_fields():
+            user.save()
         
         return instance
 
@@ -270,6 +295,8 @@ class UserUpdateSerializer(serializers.ModelSerializer):
                 })
             
             # Vérifier que le mot de passe actuel est correct
+            # (hash relu en base : l'instance peut venir du cache utilisateur)
+            user.refresh_from_db(fields=['password'])
             if not check_password(current_password, user.password):
                 raise serializers.ValidationError({
                     "current_password": "Le mot de passe actuel est incorrect."
@@ -348,10 +375,14 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
 class UserSimpleSerializer(serializers.ModelSerializer):
     """Version simplifiée pour les listes"""
     photo_url = serializers.SerializerMethodField()
+    photo_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = User
-        fields = ['id', 'email', 'nom', 'prenoms', 'role', 'photo_url']
+        fields = ['id', 'email', 'nom', 'prenoms', 'role', 'photo_url', 'photo_variants', 'photo_statut']
+
+    def get_photo_variants(self, obj):
+        return get_photo_variants_urls(obj, self.context.get('request'))
     
     def get_photo_url(self, obj):
         request = self.context.get('request')
@@ -368,4 +399,40 @@ class EtudiantSimpleSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Etudiant
-        fields = ['id', 'user', 'immatricule', 'contact']
\ No newline at end of file
+        fields = ['id', 'user', 'immatricule', 'contact']
+
+
+# ===================================================================
+# 8. TOKEN JWT (claim role)
+# ===================================================================
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Ajoute 'role' aux tokens : StatelessJWTAuthentication construit
+    request.user depuis ce claim sans interroger la table User.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['role'] = user.role
+        return token
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token dont le claim 'role' est relu en base au décodage : les tokens
+    d'accès émis (et le refresh tourné) suivent un changement de rôle, au lieu
+    de reprendre celui de la connexion pendant toute la durée du refresh.
+    """
+
+    def __init__(self, token=None, verify=True):
+        super().__init__(token, verify=verify)
+        if token is not None:
+            self.payload['role'] = (
+                User.objects.filter(pk=self.payload.get(jwt_settings.USER_ID_CLAIM))
+                .values_list('role', flat=True).first()
+            )
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RoleRefreshToken
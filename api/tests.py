@@ -1,3 +1,713 @@
-from django.test import TestCase
+import hashlib
+import os
+import tempfile
+from concurrent.futures import Future
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from CertificatScolarite.models import CertificatScolarite
+from Scolarite.views import StatistiquesScolariteView
+from gestion_papier_scolarite.utils.db_router import ALIAS_REPLICA, ReplicaRouter
+from gestion_papier_scolarite.utils.factories import creer_certificats, creer_etudiants, creer_utilisateurs, numero_unique
+from gestion_papier_scolarite.utils.image_utils import _terminer, nom_miniature, noms_miniatures
+from gestion_papier_scolarite.utils.profiling import creer_jeton
+from gestion_papier_scolarite.utils.testing import RequetesBorneesTestCase
+from gestion_papier_scolarite.utils.token_utils import check_reset_code, consume_reset_code, create_reset_code
+
+from .authentication import invalidate_cached_user
+from .middleware import ReplicaMiddleware
+from .models import Etudiant, PasswordResetCode, User
+from .serializers import RoleRefreshToken, RoleTokenObtainPairSerializer
+from .views import GetProfileView
+
+
+def image_png(taille=(32, 32), bruit=False):
+    contenu = BytesIO()
+    image = Image.effect_noise(taille, 64).convert('RGB') if bruit else Image.new('RGB', taille, 'blue')
+    image.save(contenu, 'PNG')
+    return SimpleUploadedFile('photo.png', contenu.getvalue(), content_type='image/png')
+
+
+# ====================== INSCRIPTION / CONNEXION ======================
+class AuthentificationRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_etudiants(nombre)
+
+    def inscription(self, **champs):
+        numero = numero_unique()
+        return {
+            'email': f"inscrit{numero}@test.mg",
+            'nom': "Rakoto",
+            'prenoms': "Jean",
+            'password': "MotDePasse123!",
+            **champs,
+        }
+
+    def test_register_etudiant(self):
+        self.assertRequetesBornees(
+            5,
+            lambda data: self.client.post('/api/register/etudiant/', data, format='json'),
+            self.peupler,
+            preparer=lambda: {'data': self.inscription(immatricule=f"IM{numero_unique()}", contact="0341234567")},
+            statuts=(201,),
+        )
+
+    def test_register_scolarite(self):
+        self.assertRequetesBornees(
+            4,
+            lambda data: self.client.post('/api/register/scolarite/', data),
+            self.peupler,
+            preparer=lambda: {'data': self.inscription(fonction="Agent")},
+            statuts=(201,),
+        )
+
+    def test_token(self):
+        user = User.objects.create_user(email="connexion@test.mg", password="MotDePasse123!", nom="A", prenoms="B")
+        for url in ('/api/token/', '/api/auth/token/'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(
+                    3,
+                    lambda: self.client.post(url, {'email': user.email, 'password': "MotDePasse123!"}, format='json'),
+                    self.peupler,
+                )
+
+    def test_logout(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(
+            0,
+            lambda: self.client.post('/api/auth/logout/'),
+            self.peupler,
+        )
+
+
+class JetonsRoleTests(RequetesBorneesTestCase):
+    """Claim 'role' relu au rafraîchissement, cache utilisateur invalidé et comptes inactifs refusés"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.etudiant.user
+        invalidate_cached_user(self.user.pk)
+        self.refresh = RoleTokenObtainPairSerializer.get_token(self.user)
+
+    def authentifier(self, acces):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {acces}")
+
+    def test_rafraichissement_relit_role(self):
+        self.user.role = 'scolarite'
+        self.user.save()
+        response = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        for cle in ('access', 'refresh'):
+            with self.subTest(token=cle):
+                self.assertEqual(RoleRefreshToken(response.data[cle], verify=False)['role'], 'scolarite')
+
+    def test_cache_invalide_apres_modification(self):
+        self.authentifier(self.refresh.access_token)
+        self.assertEqual(self.client.get('/api/profile/').data['user']['nom'], self.user.nom)
+        self.user.nom = "Renomme"
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/').data['user']['nom'], "Renomme")
+
+    def test_utilisateur_inactif(self):
+        self.authentifier(self.refresh.access_token)
+        self.assertEqual(self.client.get('/api/profile/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+
+    def modifier_en_base(self, **valeurs):
+        """Écriture faite par un autre processus : le cache de celui-ci n'est pas invalidé"""
+        User.objects.filter(pk=self.user.pk).update(**valeurs)
+
+    def test_ecriture_ne_restaure_pas_le_cache(self):
+        self.user.photo_profil = 'profile_photos/absente.png'
+        self.user.save()
+        self.authentifier(self.refresh.access_token)
+        nouveau = make_password("nouveau-mdp-456")
+
+        for methode, url in (('put', '/api/profile/update/'), ('delete', '/api/profile/photo/delete/')):
+            with self.subTest(url=url):
+                self.modifier_en_base(is_active=True, role='etudiant')
+                invalidate_cached_user(self.user.pk)
+                self.assertEqual(self.client.get('/api/profile/').status_code, 200)
+                self.modifier_en_base(password=nouveau, role='scolarite', is_active=False)
+                response = getattr(self.client, methode)(url, {'nom': "Renomme"} if methode == 'put' else None)
+                self.assertEqual(response.status_code, 200, response.data)
+                user = User.objects.get(pk=self.user.pk)
+                self.assertEqual((user.password, user.role, user.is_active), (nouveau, 'scolarite', False))
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual((user.nom, user.photo_profil.name), ("Renomme", ''))
+
+    def test_changement_mot_de_passe_relit_le_hash(self):
+        self.user.set_password("ancien-mdp-123")
+        self.user.save()
+        self.authentifier(self.refresh.access_token)
+        self.assertEqual(self.client.get('/api/profile/').status_code, 200)
+        self.modifier_en_base(password=make_password("nouveau-mdp-456"))
+        response = self.client.post(
+            '/api/profile/password/change/',
+            {'current_password': "ancien-mdp-123", 'new_password': "troisieme-mdp-789"},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password("nouveau-mdp-456"))
+
+
+class LimitationTests(RequetesBorneesTestCase):
+    """Connexion et mot de passe oublié : 429 au-delà de la limite par email (DEFAULT_THROTTLE_RATES)"""
+
+    def setUp(self):
+        super().setUp()
+        for cache in caches.all():
+            cache.clear()
+        self.email = self.etudiant.user.email
+
+    def assertLimite(self, url, data, limite):
+        for _ in range(limite):
+            self.assertNotEqual(self.client.post(url, data, format='json').status_code, 429)
+        self.assertEqual(self.client.post(url, data, format='json').status_code, 429)
+
+    def test_connexion(self):
+        for url in ('/api/auth/login/', '/api/token/', '/api/auth/token/'):
+            with self.subTest(url=url):
+                caches['default'].clear()
+                self.assertLimite(url, {'email': self.email, 'password': "Mauvais123!"}, 5)
+
+    def test_demande_reinitialisation(self):
+        self.assertLimite('/api/request-reset/', {'email': self.email}, 3)
+
+    def test_codes_reinitialisation(self):
+        for url, data in (
+            ('/api/verify-code/', {'email': self.email, 'code': "000000"}),
+            ('/api/reset-password/', {'email': self.email, 'code': "000000", 'new_password': "NouveauMdp123!"}),
+        ):
+            with self.subTest(url=url):
+                caches['default'].clear()
+                self.assertLimite(url, data, 10)
+
+    def test_routes_sans_limite_retirees(self):
+        for url in (
+            '/api/password_reset/', '/api/accounts/password_reset/',
+            '/api/auth/password_reset/', '/api/accounts/login/',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.post(url, {'email': self.email}).status_code, 404)
+
+
+# ====================== SUIVI DES MODIFICATIONS ======================
+class SuiviModificationsTests(RequetesBorneesTestCase):
+    """ChangeTrackingMixin : champs modifiés, et UPDATE partiel uniquement sur demande"""
+
+    def charger(self):
+        return User.objects.get(pk=self.etudiant.user.pk)
+
+    def test_champs_modifies(self):
+        user = self.charger()
+        self.assertEqual(user.get_dirty_fields(), [])
+        user.nom = "Autre"
+        self.assertTrue(user.has_changed('nom'))
+        self.assertFalse(user.has_changed('prenoms'))
+        self.assertEqual(user.get_dirty_fields(), ['nom'])
+        self.assertEqual(user.get_original('nom'), self.etudiant.user.nom)
+        user.save()
+        self.assertFalse(user.has_changed('nom'))
+
+    def test_sauvegarde_complete_par_defaut(self):
+        user = self.charger()
+        User.objects.filter(pk=user.pk).update(prenoms="Concurrent")
+        user.nom = "Autre"
+        user.save()
+        self.assertEqual(User.objects.values_list('nom', 'prenoms').get(pk=user.pk), ("Autre", user.prenoms))
+
+    def test_sauvegarde_partielle(self):
+        user = self.charger()
+        user.save_dirty_fields_only = True
+        User.objects.filter(pk=user.pk).update(prenoms="Concurrent")
+        user.nom = "Autre"
+        user.save()
+        self.assertEqual(User.objects.values_list('nom', 'prenoms').get(pk=user.pk), ("Autre", "Concurrent"))
+
+    def test_ligne_supprimee(self):
+        certificat = CertificatScolarite.objects.get(pk=creer_certificats([self.etudiant], 1)[0].pk)
+        CertificatScolarite.objects.filter(pk=certificat.pk).delete()
+        certificat.statut = 'en_cours'
+        # Comportement Django par défaut : la ligne est réinsérée
+        certificat.save()
+        self.assertTrue(CertificatScolarite.objects.filter(pk=certificat.pk, statut='en_cours').exists())
+
+        CertificatScolarite.objects.filter(pk=certificat.pk).delete()
+        certificat.save_dirty_fields_only = True
+        certificat.statut = 'pret'
+        with self.assertRaises(DatabaseError):
+            certificat.save()
+
+
+# ====================== ÉTUDIANTS ======================
+class EtudiantRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_etudiants(nombre)
+
+    def test_liste(self):
+        self.connecter_scolarite()
+        self.assertRequetesBornees(2, lambda: self.client.get('/api/etudiants/'), self.peupler)
+
+    def test_detail(self):
+        self.connecter_scolarite()
+        self.assertRequetesBornees(
+            2,
+            lambda: self.client.get(f'/api/etudiant/{self.etudiant.pk}/'),
+            self.peupler,
+        )
+
+    def test_me(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(1, lambda: self.client.get('/api/etudiant/me/'), self.peupler)
+
+    def test_modification(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(
+            4,
+            lambda: self.client.put(f'/api/etudiant/{self.etudiant.pk}/', {'contact': "0349999999"}, format='json'),
+            self.peupler,
+        )
+
+    def test_suppression(self):
+        self.connecter_scolarite()
+        self.assertRequetesBornees(
+            20,
+            lambda pk: self.client.delete(f'/api/etudiant/{pk}/'),
+            self.peupler,
+            preparer=lambda: {'pk': creer_etudiants(1)[0].pk},
+            statuts=(204,),
+        )
+
+
+# ====================== MOT DE PASSE OUBLIÉ ======================
+class ReinitialisationRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_utilisateurs(nombre)
+
+    def test_demande(self):
+        email = self.etudiant.user.email
+        self.assertRequetesBornees(
+            4,
+            lambda: self.client.post('/api/request-reset/', {'email': email}, format='json'),
+            self.peupler,
+        )
+
+    def test_verification(self):
+        email = self.etudiant.user.email
+        self.assertRequetesBornees(
+            1,
+            lambda code: self.client.post('/api/verify-code/', {'email': email, 'code': code}, format='json'),
+            self.peupler,
+            preparer=lambda: {'code': create_reset_code(email)},
+        )
+
+    def test_reinitialisation(self):
+        email = self.etudiant.user.email
+        self.assertRequetesBornees(
+            4,
+            lambda code: self.client.post(
+                '/api/reset-password/',
+                {'email': email, 'code': code, 'new_password': "NouveauMdp123!"},
+                format='json',
+            ),
+            self.peupler,
+            preparer=lambda: {'code': create_reset_code(email)},
+        )
+
+
+class CodesReinitialisationTests(RequetesBorneesTestCase):
+    """Codes hachés, à durée limitée, à usage unique et à nombre d'essais borné"""
+
+    def setUp(self):
+        super().setUp()
+        self.email = self.etudiant.user.email
+        self.code = create_reset_code(self.email)
+
+    def test_code_hache(self):
+        entree = PasswordResetCode.objects.get(email=self.email)
+        self.assertNotIn(self.code, entree.code_hash)
+        self.assertEqual(check_reset_code(self.email, self.code)[0], entree)
+
+    @override_settings(PASSWORD_RESET_MAX_ATTEMPTS=3)
+    def test_nombre_essais(self):
+        for _ in range(3):
+            self.assertEqual(check_reset_code(self.email, "zzzzzz"), (None, 'Code incorrect'))
+        self.assertEqual(PasswordResetCode.objects.get(email=self.email).tentatives, 3)
+        # Le bon code est refusé une fois la limite atteinte
+        entree, erreur = check_reset_code(self.email, self.code)
+        self.assertIsNone(entree)
+        self.assertIn("Trop de tentatives", erreur)
+
+    def test_expiration(self):
+        PasswordResetCode.objects.filter(email=self.email).update(expires_at=timezone.now() - timedelta(seconds=1))
+        entree, erreur = check_reset_code(self.email, self.code)
+        self.assertIsNone(entree)
+        self.assertIn("expiré", erreur)
+
+    def test_nouveau_code_remplace_ancien(self):
+        nouveau = create_reset_code(self.email)
+        self.assertEqual(PasswordResetCode.objects.filter(email=self.email).count(), 1)
+        self.assertIsNotNone(check_reset_code(self.email, nouveau)[0])
+
+    def test_usage_unique(self):
+        entree, _ = check_reset_code(self.email, self.code)
+        self.assertTrue(consume_reset_code(entree))
+        self.assertFalse(consume_reset_code(entree))
+        response = self.client.post(
+            '/api/reset-password/',
+            {'email': self.email, 'code': self.code, 'new_password': "NouveauMdp123!"},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+# ====================== PROFIL ======================
+class ProfilRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_etudiants(nombre)
+
+    def setUp(self):
+        super().setUp()
+        self.connecter_etudiant()
+
+    def test_profil(self):
+        self.assertRequetesBornees(1, lambda: self.client.get('/api/profile/'), self.peupler)
+
+    def test_mise_a_jour(self):
+        self.assertRequetesBornees(
+            1,
+            lambda nom: self.client.put('/api/profile/update/', {'nom': nom}, format='multipart'),
+            self.peupler,
+            preparer=lambda: {'nom': f"Rabe{numero_unique()}"},
+        )
+
+    def test_photo(self):
+        self.assertRequetesBornees(
+            2,
+            lambda photo: self.client.post('/api/profile/photo/', {'photo_profil': photo}, format='multipart'),
+            self.peupler,
+            preparer=lambda: {'photo': image_png()},
+        )
+
+    def test_suppression_photo(self):
+        user = self.etudiant.user
+
+        def preparer():
+            User.objects.filter(pk=user.pk).update(photo_profil='profile_photos/ab/photo.png')
+            user.refresh_from_db()
+            return {}
+
+        self.assertRequetesBornees(
+            2,
+            lambda: self.client.delete('/api/profile/photo/delete/'),
+            self.peupler,
+            preparer=preparer,
+        )
+
+    def test_changement_mot_de_passe(self):
+        user = self.etudiant.user
+
+        def preparer():
+            user.set_password("AncienMdp123!")
+            user.save(update_fields=['password'])
+            return {}
+
+        # Hash relu en base (l'utilisateur vient du cache) puis UPDATE
+        self.assertRequetesBornees(
+            2,
+            lambda: self.client.post(
+                '/api/profile/password/change/',
+                {'current_password': "AncienMdp123!", 'new_password': "NouveauMdp123!"},
+                format='json',
+            ),
+            self.peupler,
+            preparer=preparer,
+        )
+
+
+@override_settings(PROFILE_PHOTO_ASYNC=False)
+class PhotoTraitementTests(RequetesBorneesTestCase):
+    """Taille maximale, traitement, stockage adressé par contenu et état d'échec"""
+
+    def envoyer(self, user, photo):
+        self.client.force_authenticate(user)
+        return self.client.post('/api/profile/photo/', {'photo_profil': photo}, format='multipart')
+
+    def fichiers_photos(self):
+        dossier = default_storage.path('profile_photos')
+        return sorted(
+            os.path.relpath(os.path.join(racine, nom), dossier)
+            for racine, _, noms in os.walk(dossier) for nom in noms
+        )
+
+    @override_settings(PHOTO_UPLOAD_MAX_SIZE=10 * 1024)
+    def test_taille_maximale(self):
+        response = self.envoyer(self.etudiant.user, image_png((200, 200), bruit=True))
+        self.assertEqual(response.status_code, 400)
+        self.etudiant.user.refresh_from_db()
+        self.assertFalse(self.etudiant.user.photo_profil)
+
+    def test_traitement(self):
+        user = self.etudiant.user
+        avant = self.fichiers_photos()
+        self.assertEqual(self.envoyer(user, image_png((1600, 900))).status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(user.photo_statut, 'prete')
+
+        # Chemin = SHA-256 du fichier traité réellement servi
+        with user.photo_profil.open('rb') as fichier:
+            contenu = fichier.read()
+        digest = hashlib.sha256(contenu).hexdigest()
+        self.assertEqual(user.photo_profil.name, f"profile_photos/{digest[:2]}/{digest}.png")
+        self.assertEqual(Image.open(BytesIO(contenu)).size, (800, 450))
+
+        for nom in noms_miniatures(user.photo_profil.name):
+            self.assertTrue(default_storage.exists(nom), nom)
+        with Image.open(default_storage.path(nom_miniature(user.photo_profil.name, 64, 'webp'))) as miniature:
+            self.assertEqual(miniature.size, (64, 64))
+        # Upload brut remplacé par la version traitée
+        self.assertEqual(len(self.fichiers_photos()) - len(avant), 1 + len(noms_miniatures(user.photo_profil.name)))
+
+    def test_deduplication(self):
+        photo = image_png((1200, 1200))
+        premier, second = self.etudiant.user, self.etudiants[0].user
+        self.envoyer(premier, SimpleUploadedFile('a.png', photo.read(), content_type='image/png'))
+        fichiers = self.fichiers_photos()
+        photo.seek(0)
+        self.envoyer(second, SimpleUploadedFile('b.png', photo.read(), content_type='image/png'))
+
+        premier.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(second.photo_profil.name, premier.photo_profil.name)
+        self.assertEqual(second.photo_statut, 'prete')
+        self.assertEqual(self.fichiers_photos(), fichiers)
+
+    def test_echec(self):
+        user = self.etudiant.user
+        User.objects.filter(pk=user.pk).update(photo_profil='profile_photos/ab/brut.png', photo_statut='en_traitement')
+        future = Future()
+        future.set_exception(OSError("image illisible"))
+        with self.assertLogs('gestion_papier_scolarite.utils.image_utils', 'ERROR'):
+            _terminer(user.pk, default_storage, 'profile_photos/ab/brut.png', future)
+        user.refresh_from_db()
+        self.assertEqual(user.photo_statut, 'echec')
+        self.assertEqual(user.photo_profil.name, 'profile_photos/ab/brut.png')
+
+
+# ====================== SUPERVISION ======================
+class SupervisionRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_etudiants(nombre)
+
+    def setUp(self):
+        super().setUp()
+        self.connecter_scolarite()
+
+    def test_requetes_lentes(self):
+        self.assertRequetesBornees(0, lambda: self.client.get('/api/supervision/requetes-lentes/'), self.peupler)
+
+    def test_vider_requetes_lentes(self):
+        self.assertRequetesBornees(
+            0,
+            lambda: self.client.delete('/api/supervision/requetes-lentes/'),
+            self.peupler,
+            statuts=(204,),
+        )
+
+    @override_settings(METRICS_ENABLED=True, METRICS_TOKEN='', METRICS_MULTIPROC_DIR='')
+    def test_metrics(self):
+        self.assertRequetesBornees(0, lambda: self.client.get('/metrics'), self.peupler)
+
+    def test_profils(self):
+        with tempfile.TemporaryDirectory() as dossier, override_settings(PROFILING_DIR=dossier):
+            self.assertRequetesBornees(0, lambda: self.client.get('/api/supervision/profils/'), self.peupler)
+
+    def test_jeton_profilage(self):
+        self.assertRequetesBornees(
+            0,
+            lambda: self.client.post('/api/supervision/profils/', {'mode': 'cpu'}, format='json'),
+            self.peupler,
+            statuts=(201,),
+        )
+
+
+class ProfilageTests(RequetesBorneesTestCase):
+    """Le jeton de profilage ne vaut que dans l'en-tête et pour le compte qui l'a obtenu"""
+
+    def setUp(self):
+        super().setUp()
+        self.dossier = tempfile.TemporaryDirectory()
+        self.reglages = override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0, PROFILING_DIR=self.dossier.name)
+        self.reglages.enable()
+        self.jeton = creer_jeton('cpu', self.scolarite.user)
+
+    def tearDown(self):
+        self.reglages.disable()
+        self.dossier.cleanup()
+        super().tearDown()
+
+    def test_meme_compte(self):
+        self.connecter_scolarite()
+        response = self.client.get('/api/profile/', HTTP_X_PROFILAGE=self.jeton)
+        self.assertIn('X-Profil-Id', response)
+
+    def test_autre_compte(self):
+        self.connecter_etudiant()
+        response = self.client.get('/api/profile/', HTTP_X_PROFILAGE=self.jeton)
+        self.assertNotIn('X-Profil-Id', response)
+
+    def test_parametre_url_ignore(self):
+        self.connecter_scolarite()
+        response = self.client.get('/api/profile/', {'profilage': self.jeton})
+        self.assertNotIn('X-Profil-Id', response)
+
+    def test_reserve_scolarite(self):
+        self.connecter_etudiant()
+        response = self.client.post('/api/supervision/profils/', {'mode': 'cpu'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(REPLICA_STICKY_SECONDS=7)
+class ReplicaTests(RequetesBorneesTestCase):
+    """Routage des lectures : réplica pour les vues marquées, base principale après une écriture"""
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        for cible in ('api.middleware.replica_disponible', 'gestion_papier_scolarite.utils.db_router.replica_disponible'):
+            patch = mock.patch(cible, return_value=True)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def executer(self, request, vue, statut=200):
+        """Alias de lecture vu pendant la vue, et réponse de la middleware"""
+        lectures = []
+        middleware = None
+
+        def get_response(request):
+            middleware.process_view(request, vue.as_view(), (), {})
+            lectures.append(ReplicaRouter().db_for_read(User))
+            return HttpResponse(status=statut)
+
+        middleware = ReplicaMiddleware(get_response)
+        response = middleware(request)
+        return lectures[0], response
+
+    def test_lecture_replica(self):
+        alias, response = self.executer(self.factory.get('/api/scolarite/statistiques/'), StatistiquesScolariteView)
+        self.assertEqual(alias, 'replica')
+        self.assertNotIn(ReplicaMiddleware.COOKIE, response.cookies)
+        # Contexte rétabli en fin de requête
+        self.assertIsNone(ReplicaRouter().db_for_read(User))
+
+    def test_vue_non_marquee(self):
+        alias, _ = self.executer(self.factory.get('/api/profile/'), GetProfileView)
+        self.assertIsNone(alias)
+
+    def test_ecriture(self):
+        alias, response = self.executer(self.factory.post('/api/scolarite/statistiques/'), StatistiquesScolariteView)
+        self.assertIsNone(alias)
+        self.assertEqual(ReplicaRouter().db_for_write(User), 'default')
+        cookie = response.cookies[ReplicaMiddleware.COOKIE]
+        self.assertEqual(cookie['max-age'], 7)
+        self.assertTrue(cookie['httponly'])
+
+    def test_ecriture_refusee(self):
+        _, response = self.executer(self.factory.post('/api/profile/'), GetProfileView, statut=400)
+        self.assertNotIn(ReplicaMiddleware.COOKIE, response.cookies)
+
+    def test_lecture_apres_ecriture(self):
+        request = self.factory.get('/api/scolarite/statistiques/')
+        request.COOKIES[ReplicaMiddleware.COOKIE] = '1'
+        alias, _ = self.executer(request, StatistiquesScolariteView)
+        self.assertIsNone(alias)
+
+
+class ReplicaSQLiteTests(RequetesBorneesTestCase):
+    """
+    Réplica réel : second alias SQLite (comme avec DB_REPLICA_NAME) aux données
+    différentes de la base principale. L'alias est ajouté et migré par la classe,
+    qui n'en déclare l'usage (databases) qu'une fois l'alias créé : le lanceur de
+    tests ne prépare que les bases des réglages.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        settings.DATABASES[ALIAS_REPLICA] = connections.configure_settings({
+            **settings.DATABASES,
+            ALIAS_REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ''},
+        })[ALIAS_REPLICA]
+        cls._nom_replica = connections[ALIAS_REPLICA].creation.create_test_db(verbosity=0, serialize=False)
+        cls.databases = {'default', ALIAS_REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[ALIAS_REPLICA].creation.destroy_test_db(cls._nom_replica, verbosity=0)
+        connections[ALIAS_REPLICA].close()
+        del connections[ALIAS_REPLICA]
+        del settings.DATABASES[ALIAS_REPLICA]
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.db_manager(ALIAS_REPLICA).create(
+            email="replica@factory.test", nom="Replica", prenoms="Seul", role='etudiant',
+        )
+        Etudiant.objects.using(ALIAS_REPLICA).create(user=user, immatricule="REPLICA", contact="0340000000")
+        self.connecter_scolarite()
+
+    def immatricules(self):
+        response = self.client.get('/api/etudiants/')
+        self.assertEqual(response.status_code, 200)
+        return {etudiant['immatricule'] for etudiant in response.data['results']}
+
+    def test_lecture_sur_le_replica(self):
+        self.assertEqual(self.immatricules(), {"REPLICA"})
+
+    def test_lecture_apres_ecriture_sur_la_base_principale(self):
+        response = self.client.put('/api/profile/update/', {'nom': "Renomme"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(ReplicaMiddleware.COOKIE, self.client.cookies)
+        self.assertEqual(
+            self.immatricules(),
+            set(Etudiant.objects.using('default').values_list('immatricule', flat=True)),
+        )
+        self.assertEqual(User.objects.using('default').get(pk=self.scolarite.user.pk).nom, "Renomme")
+
+
+class SondesRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_etudiants(nombre)
+
+    def test_healthz(self):
+        self.assertRequetesBornees(0, lambda: self.client.get('/healthz'), self.peupler)
+
+    @override_settings(READINESS_CACHE_SECONDS=0)
+    def test_readyz(self):
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200, response.data)
+        # Vérifications en cache : une sonde suivante ne touche pas la base
+        with override_settings(READINESS_CACHE_SECONDS=60), self.assertNumQueries(0):
+            self.client.get('/readyz')
@@ -0,0 +1,91 @@
+# api/throttling.py
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DUREES = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/min' → (5, 60)"""
+    nombre, periode = rate.split('/')
+    return int(nombre), DUREES[periode[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Limitation à fenêtre glissante (compteur de la fenêtre courante
+    + compteur pondéré de la précédente), stockée dans le cache THROTTLE_CACHE_ALIAS :
+    cache local en mono-processus, Redis/Memcached partagé entre nœuds.
+
+    La vue déclare throttle_scope ; le taux est lu dans
+    DEFAULT_THROTTLE_RATES['<scope>_<suffixe>'] (suffixe = 'ip' ou 'email').
+    Un refus ne coûte qu'une lecture de cache, avant tout accès base ou SMTP.
+    """
+    suffixe = None
+
+    def get_identite(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}_{self.suffixe}") if scope else None
+        if not rate:
+            return True
+
+        identite = self.get_identite(request)
+        if not identite:
+            return True
+
+        nombre, duree = parse_rate(rate)
+        maintenant = time.time()
+        fenetre = int(maintenant // duree)
+        ecoule = (maintenant % duree) / duree
+
+        empreinte = hashlib.sha256(identite.encode()).hexdigest()[:32]
+        base = f"throttle:{scope}_{self.suffixe}:{empreinte}"
+        cle, cle_precedente = f"{base}:{fenetre}", f"{base}:{fenetre - 1}"
+
+        cache = caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+        compteurs = cache.get_many([cle, cle_precedente])
+        courant = compteurs.get(cle, 0)
+        estime = courant + compteurs.get(cle_precedente, 0) * (1 - ecoule)
+
+        if estime >= nombre:
+            self.attente = duree * (1 - ecoule)
+            return False
+
+        # add + incr : atomique sur Redis/Memcached
+        if not cache.add(cle, 1, timeout=2 * duree):
+            try:
+                cache.incr(cle)
+            except ValueError:
+                cache.set(cle, courant + 1, timeout=2 * duree)
+        return True
+
+    def wait(self):
+        return getattr(self, 'attente', None)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """Limite par adresse IP (X-Forwarded-For pris en compte selon NUM_PROXIES)"""
+    suffixe = 'ip'
+
+    def get_identite(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(SlidingWindowThrottle):
+    """Limite par email ciblé (protège un compte contre la force brute depuis plusieurs IP)"""
+    suffixe = 'email'
+
+    def get_identite(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email or not isinstance(email, str):
+            return None
+        return email.strip().lower()
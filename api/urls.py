@@ -1,4 +1,4 @@
-from django.urls import path,include
+from django.urls import path
 from .views import (
     EtudiantRegisterView, 
     ScolariteRegisterView,
@@ -13,7 +13,10 @@ from .views import (
     UpdateUserProfileView,
     UpdateProfilePhotoView,
     DeleteProfilePhotoView,
-    ChangePasswordView
+    ChangePasswordView,
+    RequetesLentesView,
+    ProfilsView,
+    ProfilDetailView,
 )
 urlpatterns = [
     # Inscription
@@ -29,9 +32,8 @@ urlpatterns = [
     # Profil de l'étudiant connecté
     path('etudiant/me/', EtudiantDetailView.as_view(), name='etudiant-me'),
 
-    path('accounts/', include(('django.contrib.auth.urls', 'accounts'))),
-    path('auth/', include(('django.contrib.auth.urls', 'auth'))),
-
+    # Connexion : uniquement par les vues limitées (LoginView, api/token/) ;
+    # pas de django.contrib.auth.urls ni rest_framework.urls, qui les masquaient sans limite
     path('auth/login/', LoginView.as_view()),
     path('auth/logout/', LogoutView.as_view()),
 
@@ -49,4 +51,9 @@ urlpatterns = [
     path('profile/photo/delete/', DeleteProfilePhotoView.as_view(), name='delete_photo'),
     # Changer le mot de passe
     path('profile/password/change/', ChangePasswordView.as_view(), name='change-password'),
+
+    # Supervision (scolarité)
+    path('supervision/requetes-lentes/', RequetesLentesView.as_view(), name='requetes-lentes'),
+    path('supervision/profils/', ProfilsView.as_view(), name='profils'),
+    path('supervision/profils/<str:identifiant>/', ProfilDetailView.as_view(), name='profil-detail'),
 ]
\ No newline at end of file
@@ -6,14 +6,21 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.parsers import (JSONParser, MultiPartParser, FormParser)
+from django.conf import settings
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from django.utils import timezone
 from django.core.mail import send_mail
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.views import TokenObtainPairView
+import json
 import logging
+import os
+import re
 
 from .serializers import (
     EtudiantSerializer, 
@@ -26,7 +33,15 @@ from .serializers import (
     PasswordResetConfirmSerializer
 )
 from .models import Etudiant, Scolarite, User
-from gestion_papier_scolarite.utils.token_utils import generate_reset_token, get_token_expiration
+from gestion_papier_scolarite.utils.token_utils import check_reset_code, consume_reset_code, create_reset_code
+from gestion_papier_scolarite.utils.image_utils import schedule_profile_photo_processing
+from gestion_papier_scolarite.utils.media import is_immutable, media_response
+from gestion_papier_scolarite.utils.health import etat_preparation
+from gestion_papier_scolarite.utils.metrics import exposition, registre as registre_metriques
+from gestion_papier_scolarite.utils import profiling
+from gestion_papier_scolarite.utils.slow_queries import registre as registre_requetes_lentes
+from .permissions import IsScolarite
+from .throttling import EmailThrottle, IPThrottle
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +53,8 @@ logger = logging.getLogger(__name__)
 class LoginView(APIView):
     """Connexion utilisateur"""
     permission_classes = [AllowAny]
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'login'
     
     def post(self, request):
         email = request.data.get('email')
@@ -66,6 +83,12 @@ class LoginView(APIView):
         }, status=status.HTTP_401_UNAUTHORIZED)
 
 
+class LoginTokenObtainPairView(TokenObtainPairView):
+    """Obtention du token JWT (connexion) avec les mêmes limites que LoginView"""
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'login'
+
+
 class LogoutView(APIView):
     """Déconnexion utilisateur"""
     permission_classes = [IsAuthenticated]
@@ -85,6 +108,8 @@ class LogoutView(APIView):
 class EtudiantRegisterView(APIView):
     """Inscription des étudiants"""
     permission_classes = [AllowAny]
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'register'
     parser_classes = [JSONParser, MultiPartParser, FormParser]
     
     def post(self, request):
@@ -96,6 +121,7 @@ class EtudiantRegisterView(APIView):
             try:
                 with transaction.atomic():
                     etudiant = serializer.save()
+                schedule_profile_photo_processing(etudiant.user)
                 
                 logger.info(f"Étudiant créé avec succès: {etudiant.user.email}")
                 
@@ -125,6 +151,8 @@ class EtudiantRegisterView(APIView):
 class ScolariteRegisterView(APIView):
     """Inscription du personnel de scolarité"""
     permission_classes = [AllowAny]
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'register'
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request):
@@ -136,6 +164,7 @@ class ScolariteRegisterView(APIView):
             try:
                 with transaction.atomic():
                     scolarite = serializer.save()
+                schedule_profile_photo_processing(scolarite.user)
                 
                 logger.info(f"Compte scolarité créé: {scolarite.user.email}")
                 
@@ -190,9 +219,8 @@ class EtudiantDetailView(APIView):
             etudiant = get_object_or_404(Etudiant, pk=pk)
         else:
             # Accès à son propre profil
-            try:
-                etudiant = Etudiant.objects.get(user=request.user)
-            except Etudiant.DoesNotExist:
+            etudiant = request.etudiant
+            if not etudiant:
                 # Cas où c'est un membre de la scolarité
                 if request.user.role == 'scolarite':
                     return Response({
@@ -215,9 +243,8 @@ class EtudiantDetailView(APIView):
     def put(self, request, pk=None):
         """Mise à jour du profil (étudiant uniquement, son propre profil)"""
         # Vérifier que l'utilisateur est un étudiant
-        try:
-            etudiant = Etudiant.objects.get(user=request.user)
-        except Etudiant.DoesNotExist:
+        etudiant = request.etudiant
+        if not etudiant:
             return Response({
                 'success': False,
                 'error': 'Vous devez être un étudiant pour modifier un profil'
@@ -241,6 +268,8 @@ class EtudiantDetailView(APIView):
             try:
                 with transaction.atomic():
                     etudiant_updated = serializer.save()
+                if 'photo_profil' in serializer.validated_data:
+                    schedule_profile_photo_processing(etudiant_updated.user)
                 
                 return Response({
                     'success': True,
@@ -303,6 +332,7 @@ class EtudiantDetailView(APIView):
 class EtudiantListView(APIView):
     """Liste de tous les étudiants (scolarité uniquement)"""
     permission_classes = [IsAuthenticated]
+    lecture_replica = True
     
     def get(self, request):
         if request.user.role != 'scolarite':
@@ -353,6 +383,8 @@ class UpdateUserProfileView(APIView):
         if serializer.is_valid():
             try:
                 user = serializer.save()
+                if serializer.validated_data.get('photo_profil'):
+                    schedule_profile_photo_processing(user)
                 
                 return Response({
                     'success': True,
@@ -387,13 +419,14 @@ class UpdateProfilePhotoView(APIView):
             try:
                 user = request.user
                 
-                # Supprimer l'ancienne photo si elle existe
-                if user.photo_profil:
-                    user.photo_profil.delete(save=False)
-                
                 # Mettre à jour avec la nouvelle photo
+                # (l'ancienne et ses miniatures sont supprimées par le signal post_save
+                # si aucun autre compte ne partage le même fichier)
                 user.photo_profil = serializer.validated_data['photo_profil']
-                user.save()
+                user.save(update_fields=['photo_profil'])
+                
+                # Redimensionnement, EXIF et miniatures en arrière-plan
+                schedule_profile_photo_processing(user)
                 
                 return Response({
                     'success': True,
@@ -430,7 +463,10 @@ class DeleteProfilePhotoView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            user.photo_profil.delete(save=True)
+            # Fichier et miniatures supprimés par le signal post_save
+            user.photo_profil = None
+            user.photo_statut = ''
+            user.save(update_fields=['photo_profil', 'photo_statut'])
             
             return Response({
                 'success': True,
@@ -505,6 +541,8 @@ class RequestPasswordResetView(APIView):
     """Étape 1 : Demande de réinitialisation - Envoie un code par email"""
     permission_classes = [AllowAny]
     authentication_classes = []
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'password_reset'
    
     def post(self, request):
         serializer = PasswordResetRequestSerializer(data=request.data)
@@ -519,16 +557,10 @@ class RequestPasswordResetView(APIView):
         email = serializer.validated_data['email']
         
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.only('nom', 'prenoms').get(email=email)
             
-            # Générer le token
-            token = generate_reset_token()
-            expiration = get_token_expiration()
-
-            # Sauvegarder dans la base
-            user.reset_token = token
-            user.reset_token_expiration = expiration
-            user.save()
+            # Générer le code (table dédiée, la ligne User n'est pas modifiée)
+            token = create_reset_code(email)
 
             # Envoyer l'email
             try:
@@ -579,6 +611,8 @@ class VerifyResetCodeView(APIView):
     """Étape 2 : Vérification du code"""
     permission_classes = [AllowAny]
     authentication_classes = []
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'reset_code'
     
     def post(self, request):
         serializer = PasswordResetCodeVerificationSerializer(data=request.data)
@@ -593,37 +627,18 @@ class VerifyResetCodeView(APIView):
         email = serializer.validated_data['email']
         code = serializer.validated_data['code']
 
-        try:
-            user = User.objects.get(email=email)
-            
-            if not user.reset_token:
-                return Response({
-                    'success': False,
-                    'error': 'Aucun code de réinitialisation trouvé'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            if user.reset_token != code:
-                return Response({
-                    'success': False,
-                    'error': 'Code incorrect'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            if user.reset_token_expiration < timezone.now():
-                return Response({
-                    'success': False,
-                    'error': 'Le code a expiré. Veuillez demander un nouveau code'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            return Response({
-                'success': True,
-                'message': 'Code valide'
-            }, status=status.HTTP_200_OK)
-            
-        except User.DoesNotExist:
+        # Vérification limitée à la table des codes
+        entree, erreur = check_reset_code(email, code)
+        if erreur:
             return Response({
                 'success': False,
-                'error': 'Utilisateur introuvable'
-            }, status=status.HTTP_404_NOT_FOUND)
+                'error': erreur
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'message': 'Code valide'
+        }, status=status.HTTP_200_OK)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -631,6 +646,8 @@ class ResetPasswordView(APIView):
     """Étape 3 : Réinitialisation finale du mot de passe"""
     permission_classes = [AllowAny]
     authentication_classes = []
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'reset_code'
     
     def post(self, request):
         serializer = PasswordResetConfirmSerializer(data=request.data)
@@ -647,27 +664,25 @@ class ResetPasswordView(APIView):
         new_password = serializer.validated_data['new_password']
 
         try:
-            user = User.objects.get(email=email)
-            
-            if not user.reset_token or user.reset_token != code:
+            entree, erreur = check_reset_code(email, code)
+            if erreur:
                 return Response({
                     'success': False,
-                    'error': 'Code invalide'
+                    'error': erreur
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
-            if user.reset_token_expiration < timezone.now():
+
+            user = User.objects.get(email=email)
+
+            # Supprimer le code (usage unique, même en cas de requêtes simultanées)
+            if not consume_reset_code(entree):
                 return Response({
                     'success': False,
-                    'error': 'Le code a expiré'
+                    'error': 'Code invalide'
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
+
             # Changer le mot de passe
             user.set_password(new_password)
-            
-            # Supprimer le token
-            user.reset_token = None
-            user.reset_token_expiration = None
-            user.save()
+            user.save(update_fields=['password'])
             
             logger.info(f"Mot de passe réinitialisé pour: {email}")
             
@@ -680,4 +695,176 @@ class ResetPasswordView(APIView):
             return Response({
                 'success': False,
                 'error': 'Utilisateur introuvable'
-            }, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            }, status=status.HTTP_404_NOT_FOUND)
+
+
+# ===================================================================
+# MÉDIAS PROTÉGÉS (photos de profil, documents générés)
+# ===================================================================
+
+class ProtectedMediaView(APIView):
+    """
+    Distribution des fichiers de MEDIA_ROOT après vérification des droits.
+    Le fichier est ensuite servi par le proxy (X-Accel-Redirect / X-Sendfile)
+    ou, à défaut, par FileResponse.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, chemin):
+        if not self._autorise(request.user, chemin):
+            return Response({
+                'success': False,
+                'error': 'Accès refusé'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        storage = User._meta.get_field('photo_profil').storage
+        try:
+            return media_response(request, storage, chemin, immutable=is_immutable(storage, chemin))
+        except (FileNotFoundError, SuspiciousFileOperation):
+            return Response({
+                'success': False,
+                'error': 'Fichier introuvable'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+    def _autorise(self, user, chemin):
+        """La scolarité accède à tout, les autres uniquement à leur propre photo"""
+        if user.role == 'scolarite':
+            return True
+        if not chemin.startswith('profile_photos/') or not user.photo_profil:
+            return False
+        # Originale ou miniature (<base>_<taille>.<ext>) de la photo de l'utilisateur
+        base_demandee = re.sub(r'_\d+$', '', os.path.splitext(chemin)[0])
+        return base_demandee == os.path.splitext(user.photo_profil.name)[0]
+
+
+# ===================================================================
+# SUPERVISION (scolarité uniquement)
+# ===================================================================
+
+class RequetesLentesView(APIView):
+    """
+    Requêtes SQL lentes agrégées par empreinte (SlowQueryMiddleware),
+    de la plus coûteuse en durée cumulée à la moins coûteuse, avec leur plan EXPLAIN.
+    DELETE vide le registre (ex. après l'ajout d'un index).
+    """
+    permission_classes = [IsAuthenticated, IsScolarite]
+
+    def get(self, request):
+        entrees = registre_requetes_lentes.resume()
+        return Response({
+            'success': True,
+            'actif': getattr(settings, 'SLOW_QUERY_ENABLED', False),
+            'seuil_ms': getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None),
+            'count': len(entrees),
+            'results': entrees,
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        registre_requetes_lentes.vider()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProfilsView(APIView):
+    """
+    Profils enregistrés par ProfilingMiddleware.
+    POST {"mode": "cpu" | "memoire"} délivre le jeton à passer dans l'en-tête
+    X-Profilage de la requête à profiler (envoyée avec le même compte).
+    """
+    permission_classes = [IsAuthenticated, IsScolarite]
+
+    def get(self, request):
+        profils = profiling.lister()
+        return Response({
+            'success': True,
+            'actif': getattr(settings, 'PROFILING_ENABLED', False),
+            'count': len(profils),
+            'results': profils,
+        }, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        mode = request.data.get('mode', 'cpu')
+        if mode not in profiling.MODES:
+            return Response({
+                'success': False,
+                'error': f"Mode invalide. Valeurs possibles : {', '.join(profiling.MODES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'success': True,
+            'jeton': profiling.creer_jeton(mode, request.user),
+            'en_tete': 'X-Profilage',
+            'expire_dans': getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600),
+        }, status=status.HTTP_201_CREATED)
+
+
+class ProfilDetailView(APIView):
+    """
+    Rapport d'un profil (fonctions les plus coûteuses ou sites d'allocation).
+    ?telecharger=1 renvoie le fichier cProfile (snakeviz, pstats...). DELETE le supprime.
+    """
+    permission_classes = [IsAuthenticated, IsScolarite]
+
+    def get(self, request, identifiant):
+        if request.query_params.get('telecharger'):
+            fichier = profiling.chemin(identifiant, 'prof')
+            if not fichier:
+                return Response({'success': False, 'error': "Profil introuvable."}, status=status.HTTP_404_NOT_FOUND)
+            return FileResponse(open(fichier, 'rb'), as_attachment=True, filename=f"{identifiant}.prof")
+
+        meta, rapport = profiling.chemin(identifiant, 'json'), profiling.chemin(identifiant, 'txt')
+        if not meta or not rapport:
+            return Response({'success': False, 'error': "Profil introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        with open(meta, encoding='utf-8') as fichier:
+            profil = json.load(fichier)
+        with open(rapport, encoding='utf-8') as fichier:
+            profil['rapport'] = fichier.read()
+        return Response({'success': True, 'profil': profil}, status=status.HTTP_200_OK)
+
+    def delete(self, request, identifiant):
+        if not profiling.supprimer(identifiant):
+            return Response({'success': False, 'error': "Profil introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(APIView):
+    """
+    Métriques au format texte Prometheus (METRICS_ENABLED).
+    Avec METRICS_TOKEN, l'en-tête Authorization: Bearer <jeton> est exigé.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise Http404
+        jeton = getattr(settings, 'METRICS_TOKEN', '')
+        if jeton and not constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f"Bearer {jeton}"):
+            return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+        return HttpResponse(
+            exposition(registre_metriques.etat_agrege()),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class HealthzView(APIView):
+    """Vivacité : le processus répond (aucune authentification, aucune E/S)"""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        return Response({'statut': 'ok'}, status=status.HTTP_200_OK)
+
+
+class ReadyzView(APIView):
+    """
+    Disponibilité : base(s), cache, dossier media, files d'attente, migrations.
+    503 si une vérification échoue. Résultat mis en cache READINESS_CACHE_SECONDS secondes.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        etat = etat_preparation()
+        return Response(
+            {'statut': 'ok' if etat['pret'] else 'indisponible', **etat},
+            status=status.HTTP_200_OK if etat['pret'] else status.HTTP_503_SERVICE_UNAVAILABLE
+        )
@@ -0,0 +1,217 @@
+# benchmarks/endpoints.py
+"""
+Latence et débit des endpoints les plus sollicités, via le client de test Django.
+
+Par défaut sur une base de test jetable remplie par manage.py generer_donnees :
+
+    python -m benchmarks.endpoints --etudiants 10000 --demandes 100000 --sortie resultats.json
+    python -m benchmarks.endpoints --comparer avant.json --sortie apres.json
+
+--base-existante mesure la base configurée telle quelle (déjà remplie),
+les scénarios de création y ajoutent alors des demandes.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_papier_scolarite.settings')
+os.environ.setdefault('DJANGO_PROFILE', 'perf')  # hors ligne : SQLite, cache et emails en mémoire
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from api.models import Etudiant, Scolarite  # noqa: E402
+from api.serializers import RoleTokenObtainPairSerializer  # noqa: E402
+from Attestation.models import Attestation  # noqa: E402
+from CertificatScolarite.models import CertificatScolarite  # noqa: E402
+from gestion_papier_scolarite.utils.factories import creer_scolarites  # noqa: E402
+from releveNote.models import ReleveNote  # noqa: E402
+
+
+# ====================== SCÉNARIOS ======================
+# nom → (rôle, méthode, url ou fonction(aleatoire) → url, corps)
+def _numero_existant(aleatoire):
+    modele, champ = aleatoire.choice([
+        (ReleveNote, 'id_releve'), (CertificatScolarite, 'id_certificat'), (Attestation, 'id_attestation'),
+    ])
+    dernier = modele.objects.order_by('-pk').values_list('pk', flat=True).first() or 1
+    numero = (
+        modele.objects.filter(pk__gte=aleatoire.randint(1, dernier)).order_by('pk')
+        .values_list(champ, flat=True).first()
+    )
+    return f"/api/scolarite/rechercher-demande/?numero={numero or 'R-0001'}"
+
+
+SCENARIOS = {
+    'toutes-demandes': ('scolarite', 'get', '/api/scolarite/toutes-demandes/', None),
+    'toutes-demandes en_attente': ('scolarite', 'get', '/api/scolarite/toutes-demandes/?statut=en_attente', None),
+    'statistiques': ('scolarite', 'get', '/api/scolarite/statistiques/', None),
+    'rechercher-demande': ('scolarite', 'get', _numero_existant, None),
+    'releve liste': ('scolarite', 'get', '/api/relevenote/liste/?statut=en_attente', None),
+    'certificat liste': ('scolarite', 'get', '/api/certificat/liste/?statut=en_attente', None),
+    'attestation liste': ('scolarite', 'get', '/api/attestation/liste/?statut=en_attente', None),
+    'releve creer': ('etudiant', 'post', '/api/relevenote/creer/', {
+        'demandes': [{'niveau': 'L2', 'quantite': 1}], 'annee_universitaire': [2024],
+    }),
+    'certificat creer': ('etudiant', 'post', '/api/certificat/creer/', {
+        'nom_pere': "Rakoto", 'nom_mere': "Rasoa", 'date_naissance': "2000-01-01", 'quantite': 1,
+    }),
+    'attestation creer': ('etudiant', 'post', '/api/attestation/creer/', {
+        'type_attestation': 'inscription', 'annee_scolaire': "2024-2025", 'quantite': 1,
+    }),
+}
+
+
+def client_pour(user):
+    """Client authentifié par un vrai token JWT (chemin StatelessJWTAuthentication)"""
+    client = APIClient()
+    acces = RoleTokenObtainPairSerializer.get_token(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {acces}")
+    return client
+
+
+def percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    rang = (len(valeurs) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs) - 1)
+    return valeurs[bas] + (valeurs[haut] - valeurs[bas]) * (rang - bas)
+
+
+def executer(scenario, clients, iterations, echauffement, aleatoire):
+    role, methode, url, corps = scenario
+    client = clients[role]
+    durees, requetes, statuts = [], [], {}
+
+    for i in range(echauffement + iterations):
+        cible = url(aleatoire) if callable(url) else url
+        with CaptureQueriesContext(connection) as capture:
+            debut = time.perf_counter()
+            response = getattr(client, methode)(cible, corps, format='json')
+            duree = time.perf_counter() - debut
+        if i < echauffement:
+            continue
+        durees.append(duree * 1000)
+        requetes.append(len(capture))
+        statuts[response.status_code] = statuts.get(response.status_code, 0) + 1
+
+    return {
+        'iterations': iterations,
+        'statuts': {str(code): nombre for code, nombre in sorted(statuts.items())},
+        'latence_ms': {
+            'moyenne': round(statistics.fmean(durees), 2),
+            'min': round(min(durees), 2),
+            'p50': round(percentile(durees, 50), 2),
+            'p95': round(percentile(durees, 95), 2),
+            'p99': round(percentile(durees, 99), 2),
+            'max': round(max(durees), 2),
+        },
+        'debit_rps': round(iterations / (sum(durees) / 1000), 1),
+        'requetes_sql': {'min': min(requetes), 'max': max(requetes)},
+    }
+
+
+def commit_git():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(precedent, actuel):
+    print(f"\n{'scénario':<28}{'p50 avant':>12}{'p50 après':>12}{'écart':>10}")
+    for nom, resultat in actuel['scenarios'].items():
+        avant = precedent.get('scenarios', {}).get(nom)
+        if not avant:
+            continue
+        a, b = avant['latence_ms']['p50'], resultat['latence_ms']['p50']
+        ecart = (b - a) / a * 100 if a else 0
+        print(f"{nom:<28}{a:>12.2f}{b:>12.2f}{ecart:>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--etudiants', type=int, default=10_000)
+    parser.add_argument('--demandes', type=int, default=100_000)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--echauffement', type=int, default=3)
+    parser.add_argument('--scenarios', nargs='*', choices=sorted(SCENARIOS), help="Défaut : tous")
+    parser.add_argument('--graine', type=int, default=42)
+    parser.add_argument('--base-existante', action='store_true', help="Ne pas créer de base de test")
+    parser.add_argument('--sortie', help="Fichier JSON des résultats")
+    parser.add_argument('--comparer', help="Résultats JSON d'une exécution précédente")
+    args = parser.parse_args()
+
+    setup_test_environment()  # ALLOWED_HOSTS 'testserver', emails en mémoire
+    nom_base = None
+    if not args.base_existante:
+        nom_base = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        if nom_base:
+            print(f"Base de test {nom_base} : génération des données...")
+            call_command(
+                'generer_donnees', etudiants=args.etudiants, demandes=args.demandes,
+                graine=args.graine, force=True,
+            )
+
+        scolarite = Scolarite.objects.select_related('user').first() or creer_scolarites(1)[0]
+        etudiant = Etudiant.objects.select_related('user').order_by('pk').first()
+        if etudiant is None:
+            sys.exit("Aucun étudiant en base : lancer manage.py generer_donnees")
+        clients = {'scolarite': client_pour(scolarite.user), 'etudiant': client_pour(etudiant.user)}
+
+        resultats = {
+            'commit': commit_git(),
+            'date': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+            'base': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'donnees': {
+                'etudiants': Etudiant.objects.count(),
+                'releves': ReleveNote.objects.count(),
+                'certificats': CertificatScolarite.objects.count(),
+                'attestations': Attestation.objects.count(),
+            },
+            'parametres': {'iterations': args.iterations, 'echauffement': args.echauffement, 'graine': args.graine},
+            'scenarios': {},
+        }
+
+        aleatoire = random.Random(args.graine)
+        for nom in args.scenarios or SCENARIOS:
+            resultat = executer(SCENARIOS[nom], clients, args.iterations, args.echauffement, aleatoire)
+            resultats['scenarios'][nom] = resultat
+            latence = resultat['latence_ms']
+            print(
+                f"{nom:<28} p50 {latence['p50']:>8.2f} ms  p95 {latence['p95']:>8.2f} ms  "
+                f"{resultat['debit_rps']:>7.1f} req/s  {resultat['requetes_sql']['max']} requêtes SQL"
+            )
+    finally:
+        if nom_base:
+            connection.creation.destroy_test_db(nom_base, verbosity=0)
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+        print(f"\nRésultats écrits dans {args.sortie}")
+    if args.comparer:
+        with open(args.comparer, encoding='utf-8') as fichier:
+            comparer(json.load(fichier), resultats)
+
+
+if __name__ == '__main__':
+    main()
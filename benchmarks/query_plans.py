@@ -0,0 +1,139 @@
+# benchmarks/query_plans.py
+"""
+Plans d'exécution des requêtes des listes / tableau de bord sur
+CertificatScolarite et Attestation, sans puis avec leurs index.
+
+Travaille sur une base de test jetable (jamais sur la base configurée) :
+
+    python -m benchmarks.query_plans --lignes 50000
+
+Les index partiels (demandes ouvertes) ne sont retenus par SQLite que si
+la condition apparaît en littéral dans la requête ; PostgreSQL les utilise
+avec les paramètres envoyés par Django.
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_papier_scolarite.settings')
+os.environ.setdefault('DJANGO_PROFILE', 'perf')  # hors ligne : SQLite, cache et emails en mémoire
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from api.models import Etudiant, User  # noqa: E402
+from Attestation.models import Attestation  # noqa: E402
+from CertificatScolarite.models import CertificatScolarite  # noqa: E402
+
+STATUTS = ['en_attente', 'en_cours', 'pret', 'retire', 'rejete']
+# Surtout des demandes traitées, comme en production
+POIDS_STATUTS = [5, 5, 40, 45, 5]
+
+
+def seed(lignes, nb_etudiants=500):
+    """Jeu de données réparti sur 3 ans et tous les statuts (bulk_create)"""
+    users = User.objects.bulk_create([
+        User(email=f"bench{i}@exemple.fr", nom="Bench", prenoms=str(i), role='etudiant')
+        for i in range(nb_etudiants)
+    ])
+    etudiants = Etudiant.objects.bulk_create([
+        Etudiant(user=u, immatricule=f"BENCH{i:06d}", contact="0000")
+        for i, u in enumerate(users)
+    ])
+
+    maintenant = timezone.now()
+    for model, prefixe, extra in (
+        (CertificatScolarite, 'C', {}),
+        (Attestation, 'A', {'type_attestation': 'inscription', 'total_paye': 3000}),
+    ):
+        champ_numero = 'id_certificat' if model is CertificatScolarite else 'id_attestation'
+        objets = [
+            model(
+                etudiant=random.choice(etudiants),
+                statut=random.choices(STATUTS, POIDS_STATUTS)[0],
+                **{champ_numero: f"{prefixe}{i:08d}"},
+                **extra,
+            )
+            for i in range(lignes)
+        ]
+        model.objects.bulk_create(objets, batch_size=5000)
+        # date_demande est auto_now_add : dates réparties après insertion
+        for objet in objets:
+            objet.date_demande = maintenant - timedelta(minutes=random.randint(0, 3 * 365 * 24 * 60))
+        model.objects.bulk_update(objets, ['date_demande'], batch_size=5000)
+
+
+def requetes(model):
+    debut_mois = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        'liste statut=en_attente': model.objects.filter(statut='en_attente').order_by('-date_demande')[:50],
+        'liste complète (tri)': model.objects.order_by('-date_demande')[:50],
+        'demandes ouvertes': model.objects.filter(statut__in=['en_attente', 'en_cours']).order_by('-date_demande')[:50],
+        'count statut=pret': model.objects.filter(statut='pret'),
+        'depuis début du mois': model.objects.filter(date_demande__gte=debut_mois),
+    }
+
+
+def mesurer(model):
+    resultats = {}
+    for nom, qs in requetes(model).items():
+        debut = time.perf_counter()
+        if qs.query.high_mark:
+            list(qs)
+        else:
+            # Comptage : pas de tri
+            qs = qs.order_by()
+            qs.count()
+        duree = (time.perf_counter() - debut) * 1000
+        resultats[nom] = (qs.explain(), duree)
+    return resultats
+
+
+def analyser():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lignes', type=int, default=50000, help="Demandes par modèle")
+    args = parser.parse_args()
+
+    nom_base = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f"Base de test {nom_base} : insertion de {args.lignes} demandes par modèle...")
+        seed(args.lignes)
+
+        for model in (CertificatScolarite, Attestation):
+            index = model._meta.indexes
+            with connection.schema_editor() as editor:
+                for idx in index:
+                    editor.remove_index(model, idx)
+            analyser()
+            avant = mesurer(model)
+
+            with connection.schema_editor() as editor:
+                for idx in index:
+                    editor.add_index(model, idx)
+            analyser()
+            apres = mesurer(model)
+
+            print(f"\n{'=' * 20} {model.__name__} {'=' * 20}")
+            for nom in avant:
+                print(f"\n--- {nom}")
+                print(f"  sans index ({avant[nom][1]:.1f} ms) :")
+                print('    ' + avant[nom][0].replace('\n', '\n    '))
+                print(f"  avec index ({apres[nom][1]:.1f} ms) :")
+                print('    ' + apres[nom][0].replace('\n', '\n    '))
+    finally:
+        connection.creation.destroy_test_db(nom_base, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
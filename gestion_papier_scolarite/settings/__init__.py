@@ -0,0 +1,16 @@
+# gestion_papier_scolarite/settings/__init__.py
+# Profil choisi par la variable DJANGO_PROFILE : dev (défaut), prod ou perf.
+
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+PROFIL = config('DJANGO_PROFILE', default='dev')
+
+if PROFIL == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif PROFIL == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif PROFIL == 'perf':
+    from .perf import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f"DJANGO_PROFILE inconnu : {PROFIL!r} (dev, prod ou perf)")
@@ -0,0 +1,330 @@
+# gestion_papier_scolarite/settings/base.py
+# Réglages communs à tous les profils (dev, prod, perf) : aucun service externe requis ici.
+# SECRET_KEY, DEBUG, DATABASES et EMAIL_BACKEND sont fixés par le profil.
+
+from pathlib import Path
+from datetime import timedelta
+from decouple import config
+import os
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+CORS_ALLOWED_ORIGINS = [
+    "http://localhost:5173",
+    "http://127.0.0.1:5173",
+    "http://localhost:3000", 
+]
+
+# Custom user model
+AUTH_USER_MODEL = "api.User"
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Médias protégés (MEDIA_PROTECTED, par défaut hors DEBUG, cf. finaliser) : contrôle d'accès Django puis envoi par le proxy
+# MEDIA_DELIVERY_BACKEND = 'nginx' (X-Accel-Redirect), 'sendfile' (X-Sendfile) ou '' (FileResponse)
+MEDIA_DELIVERY_BACKEND = config("MEDIA_DELIVERY_BACKEND", default="")
+MEDIA_ACCEL_REDIRECT_PREFIX = config("MEDIA_ACCEL_REDIRECT_PREFIX", default="/protected-media/")
+FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880 
+# Photos de profil : réception en flux, refus dès 5 MB dépassés, empreinte SHA-256
+FILE_UPLOAD_HANDLERS = [
+    'gestion_papier_scolarite.utils.upload_handlers.PhotoUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+PHOTO_UPLOAD_FIELDS = ['photo_profil']
+PHOTO_UPLOAD_MAX_SIZE = 5 * 1024 * 1024
+PHOTO_UPLOAD_MAX_PIXELS = 40_000_000
+PHOTO_UPLOAD_FORMATS = ['JPEG', 'PNG', 'GIF']
+ALLOWED_IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif']
+MAX_IMAGE_WIDTH = 800
+MAX_IMAGE_HEIGHT = 800
+# Miniatures générées pour chaque photo de profil (côté en pixels, formats)
+PROFILE_PHOTO_THUMBNAIL_SIZES = [64, 256]
+PROFILE_PHOTO_THUMBNAIL_FORMATS = ['webp', 'jpeg']
+# Traitement des photos hors requête (pool de processus)
+PROFILE_PHOTO_ASYNC = config("PROFILE_PHOTO_ASYNC", default=True, cast=bool)
+PROFILE_PHOTO_WORKERS = config("PROFILE_PHOTO_WORKERS", default=2, cast=int)
+# Emails des changements de statut en masse (actions de l'admin) : envoyés hors requête
+NOTIFICATIONS_ASYNC = config("NOTIFICATIONS_ASYNC", default=True, cast=bool)
+# Taille maximale d'une sélection pour les actions de statut de l'admin (au-delà : refusée)
+ADMIN_ACTION_MAX_SELECTION = config("ADMIN_ACTION_MAX_SELECTION", default=10000, cast=int)
+
+# Archivage (manage.py archiver_demandes) : demandes terminées depuis plus de N ans
+ARCHIVE_APRES_ANNEES = config('ARCHIVE_APRES_ANNEES', default=2, cast=int)
+ARCHIVE_STATUTS = ['pret', 'retire', 'rejete']
+
+# Instrumentation par requête (api.middleware.InstrumentationMiddleware) :
+# en-tête Server-Timing + log 'gestion_papier_scolarite.instrumentation'.
+# En production, activer avec un échantillonnage, ex. INSTRUMENTATION_SAMPLE_RATE=0.01
+INSTRUMENTATION_ENABLED = config('INSTRUMENTATION_ENABLED', default=False, cast=bool)
+INSTRUMENTATION_SAMPLE_RATE = config('INSTRUMENTATION_SAMPLE_RATE', default=1.0, cast=float)
+INSTRUMENTATION_SLOW_QUERIES = config('INSTRUMENTATION_SLOW_QUERIES', default=3, cast=int)
+
+# Requêtes SQL lentes (api.middleware.SlowQueryMiddleware) : log 'gestion_papier_scolarite.slow_queries'
+# avec plan EXPLAIN, agrégées par empreinte (GET /api/supervision/requetes-lentes/)
+SLOW_QUERY_ENABLED = config('SLOW_QUERY_ENABLED', default=False, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=int)
+SLOW_QUERY_BUFFER_SIZE = config('SLOW_QUERY_BUFFER_SIZE', default=200, cast=int)
+
+# Métriques Prometheus sur /metrics (api.middleware.MetricsMiddleware), sans service externe.
+# METRICS_TOKEN : jeton Bearer exigé par /metrics (vide = accès libre, à filtrer côté proxy).
+# Plusieurs workers (gunicorn...) : METRICS_MULTIPROC_DIR, dossier partagé vidé à chaque démarrage.
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=5, cast=int)
+
+# Profilage à la demande (api.middleware.ProfilingMiddleware) : jetons signés délivrés au personnel
+# (POST /api/supervision/profils/), rapports dans PROFILING_DIR, listés par GET /api/supervision/profils/
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=1.0, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profils'))
+PROFILING_MAX_PROFILES = config('PROFILING_MAX_PROFILES', default=50, cast=int)
+PROFILING_TOKEN_MAX_AGE = config('PROFILING_TOKEN_MAX_AGE', default=3600, cast=int)
+
+# Sondes /healthz et /readyz : vérifications de /readyz recalculées au plus toutes les N secondes,
+# échec si une file d'attente du processus (photos, emails, logs) dépasse READINESS_MAX_QUEUE
+READINESS_CACHE_SECONDS = config('READINESS_CACHE_SECONDS', default=5, cast=int)
+READINESS_MAX_QUEUE = config('READINESS_MAX_QUEUE', default=1000, cast=int)
+
+# Codes de réinitialisation : tentatives autorisées par code avant invalidation
+PASSWORD_RESET_MAX_ATTEMPTS = 5
+
+#expiration token 
+SIMPLE_JWT = {
+    'USER_ID_FIELD': 'id',  
+    'USER_ID_CLAIM': 'user_id',
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=config("JWT_ACCESS_TOKEN_MINUTES", default=15, cast=int)),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=364),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    "AUTH_HEADER_TYPES": ("Bearer",),
+    "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    "TOKEN_BLACKLIST_ENABLED": True,
+    # Claim 'role' dans les tokens (authentification sans requête), relu en base au rafraîchissement
+    "TOKEN_OBTAIN_SERIALIZER": "api.serializers.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.serializers.RoleTokenRefreshSerializer",
+
+}
+# Durée de vie du cache utilisateur (par processus) de StatelessJWTAuthentication
+JWT_USER_CACHE_TTL = 30
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'corsheaders',
+    'rest_framework',
+    'rest_framework.authtoken', 
+    'django_rest_passwordreset',
+    'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
+    'api',
+    'releveNote',
+    'CertificatScolarite',
+    'Attestation',
+    'Scolarite'
+]
+
+MIDDLEWARE = [
+    'api.middleware.CorrelationIdMiddleware',         # X-Request-ID, repris dans chaque log
+    'api.middleware.InstrumentationMiddleware',       # Server-Timing (si INSTRUMENTATION_ENABLED)
+    'api.middleware.SlowQueryMiddleware',             # requêtes lentes + EXPLAIN (si SLOW_QUERY_ENABLED)
+    'api.middleware.MetricsMiddleware',               # métriques Prometheus (si METRICS_ENABLED)
+    'api.middleware.ProfilingMiddleware',             # cProfile / tracemalloc à la demande (si PROFILING_ENABLED)
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',      # Garde seulement une fois
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.EtudiantMiddleware',              # request.etudiant (chargé une seule fois)
+    'api.middleware.ReplicaMiddleware',               # lectures des tableaux de bord sur le réplica
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'gestion_papier_scolarite.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'gestion_papier_scolarite.wsgi.application'
+# REST FRAMEWORK CONFIGURATION
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (                
+        'api.authentication.StatelessJWTAuthentication', 
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.TokenAuthentication'       
+    ),
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',   
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.JSONRendererMesure',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Limites des vues publiques (api.throttling) : '<throttle_scope>_ip' / '<throttle_scope>_email'
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login_email': config('THROTTLE_LOGIN_EMAIL', default='5/min'),
+        'register_ip': config('THROTTLE_REGISTER_IP', default='10/hour'),
+        'password_reset_ip': config('THROTTLE_PASSWORD_RESET_IP', default='10/hour'),
+        'password_reset_email': config('THROTTLE_PASSWORD_RESET_EMAIL', default='3/hour'),
+        'reset_code_ip': config('THROTTLE_RESET_CODE_IP', default='30/hour'),
+        'reset_code_email': config('THROTTLE_RESET_CODE_EMAIL', default='10/hour'),
+    },
+    # Nombre de proxies devant l'application (X-Forwarded-For) pour identifier l'IP cliente
+    'NUM_PROXIES': config('NUM_PROXIES', default=None, cast=lambda v: None if v in (None, '') else int(v)),
+}
+
+# Cache partagé (limitation de débit) : mémoire locale par défaut,
+# Redis/Memcached en multi-nœuds, ex. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='gestion-papier-scolarite'),
+    }
+}
+THROTTLE_CACHE_ALIAS = 'default'
+# DATABASES : définie par le profil (PostgreSQL via DB_*, SQLite pour perf)
+# Réplica en lecture (optionnel, DB_REPLICA_HOST et/ou DB_REPLICA_NAME) : ajouté par finaliser()
+DATABASE_ROUTERS = ['gestion_papier_scolarite.utils.db_router.ReplicaRouter']
+# Après une écriture, lectures du client sur la base principale pendant ce délai (secondes)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)
+
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+STATIC_URL = 'static/'
+
+
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# EMAIL_BACKEND : défini par le profil (SMTP en prod, console en dev, locmem pour perf)
+EMAIL_HOST = config("EMAIL_HOST", default="localhost")
+EMAIL_PORT = config("EMAIL_PORT", default=587, cast=int)
+EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=True, cast=bool)
+EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="")
+EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="")
+DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="scolarite@ecole.com")
+
+
+CORS_ALLOW_CREDENTIALS = True
+CSRF_COOKIE_SECURE = False  
+SESSION_COOKIE_SECURE = False
+
+# ====================== LOGGING ======================
+# Écriture hors du thread de la requête (QueueHandler → QueueListener → stderr).
+# LOG_FORMAT=json pour l'ingestion (une ligne JSON par log), texte sinon.
+LOG_FORMAT = config('LOG_FORMAT', default='texte')
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'correlation_id': {'()': 'gestion_papier_scolarite.utils.logging_utils.CorrelationIdFilter'},
+    },
+    'handlers': {
+        'asynchrone': {
+            '()': 'gestion_papier_scolarite.utils.logging_utils.QueueHandlerAsynchrone',
+            'sortie': LOG_FORMAT,
+            'filters': ['correlation_id'],
+        },
+    },
+    'root': {'handlers': ['asynchrone'], 'level': LOG_LEVEL},
+    'loggers': {
+        # Remplace la console / mail_admins par défaut de Django
+        'django': {'handlers': ['asynchrone'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
+
+# ====================== RÉGLAGES DÉRIVÉS ======================
+def postgresql(prefixe='DB'):
+    """Base PostgreSQL décrite par les variables <prefixe>_NAME, _USER, _PASSWORD, _HOST, _PORT"""
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config(f'{prefixe}_NAME', default='Projet_fin_de_vancances_2025'),
+        'USER': config(f'{prefixe}_USER', default='postgres'),
+        'PASSWORD': config(f'{prefixe}_PASSWORD', default=''),
+        'HOST': config(f'{prefixe}_HOST', default='localhost'),
+        'PORT': config(f'{prefixe}_PORT', default='5432'),
+    }
+
+
+def finaliser(reglages):
+    """
+    Réglages qui dépendent des choix du profil (DEBUG, DATABASES, EMAIL_BACKEND).
+    Chaque profil l'appelle en dernière ligne : finaliser(globals()).
+    """
+    reglages['MEDIA_PROTECTED'] = config("MEDIA_PROTECTED", default=not reglages['DEBUG'], cast=bool)
+
+    # Réplica en lecture : utilisé par les vues marquées lecture_replica = True.
+    # Copie de 'default' dont DB_REPLICA_HOST / _PORT / _NAME remplacent les valeurs.
+    # En local, deux fichiers SQLite suffisent : DB_REPLICA_NAME=chemin/replica.sqlite3
+    # (migrer les deux : migrate --database=replica).
+    bases = reglages['DATABASES']
+    hote = config('DB_REPLICA_HOST', default='')
+    nom = config('DB_REPLICA_NAME', default='')
+    if (hote or nom) and 'replica' not in bases:
+        principale = bases['default']
+        bases['replica'] = {
+            **principale,
+            'HOST': hote or principale.get('HOST', ''),
+            'PORT': config('DB_REPLICA_PORT', default=principale.get('PORT', '')),
+            'NAME': nom or principale['NAME'],
+            'TEST': {'MIRROR': 'default'},
+        }
+
+    # Envois chronométrés (étape 'email' du Server-Timing) et comptés (métriques)
+    if reglages['INSTRUMENTATION_ENABLED'] or reglages['METRICS_ENABLED']:
+        reglages['INSTRUMENTATION_EMAIL_BACKEND'] = reglages['EMAIL_BACKEND']
+        reglages['EMAIL_BACKEND'] = 'gestion_papier_scolarite.utils.instrumentation.EmailBackendMesure'
@@ -0,0 +1,19 @@
+# gestion_papier_scolarite/settings/dev.py
+# Poste de développement : PostgreSQL local (variables DB_*), emails affichés dans la console
+# (EMAIL_BACKEND=...smtp.EmailBackend pour un vrai envoi).
+
+from .base import *  # noqa: F401,F403
+
+PROFIL = 'dev'
+
+SECRET_KEY = config("SECRET_KEY", default="django-insecure-dev-uniquement")
+
+DEBUG = True
+
+DATABASES = {
+    'default': postgresql(),
+}
+
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend")
+
+finaliser(globals())
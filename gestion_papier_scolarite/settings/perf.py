@@ -0,0 +1,34 @@
+# gestion_papier_scolarite/settings/perf.py
+# Benchmarks et profilage hors ligne : aucun service externe (SQLite, cache et emails en mémoire).
+# PERF_DB=postgresql pour mesurer sur un PostgreSQL local (variables DB_*).
+# DEBUG=False comme en production : pas d'accumulation de connection.queries.
+
+from .base import *  # noqa: F401,F403
+
+PROFIL = 'perf'
+
+SECRET_KEY = config("SECRET_KEY", default="django-insecure-perf-uniquement")
+
+DEBUG = False
+ALLOWED_HOSTS = ['localhost', '127.0.0.1', 'testserver']
+
+if config('PERF_DB', default='sqlite') == 'postgresql':
+    DATABASES = {'default': postgresql()}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('PERF_SQLITE_PATH', default=str(BASE_DIR / 'perf.sqlite3')),
+        },
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gestion-papier-scolarite-perf',
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+finaliser(globals())
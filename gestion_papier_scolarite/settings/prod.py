@@ -0,0 +1,31 @@
+# gestion_papier_scolarite/settings/prod.py
+# Production : tout vient de l'environnement (.env), sans valeur par défaut pour les secrets.
+
+from decouple import Csv
+
+from .base import *  # noqa: F401,F403
+
+PROFIL = 'prod'
+
+SECRET_KEY = config("SECRET_KEY")
+
+DEBUG = config("DEBUG", default=False, cast=bool)
+ALLOWED_HOSTS = config("ALLOWED_HOSTS", cast=Csv())
+
+DATABASES = {
+    'default': {
+        **postgresql(),
+        'NAME': config('DB_NAME'),
+        'USER': config('DB_USER'),
+        'PASSWORD': config('DB_PASSWORD'),
+        'HOST': config('DB_HOST'),
+    },
+}
+
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = config("EMAIL_HOST")
+EMAIL_HOST_USER = config("EMAIL_HOST_USER")
+EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
+DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL")
+
+finaliser(globals())
@@ -3,19 +3,21 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from api.views import HealthzView, LoginTokenObtainPairView, MetricsView, ProtectedMediaView, ReadyzView
+
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
     TokenRefreshView,
 )
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('healthz', HealthzView.as_view(), name='healthz'),
+    path('readyz', ReadyzView.as_view(), name='readyz'),
+    path('api/token/', LoginTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('api/auth/token/', TokenObtainPairView.as_view()),
+    path('api/auth/token/', LoginTokenObtainPairView.as_view()),
     path('api/auth/token/refresh/', TokenRefreshView.as_view()),
-    path('api/auth/', include('rest_framework.urls')),
-    path('api/password_reset/', include('django_rest_passwordreset.urls')),
     # Application
     path('api/', include('api.urls')),
     path('api/relevenote/', include('releveNote.urls')),
@@ -24,5 +26,10 @@ urlpatterns = [
     path('api/scolarite/', include('Scolarite.urls')),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if settings.DEBUG and not settings.MEDIA_PROTECTED:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+else:
+    # Médias servis après contrôle d'accès (X-Accel-Redirect / X-Sendfile / FileResponse)
+    urlpatterns += [
+        path(f"{settings.MEDIA_URL.strip('/')}/<path:chemin>", ProtectedMediaView.as_view(), name='protected-media'),
+    ]
\ No newline at end of file
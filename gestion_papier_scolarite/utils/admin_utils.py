@@ -0,0 +1,127 @@
+# gestion_papier_scolarite/utils/admin_utils.py
+
+from collections import Counter
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from gestion_papier_scolarite.utils.metrics import registre as registre_metriques
+from Scolarite.notifications import notifier_changements_statut
+
+# En dessous, le COUNT(*) exact reste bon marché
+SEUIL_ESTIMATION = 10_000
+
+STATUTS_TRAITES = ('pret', 'retire', 'rejete')
+
+# Taille des UPDATE ... WHERE pk IN (...) d'une action de statut
+TAILLE_LOT_STATUT = 1000
+
+
+# ====================== PAGINATION ======================
+class PaginatorEstime(Paginator):
+    """
+    Sur PostgreSQL, une liste non filtrée utilise l'estimation du planificateur
+    (pg_class.reltuples) au lieu d'un COUNT(*) qui parcourt toute la table.
+    Listes filtrées et autres bases : compte exact.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            connexion = connections[queryset.db]
+            if connexion.vendor == 'postgresql':
+                with connexion.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                        [queryset.model._meta.db_table],
+                    )
+                    ligne = cursor.fetchone()
+                if ligne and ligne[0] >= SEUIL_ESTIMATION:
+                    return ligne[0]
+        return super().count
+
+
+# ====================== DEMANDES ======================
+def action_statut(statut, libelle):
+    @admin.action(description=f"Passer au statut « {libelle} » (notifie les étudiants)")
+    def action(modeladmin, request, queryset):
+        modeladmin.changer_statut(request, queryset, statut)
+    action.__name__ = f"passer_{statut}"
+    return action
+
+
+class DemandeAdmin(admin.ModelAdmin):
+    """
+    Base des admins de demandes (relevés, certificats, attestations), pensée
+    pour les grandes tables : étudiant chargé en jointure, pas de second COUNT(*),
+    filtres et navigation par date sur des colonnes indexées.
+    """
+    type_demande = None  # 'releve', 'certificat' ou 'attestation'
+    champ_numero = None
+
+    list_select_related = ('etudiant__user',)
+    autocomplete_fields = ('etudiant',)
+    show_full_result_count = False
+    paginator = PaginatorEstime
+    list_per_page = 50
+    list_filter = ('statut',)
+    date_hierarchy = 'date_demande'
+    readonly_fields = ('date_demande',)
+    actions = [action_statut('en_cours', "En cours"), action_statut('pret', "Prêt à retirer")]
+
+    def get_search_fields(self, request):
+        # Recherches exactes : servies par les index uniques / de clé étrangère
+        return (f'={self.champ_numero}', '=etudiant__immatricule', '=etudiant__user__email')
+
+    def get_readonly_fields(self, request, obj=None):
+        return (self.champ_numero, *super().get_readonly_fields(request, obj))
+
+    def changer_statut(self, request, queryset, statut):
+        """
+        Sélection bornée par ADMIN_ACTION_MAX_SELECTION (au-delà, l'action est
+        refusée sans rien modifier), UPDATE par lots de TAILLE_LOT_STATUT,
+        emails mis en file après le commit
+        """
+        libelles = dict(self.model._meta.get_field('statut').choices)
+        maximum = settings.ADMIN_ACTION_MAX_SELECTION
+        # Au plus maximum + 1 lignes lues : suffit pour détecter le dépassement
+        anciens = dict(
+            queryset.exclude(statut=statut).order_by('pk').values_list('pk', 'statut')[:maximum + 1]
+        )
+        if len(anciens) > maximum:
+            self.message_user(
+                request,
+                f"Sélection trop grande (plus de {maximum} demandes à modifier) : "
+                f"affinez les filtres avant de relancer l'action.",
+                messages.ERROR,
+            )
+            return
+
+        valeurs = {'statut': statut}
+        if statut in STATUTS_TRAITES:
+            valeurs['date_traitement'] = timezone.now()
+        pks = list(anciens)
+        modifiees = 0
+        for debut in range(0, len(pks), TAILLE_LOT_STATUT):
+            modifiees += self.model.objects.filter(pk__in=pks[debut:debut + TAILLE_LOT_STATUT]).update(**valeurs)
+
+        for ancien, nombre in Counter(anciens.values()).items():
+            registre_metriques.incrementer(
+                'demandes_transitions_total', nombre, type=self.type_demande, ancien=ancien, nouveau=statut,
+            )
+        notifier_changements_statut(
+            self.model, self.type_demande,
+            {pk: libelles.get(ancien, ancien) for pk, ancien in anciens.items()},
+            statut,
+        )
+        self.message_user(
+            request,
+            f"{modifiees} demande(s) passée(s) au statut « {libelles.get(statut, statut)} », notification(s) en file d'envoi.",
+            messages.SUCCESS,
+        )
@@ -0,0 +1,53 @@
+# gestion_papier_scolarite/utils/archive.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+def avec_archives(request):
+    """?archive=1 : la vue interroge les demandes archivées (historique) au lieu des demandes en cours"""
+    return request.query_params.get('archive', '').lower() in ('1', 'true', 'oui')
+
+
+def date_limite_archivage(annees=None):
+    annees = annees if annees is not None else getattr(settings, 'ARCHIVE_APRES_ANNEES', 2)
+    return timezone.now() - timedelta(days=365 * annees)
+
+
+def demandes_archivables(model, avant):
+    """Demandes terminées (ARCHIVE_STATUTS) traitées avant la date donnée"""
+    statuts = getattr(settings, 'ARCHIVE_STATUTS', ['pret', 'retire', 'rejete'])
+    return model.objects.filter(statut__in=statuts).filter(
+        Q(date_traitement__lt=avant) | Q(date_traitement__isnull=True, date_demande__lt=avant)
+    )
+
+
+def archiver_lot(archivables, modele_archive, ids):
+    """
+    Copie les demandes dans la table d'archive puis les supprime de la table
+    courante, dans une seule transaction courte. Les lignes sont verrouillées
+    et l'éligibilité revérifiée : une demande modifiée entre-temps reste en place.
+
+    Une demande dont l'identifiant existe déjà dans l'archive n'est ni copiée
+    ni supprimée : la ligne courante n'est jamais effacée au profit d'une copie
+    plus ancienne. Seules les demandes effectivement insérées sont supprimées
+    (une insertion concurrente du même identifiant fait échouer le lot entier).
+    Retourne (nombre de demandes archivées, identifiants laissés en place).
+    """
+    champs = [
+        field.attname for field in modele_archive._meta.concrete_fields
+        if field.attname != 'archive_le'
+    ]
+    with transaction.atomic():
+        lignes = list(archivables.filter(pk__in=ids).select_for_update().values(*champs))
+        en_conflit = set(
+            modele_archive.objects.filter(pk__in=[ligne['id'] for ligne in lignes]).values_list('pk', flat=True)
+        )
+        lignes = [ligne for ligne in lignes if ligne['id'] not in en_conflit]
+        modele_archive.objects.bulk_create([modele_archive(**ligne) for ligne in lignes])
+        archivables.model.objects.filter(pk__in=[ligne['id'] for ligne in lignes]).delete()
+    return len(lignes), sorted(en_conflit)
@@ -0,0 +1,50 @@
+# gestion_papier_scolarite/utils/db_router.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+ALIAS_REPLICA = 'replica'
+
+# Alias de lecture de la requête en cours (None = base principale)
+_alias_lecture = ContextVar('alias_lecture', default=None)
+
+
+def replica_disponible():
+    return ALIAS_REPLICA in settings.DATABASES
+
+
+@contextmanager
+def lecture_replica(actif=True):
+    """Envoie les lectures du bloc vers le réplica (si configuré)"""
+    jeton = _alias_lecture.set(ALIAS_REPLICA if actif and replica_disponible() else None)
+    try:
+        yield
+    finally:
+        _alias_lecture.reset(jeton)
+
+
+def activer_lecture_replica():
+    """Lectures sur le réplica jusqu'à la fin du bloc lecture_replica() englobant"""
+    if replica_disponible():
+        _alias_lecture.set(ALIAS_REPLICA)
+
+
+class ReplicaRouter:
+    """
+    Les écritures vont toujours sur 'default'. Les lectures ne vont sur
+    'replica' que dans un bloc lecture_replica() : par défaut tout reste
+    sur la base principale, seules les vues marquées lecture_replica = True
+    (voir ReplicaMiddleware) lisent sur le réplica.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _alias_lecture.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Même schéma et mêmes données sur les deux alias
+        return True
@@ -0,0 +1,173 @@
+# gestion_papier_scolarite/utils/factories.py
+
+import itertools
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from api.models import Etudiant, Scolarite, User
+from Attestation.models import Attestation
+from CertificatScolarite.models import CertificatScolarite
+from releveNote.models import ReleveNote, ReleveNoteAnnee, ReleveNoteLigne, annees_releve, lignes_releve
+
+# Données synthétiques insérées par bulk_create (tests de requêtes, benchmarks) :
+# pas de save() ni de signaux, une requête INSERT par lot.
+# Les numéros générés (R-F…, C-F…, A-F…) ne croisent jamais ceux attribués par save().
+
+_sequence = itertools.count(1)
+MOT_DE_PASSE_INUTILISABLE = make_password(None)
+
+NIVEAUX = [niveau for niveau, _ in ReleveNote.NIVEAU_CHOICES]
+STATUTS = [statut for statut, _ in CertificatScolarite.STATUT_CHOICES]
+STATUTS_TRAITES = {'pret', 'retire', 'rejete'}
+TYPES_ATTESTATION = [type_att for type_att, _ in Attestation.TYPE_ATTESTATION_CHOICES]
+
+
+def reprendre_sequence(debut):
+    """Repart de `debut` (ex. après des données déjà générées dans la même base)"""
+    global _sequence
+    _sequence = itertools.count(debut)
+
+
+def numero_unique():
+    """Entier jamais renvoyé deux fois (emails, immatricules, numéros de demande)"""
+    return next(_sequence)
+
+
+def _numeros(nombre):
+    return [numero_unique() for _ in range(nombre)]
+
+
+# ====================== COMPTES ======================
+def creer_utilisateurs(nombre, role='etudiant', batch_size=1000):
+    """Utilisateurs sans mot de passe utilisable (aucun hachage coûteux)"""
+    return User.objects.bulk_create([
+        User(
+            email=f"{role}{numero}@factory.test",
+            nom=f"Nom{numero}",
+            prenoms=f"Prenoms {numero}",
+            role=role,
+            is_staff=role == 'scolarite',  # comme User.save() (bulk_create ne l'appelle pas)
+            password=MOT_DE_PASSE_INUTILISABLE,
+        )
+        for numero in _numeros(nombre)
+    ], batch_size=batch_size)
+
+
+def creer_etudiants(nombre, batch_size=1000):
+    users = creer_utilisateurs(nombre, 'etudiant', batch_size=batch_size)
+    return Etudiant.objects.bulk_create([
+        Etudiant(user=user, immatricule=f"F{user.pk:08d}", contact="0340000000")
+        for user in users
+    ], batch_size=batch_size)
+
+
+def creer_scolarites(nombre, batch_size=1000):
+    users = creer_utilisateurs(nombre, 'scolarite', batch_size=batch_size)
+    return Scolarite.objects.bulk_create([
+        Scolarite(user=user, fonction="Agent") for user in users
+    ], batch_size=batch_size)
+
+
+# ====================== DEMANDES ======================
+def _repartir(etudiants, nombre):
+    """Étudiants attribués à tour de rôle aux `nombre` demandes"""
+    return itertools.islice(itertools.cycle(etudiants), nombre)
+
+
+@contextmanager
+def _dates_conservees(model):
+    """
+    bulk_create garde la date_demande fournie (auto_now_add suspendu pendant l'insertion).
+    Réservé à la génération de données : le champ est modifié pour tout le processus.
+    """
+    champ = model._meta.get_field('date_demande')
+    auto_now_add = champ.auto_now_add
+    champ.auto_now_add = False
+    try:
+        yield
+    finally:
+        champ.auto_now_add = auto_now_add
+
+
+def _etat(index, statut, statuts, jours, aleatoire, maintenant):
+    """
+    statut, date_demande et date_traitement de la index-ième demande.
+    Sans `jours`, date_demande est laissée à auto_now_add (maintenant).
+    """
+    statut = statut or statuts[index % len(statuts)]
+    etat = {'statut': statut}
+    if jours:
+        date_demande = maintenant - timedelta(seconds=aleatoire.randrange(jours * 86400))
+        etat['date_demande'] = date_demande
+        if statut in STATUTS_TRAITES:
+            etat['date_traitement'] = min(date_demande + timedelta(days=aleatoire.randint(1, 10)), maintenant)
+    return etat
+
+
+def _inserer(model, objets, jours, batch_size):
+    if jours:
+        with _dates_conservees(model):
+            return model.objects.bulk_create(objets, batch_size=batch_size)
+    return model.objects.bulk_create(objets, batch_size=batch_size)
+
+
+def creer_releves(etudiants, nombre, statut=None, statuts=STATUTS, jours=None, graine=None, batch_size=1000):
+    """
+    Relevés et leurs lignes normalisées (ReleveNoteLigne, ReleveNoteAnnee), comme ReleveNote.save().
+    statut fixe, ou statuts attribués à tour de rôle ; jours : dates de demande
+    réparties sur les `jours` derniers jours (reproductibles avec `graine`).
+    """
+    aleatoire, maintenant = random.Random(graine), timezone.now()
+    releves = []
+    for index, (etudiant, numero) in enumerate(zip(_repartir(etudiants, nombre), _numeros(nombre))):
+        releves.append(ReleveNote(
+            etudiant=etudiant,
+            id_releve=f"R-F{numero:07d}",
+            demandes=[{'niveau': NIVEAUX[index % len(NIVEAUX)], 'quantite': 1 + index % 3}],
+            annee_universitaire=[2020 + index % 5],
+            **_etat(index, statut, statuts, jours, aleatoire, maintenant),
+        ))
+    releves = _inserer(ReleveNote, releves, jours, batch_size)
+    ReleveNoteLigne.objects.bulk_create(
+        (ligne for releve in releves for ligne in lignes_releve(releve)), batch_size=batch_size,
+    )
+    ReleveNoteAnnee.objects.bulk_create(
+        (annee for releve in releves for annee in annees_releve(releve)), batch_size=batch_size,
+    )
+    return releves
+
+
+def creer_certificats(etudiants, nombre, statut=None, statuts=STATUTS, jours=None, graine=None, batch_size=1000):
+    aleatoire, maintenant = random.Random(graine), timezone.now()
+    return _inserer(CertificatScolarite, [
+        CertificatScolarite(
+            etudiant=etudiant,
+            id_certificat=f"C-F{numero:07d}",
+            lieu_naissance="Antananarivo",
+            quantite=1 + index % 3,
+            **_etat(index, statut, statuts, jours, aleatoire, maintenant),
+        )
+        for index, (etudiant, numero) in enumerate(zip(_repartir(etudiants, nombre), _numeros(nombre)))
+    ], jours, batch_size)
+
+
+def creer_attestations(etudiants, nombre, statut=None, statuts=STATUTS, jours=None, graine=None, batch_size=1000):
+    aleatoire, maintenant = random.Random(graine), timezone.now()
+    attestations = []
+    for index, (etudiant, numero) in enumerate(zip(_repartir(etudiants, nombre), _numeros(nombre))):
+        quantite = 1 + index % 3
+        attestations.append(Attestation(
+            etudiant=etudiant,
+            id_attestation=f"A-F{numero:07d}",
+            type_attestation=TYPES_ATTESTATION[index % len(TYPES_ATTESTATION)],
+            annee_scolaire="2024-2025",
+            quantite=quantite,
+            total_paye=Decimal('3000.00') * quantite,
+            **_etat(index, statut, statuts, jours, aleatoire, maintenant),
+        ))
+    return _inserer(Attestation, attestations, jours, batch_size)
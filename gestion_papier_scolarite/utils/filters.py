@@ -0,0 +1,75 @@
+# gestion_papier_scolarite/utils/filters.py
+
+from datetime import datetime, time, timedelta
+
+import django_filters
+from django import forms
+from django.utils import timezone
+
+# Statuts utilisés par les trois types de demandes (changer-statut unifié)
+STATUTS_DEMANDE = [
+    ('en_attente', 'En attente'),
+    ('en_cours', 'En cours'),
+    ('pret', 'Prêt à retirer'),
+    ('retire', 'Retiré'),
+    ('rejete', 'Rejeté'),
+]
+FORMAT_DATE = '%Y-%m-%d'
+
+
+def debut_journee(jour):
+    """Minuit du jour donné dans le fuseau courant (datetime aware)"""
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def plage_jours(champ, debut=None, fin=None):
+    """
+    Filtre [debut 00:00, fin + 1 jour 00:00[ sur un DateTimeField.
+    Contrairement à champ__date__gte, la colonne n'est pas convertie :
+    l'index sur le champ reste utilisable.
+    """
+    bornes = {}
+    if debut:
+        bornes[f'{champ}__gte'] = debut_journee(debut)
+    if fin:
+        bornes[f'{champ}__lt'] = debut_journee(fin + timedelta(days=1))
+    return bornes
+
+
+class DemandeFilterForm(forms.Form):
+    def clean(self):
+        cleaned_data = super().clean()
+        debut, fin = cleaned_data.get('date_debut'), cleaned_data.get('date_fin')
+        if debut and fin and debut > fin:
+            raise forms.ValidationError("date_debut doit précéder date_fin.")
+        return cleaned_data
+
+
+class DemandeFilterSet(django_filters.FilterSet):
+    """
+    Filtres communs aux listes de demandes :
+    ?statut=en_attente&date_debut=AAAA-MM-JJ&date_fin=AAAA-MM-JJ (bornes incluses)
+    """
+    statut = django_filters.ChoiceFilter(choices=STATUTS_DEMANDE)
+    date_debut = django_filters.DateFilter(method='filtrer_periode', input_formats=[FORMAT_DATE])
+    date_fin = django_filters.DateFilter(method='filtrer_periode', input_formats=[FORMAT_DATE])
+
+    class Meta:
+        form = DemandeFilterForm
+        fields = ['statut']
+
+    def filtrer_periode(self, queryset, name, value):
+        if name == 'date_debut':
+            return queryset.filter(**plage_jours('date_demande', debut=value))
+        return queryset.filter(**plage_jours('date_demande', fin=value))
+
+
+def filtrer(filterset_class, request, queryset):
+    """
+    Applique un FilterSet aux paramètres de la requête.
+    Retourne (queryset filtré, None) ou (None, erreurs) si un paramètre est invalide.
+    """
+    filterset = filterset_class(request.query_params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        return None, filterset.errors
+    return filterset.qs, None
@@ -0,0 +1,112 @@
+# gestion_papier_scolarite/utils/health.py
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from gestion_papier_scolarite.utils.image_utils import photos_en_attente
+from gestion_papier_scolarite.utils.logging_utils import QueueHandlerAsynchrone
+from Scolarite.notifications import notifications_en_attente
+
+CLE_CACHE = 'readyz'
+
+_verrou = threading.Lock()
+_dernier = None  # (instant monotonic, résultat)
+_migrations_ok = False
+
+
+# ====================== VÉRIFICATIONS ======================
+def verifier_bases():
+    """Un SELECT 1 par base configurée (principale et réplica éventuel)"""
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    return {'bases': list(connections)}
+
+
+def verifier_cache():
+    cache = caches['default']
+    cache.set(CLE_CACHE, 1, 30)
+    if cache.get(CLE_CACHE) != 1:
+        raise RuntimeError("Valeur écrite dans le cache non relue")
+    return {}
+
+
+def verifier_media():
+    dossier = settings.MEDIA_ROOT
+    if not os.path.isdir(dossier) or not os.access(dossier, os.W_OK | os.X_OK):
+        raise RuntimeError(f"{dossier} absent ou non inscriptible")
+    return {}
+
+
+def verifier_files():
+    """Travaux différés en attente dans ce processus : photos à traiter, emails, logs à écrire"""
+    logs = sum(
+        handler.queue.qsize()
+        for handler in logging.getLogger().handlers
+        if isinstance(handler, QueueHandlerAsynchrone)
+    )
+    files = {'photos': photos_en_attente(), 'notifications': notifications_en_attente(), 'logs': logs}
+    maximum = getattr(settings, 'READINESS_MAX_QUEUE', 1000)
+    saturees = [nom for nom, profondeur in files.items() if profondeur > maximum]
+    if saturees:
+        raise RuntimeError(f"File(s) au-delà de {maximum} : {', '.join(saturees)}")
+    return files
+
+
+def verifier_migrations():
+    """
+    Migrations non appliquées sur la base principale. Une fois à jour, le résultat
+    est retenu pour la vie du processus : le code des migrations ne change plus.
+    """
+    global _migrations_ok
+    if _migrations_ok:
+        return {}
+    executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        raise RuntimeError(f"{len(plan)} migration(s) non appliquée(s)")
+    _migrations_ok = True
+    return {}
+
+
+VERIFICATIONS = {
+    'base': verifier_bases,
+    'cache': verifier_cache,
+    'media': verifier_media,
+    'files': verifier_files,
+    'migrations': verifier_migrations,
+}
+
+
+# ====================== ÉTAT AGRÉGÉ ======================
+def _executer():
+    resultats = {}
+    for nom, verifier in VERIFICATIONS.items():
+        debut = time.perf_counter()
+        try:
+            resultat = {'ok': True, **verifier()}
+        except Exception as exc:
+            resultat = {'ok': False, 'erreur': f"{type(exc).__name__}: {exc}"}
+        resultat['duree_ms'] = round((time.perf_counter() - debut) * 1000, 1)
+        resultats[nom] = resultat
+    return {'pret': all(resultat['ok'] for resultat in resultats.values()), 'verifications': resultats}
+
+
+def etat_preparation():
+    """
+    Résultat des vérifications, recalculé au plus toutes les READINESS_CACHE_SECONDS
+    secondes par processus : les sondes fréquentes lisent la valeur en mémoire.
+    """
+    global _dernier
+    duree_cache = getattr(settings, 'READINESS_CACHE_SECONDS', 5)
+    with _verrou:
+        if _dernier is None or time.monotonic() - _dernier[0] >= duree_cache:
+            _dernier = (time.monotonic(), _executer())
+        return _dernier[1]
@@ -0,0 +1,256 @@
+# gestion_papier_scolarite/utils/image_utils.py
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from gestion_papier_scolarite.utils.storage import content_addressed_name
+
+logger = logging.getLogger(__name__)
+
+DOSSIER_PHOTOS = 'profile_photos'
+
+# Format Pillow et options d'encodage pour chaque extension générée
+ENCODAGES = {
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'png': ('PNG', {'optimize': True}),
+    'gif': ('GIF', {'optimize': True}),
+}
+
+
+def get_tailles_miniatures():
+    return getattr(settings, 'PROFILE_PHOTO_THUMBNAIL_SIZES', [64, 256])
+
+
+def get_formats_miniatures():
+    return getattr(settings, 'PROFILE_PHOTO_THUMBNAIL_FORMATS', ['webp', 'jpeg'])
+
+
+def nom_miniature(name, taille, ext):
+    """
+    Chemin d'une miniature à partir du chemin de la photo traitée
+    Exemple: profile_photos/ab/ab12...ef.jpg → profile_photos/ab/ab12...ef_64.webp
+    """
+    base, _ = os.path.splitext(name)
+    return f"{base}_{taille}.{ext}"
+
+
+def noms_miniatures(name):
+    return [
+        nom_miniature(name, taille, ext)
+        for taille in get_tailles_miniatures()
+        for ext in get_formats_miniatures()
+    ]
+
+
+def _encoder(image, ext):
+    """Encode une image Pillow dans le format correspondant à l'extension (sans EXIF)"""
+    format_pil, options = ENCODAGES.get(ext.lower(), ENCODAGES['jpeg'])
+    if format_pil == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif format_pil == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=format_pil, **options)
+    return buffer.getvalue()
+
+
+def _ecrire(storage, name, contenu):
+    """Fichiers nommés d'après le contenu traité : écrits une fois, jamais remplacés"""
+    if not storage.exists(name):
+        storage.save(name, ContentFile(contenu))
+
+
+def traiter_image(contenu, name, taille_max, tailles, formats):
+    """
+    Travail Pillow pur (sans Django), exécutable dans un processus du pool :
+    - corrige l'orientation et supprime les métadonnées EXIF
+    - redimensionne l'originale à taille_max
+    - génère les miniatures carrées dans chaque format
+
+    La photo traitée est nommée d'après son propre SHA-256 (et non celui de
+    l'upload) : son chemin reste fidèle au contenu servi avec un cache immuable.
+    Retourne (chemin de la photo traitée, {chemin: octets} pour elle et chaque miniature).
+    """
+    image = Image.open(BytesIO(contenu))
+    image.load()
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(taille_max, Image.LANCZOS)
+
+    ext = os.path.splitext(name)[1].lstrip('.').lower() or 'jpeg'
+    originale = _encoder(image, ext)
+    nom = content_addressed_name(DOSSIER_PHOTOS, hashlib.sha256(originale).hexdigest(), ext)
+    fichiers = {nom: originale}
+
+    for taille in tailles:
+        miniature = ImageOps.fit(image, (taille, taille), Image.LANCZOS)
+        for ext_miniature in formats:
+            fichiers[nom_miniature(nom, taille, ext_miniature)] = _encoder(miniature, ext_miniature)
+    return nom, fichiers
+
+
+def _lire_et_preparer(photo):
+    with photo.open('rb'):
+        contenu = photo.read()
+    return (
+        contenu,
+        photo.name,
+        (settings.MAX_IMAGE_WIDTH, settings.MAX_IMAGE_HEIGHT),
+        list(get_tailles_miniatures()),
+        list(get_formats_miniatures()),
+    )
+
+
+def _mettre_a_jour(user_id, name, **valeurs):
+    """UPDATE de la photo si elle n'a pas changé entre-temps (queryset.update : cache JWT invalidé à la main)"""
+    from api.authentication import invalidate_cached_user
+    from api.models import User
+
+    modifies = User.objects.filter(pk=user_id, photo_profil=name).update(**valeurs)
+    invalidate_cached_user(user_id)
+    return modifies
+
+
+def _enregistrer_resultat(user_id, storage, name, resultat):
+    """
+    Écrit la photo traitée et ses miniatures, fait pointer photo_profil dessus
+    (état 'prete') puis supprime l'upload brut s'il n'est plus référencé
+    """
+    from api.models import User
+
+    nom, fichiers = resultat
+    # La photo a pu être remplacée ou supprimée pendant le traitement
+    if not User.objects.filter(pk=user_id, photo_profil=name).exists():
+        return
+    for chemin, contenu in fichiers.items():
+        _ecrire(storage, chemin, contenu)
+    _mettre_a_jour(user_id, name, photo_profil=nom, photo_statut='prete')
+    if nom != name and not User.objects.filter(photo_profil=name).exists():
+        storage.delete(name)
+
+
+def process_profile_photo(user):
+    """
+    Traite la photo de profil d'un utilisateur de façon synchrone
+    (redimensionnement, EXIF, miniatures) puis la marque comme prête.
+    """
+    photo = user.photo_profil
+    if not photo:
+        return
+
+    _enregistrer_resultat(user.pk, photo.storage, photo.name, traiter_image(*_lire_et_preparer(photo)))
+    user.refresh_from_db(fields=['photo_profil', 'photo_statut'])
+
+
+# ====================== POOL DE PROCESSUS ======================
+_executor = None
+# Thread dédié aux écritures (fichiers, base) des résultats : jamais le thread de la requête
+_executor_resultats = None
+_executor_lock = threading.Lock()
+# Photos soumises au pool et pas encore enregistrées (profondeur de la file, cf. /readyz)
+_en_attente = 0
+
+
+def photos_en_attente():
+    return _en_attente
+
+
+def _compter_en_attente(delta):
+    global _en_attente
+    with _executor_lock:
+        _en_attente += delta
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'PROFILE_PHOTO_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _get_executor_resultats():
+    global _executor_resultats
+    with _executor_lock:
+        if _executor_resultats is None:
+            _executor_resultats = ThreadPoolExecutor(max_workers=1, thread_name_prefix='photos')
+        return _executor_resultats
+
+
+def _terminer(user_id, storage, name, future):
+    """Enregistre le résultat du pool, ou passe la photo à l'état 'echec'"""
+    try:
+        _enregistrer_resultat(user_id, storage, name, future.result())
+    except Exception:
+        logger.exception("Erreur traitement photo %s", name)
+        _mettre_a_jour(user_id, name, photo_statut='echec')
+    finally:
+        _compter_en_attente(-1)
+        # Connexion ouverte par ce thread : à fermer (le thread ne sert plus les requêtes)
+        if getattr(settings, 'PROFILE_PHOTO_ASYNC', True):
+            connections.close_all()
+
+
+def _soumettre(user_id, storage, args):
+    name = args[1]
+    _compter_en_attente(1)
+    try:
+        future = _get_executor().submit(traiter_image, *args)
+    except Exception:
+        _compter_en_attente(-1)
+        raise
+    # Le callback peut s'exécuter dans le thread appelant (future déjà terminée) :
+    # il ne fait que passer la main au thread des résultats
+    future.add_done_callback(
+        lambda future: _get_executor_resultats().submit(_terminer, user_id, storage, name, future)
+    )
+
+
+def schedule_profile_photo_processing(user):
+    """
+    Enregistre l'originale telle quelle, passe la photo à l'état 'en_traitement'
+    et délègue le traitement Pillow au pool de processus.
+    La photo traitée (et ses miniatures) remplace l'upload brut dès qu'elle est prête.
+    """
+    photo = user.photo_profil
+    if not photo:
+        return
+
+    # Photo déjà traitée (upload identique à une photo traitée) : miniatures déjà générées
+    tailles, formats = get_tailles_miniatures(), get_formats_miniatures()
+    if tailles and formats and photo.storage.exists(nom_miniature(photo.name, tailles[-1], formats[-1])):
+        type(user).objects.filter(pk=user.pk).update(photo_statut='prete')
+        user.photo_statut = 'prete'
+        return
+
+    if not getattr(settings, 'PROFILE_PHOTO_ASYNC', True):
+        process_profile_photo(user)
+        return
+
+    type(user).objects.filter(pk=user.pk).update(photo_statut='en_traitement')
+    user.photo_statut = 'en_traitement'
+
+    args = _lire_et_preparer(photo)
+    transaction.on_commit(lambda: _soumettre(user.pk, photo.storage, args))
+
+
+def delete_photo_variants(photo):
+    """Supprime les miniatures associées à une photo de profil"""
+    if not photo:
+        return
+    for name in noms_miniatures(photo.name):
+        photo.storage.delete(name)
@@ -0,0 +1,131 @@
+# gestion_papier_scolarite/utils/instrumentation.py
+
+import heapq
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from gestion_papier_scolarite.utils.metrics import registre as registre_metriques
+
+# Mesure de la requête HTTP en cours (None = requête non instrumentée)
+_mesure = ContextVar('mesure_requete', default=None)
+
+LONGUEUR_MAX_SQL = 300
+
+
+class Mesure:
+    """
+    Compteurs d'une requête HTTP : requêtes SQL (nombre, durée, les plus lentes)
+    et durées des étapes chronométrées (sérialisation, email...).
+    Les durées sont en secondes.
+    """
+
+    def __init__(self, nb_lentes=3):
+        self.debut = time.perf_counter()
+        self.requetes = 0
+        self.duree_sql = 0.0
+        self.nb_lentes = nb_lentes
+        self.lentes = []  # tas (durée, ordre, sql) des requêtes les plus lentes
+        self.etapes = {}
+
+    def enregistrer_requete(self, sql, duree):
+        self.requetes += 1
+        self.duree_sql += duree
+        if not self.nb_lentes:
+            return
+        entree = (duree, self.requetes, sql)
+        if len(self.lentes) < self.nb_lentes:
+            heapq.heappush(self.lentes, entree)
+        elif duree > self.lentes[0][0]:
+            heapq.heapreplace(self.lentes, entree)
+
+    def ajouter(self, etape, duree):
+        self.etapes[etape] = self.etapes.get(etape, 0.0) + duree
+
+    def requetes_lentes(self):
+        """[(durée, sql)] de la plus lente à la plus rapide"""
+        return [(duree, sql[:LONGUEUR_MAX_SQL]) for duree, _, sql in sorted(self.lentes, reverse=True)]
+
+    def duree_totale(self):
+        return time.perf_counter() - self.debut
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() : chronomètre chaque requête SQL"""
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.enregistrer_requete(sql, time.perf_counter() - debut)
+
+
+def mesure_courante():
+    return _mesure.get()
+
+
+@contextmanager
+def mesurer(mesure):
+    jeton = _mesure.set(mesure)
+    try:
+        yield mesure
+    finally:
+        _mesure.reset(jeton)
+
+
+@contextmanager
+def chronometre(etape):
+    """Ajoute la durée du bloc à l'étape `etape` de la requête en cours ; sans effet hors mesure"""
+    mesure = _mesure.get()
+    if mesure is None:
+        yield
+        return
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        mesure.ajouter(etape, time.perf_counter() - debut)
+
+
+def server_timing(mesure):
+    """Valeur de l'en-tête Server-Timing (durées en millisecondes, sans texte SQL)"""
+    entrees = [f'db;dur={mesure.duree_sql * 1000:.1f};desc="{mesure.requetes} requetes"']
+    entrees += [f'{etape};dur={duree * 1000:.1f}' for etape, duree in mesure.etapes.items()]
+    entrees += [f'sql-{rang};dur={duree * 1000:.1f}' for rang, (duree, _) in enumerate(mesure.requetes_lentes(), 1)]
+    entrees.append(f'total;dur={mesure.duree_totale() * 1000:.1f}')
+    return ', '.join(entrees)
+
+
+# ====================== EMAIL ======================
+class EmailBackendMesure(BaseEmailBackend):
+    """
+    Chronomètre les envois (connexion SMTP comprise) dans l'étape 'email',
+    compte envois et échecs (métriques) et délègue au backend INSTRUMENTATION_EMAIL_BACKEND.
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.backend = get_connection(settings.INSTRUMENTATION_EMAIL_BACKEND, fail_silently=fail_silently, **kwargs)
+
+    def open(self):
+        with chronometre('email'):
+            return self.backend.open()
+
+    def close(self):
+        with chronometre('email'):
+            return self.backend.close()
+
+    def send_messages(self, email_messages):
+        with chronometre('email'):
+            try:
+                envoyes = self.backend.send_messages(email_messages) or 0
+            except Exception:
+                registre_metriques.incrementer('emails_failed_total', len(email_messages))
+                raise
+        registre_metriques.incrementer('emails_sent_total', envoyes)
+        if envoyes < len(email_messages):
+            # fail_silently : les échecs ne lèvent pas d'exception
+            registre_metriques.incrementer('emails_failed_total', len(email_messages) - envoyes)
+        return envoyes
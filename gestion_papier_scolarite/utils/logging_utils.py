@@ -0,0 +1,116 @@
+# gestion_papier_scolarite/utils/logging_utils.py
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Identifiant de corrélation de la requête HTTP en cours (renseigné par CorrelationIdMiddleware)
+_correlation_id = ContextVar('correlation_id', default=None)
+
+# X-Request-ID reçu d'un proxy : accepté s'il reste court et sans caractère exotique
+_ID_VALIDE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+FORMAT_TEXTE = '%(asctime)s %(levelname)s %(name)s [%(correlation_id)s] %(message)s'
+
+# Attributs présents sur tout LogRecord : le reste vient de extra={...}
+_ATTRIBUTS_STANDARD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'correlation_id', 'taskName',
+}
+
+
+def correlation_id_courant():
+    return _correlation_id.get()
+
+
+def definir_correlation_id(valeur=None):
+    """Fixe l'identifiant de la requête (celui du proxy s'il est valide, sinon un nouveau) ; retourne le jeton de reset"""
+    if not valeur or not _ID_VALIDE.match(valeur):
+        valeur = uuid.uuid4().hex
+    return _correlation_id.set(valeur)
+
+
+def reinitialiser_correlation_id(jeton):
+    _correlation_id.reset(jeton)
+
+
+# ====================== FILTRE / FORMATEUR ======================
+class CorrelationIdFilter(logging.Filter):
+    """
+    Ajoute record.correlation_id ('-' hors requête), lu dans le thread qui journalise.
+    Les logs django.request (émis après les middlewares) le reprennent de extra={'request': ...}.
+    """
+
+    def filter(self, record):
+        if not hasattr(record, 'correlation_id'):
+            record.correlation_id = (
+                _correlation_id.get()
+                or getattr(getattr(record, 'request', None), 'correlation_id', None)
+                or '-'
+            )
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, champs extra={...} inclus (ingestion Loki/ELK...)"""
+
+    def format(self, record):
+        entree = {
+            'horodatage': datetime.fromtimestamp(record.created, dt_timezone.utc).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'correlation_id': getattr(record, 'correlation_id', '-'),
+        }
+        for cle, valeur in vars(record).items():
+            if cle not in _ATTRIBUTS_STANDARD and cle not in entree:
+                entree[cle] = valeur
+        if record.exc_info:
+            entree['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entree['pile'] = self.formatStack(record.stack_info)
+        return json.dumps(entree, ensure_ascii=False, default=str)
+
+
+# ====================== HANDLER NON BLOQUANT ======================
+class QueueHandlerAsynchrone(QueueHandler):
+    """
+    Handler à file d'attente : le thread de la requête ne fait que déposer
+    l'enregistrement, un QueueListener formate et écrit sur `flux` (stderr).
+
+    sortie : 'json' (ingestion) ou 'texte' (lecture humaine).
+    Déclaré dans LOGGING via la clé '()' : dictConfig (3.12+) traite à sa façon
+    les sous-classes de QueueHandler déclarées par 'class'.
+    """
+
+    def __init__(self, sortie='texte', flux=None):
+        super().__init__(queue.SimpleQueue())
+        cible = logging.StreamHandler(flux or sys.stderr)
+        cible.setFormatter(JSONFormatter() if sortie == 'json' else logging.Formatter(FORMAT_TEXTE))
+        self.listener = QueueListener(self.queue, cible)
+        self.listener.start()
+        atexit.register(self.arreter)
+
+    def prepare(self, record):
+        # QueueHandler.prepare() formate le message dans le thread appelant : on ne fait
+        # que figer le texte (les arguments pourraient changer d'ici l'écriture)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def arreter(self):
+        """Vide la file et arrête le thread d'écriture (idempotent)"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self.arreter()
+        super().close()
@@ -0,0 +1,83 @@
+# gestion_papier_scolarite/utils/media.py
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date
+
+from gestion_papier_scolarite.utils.image_utils import (
+    get_formats_miniatures,
+    get_tailles_miniatures,
+    nom_miniature,
+)
+
+# Chemins adressés par contenu : <sha256>.<ext> ou miniature <sha256>_<taille>.<ext>
+CHEMIN_HASHE = re.compile(r'(^|/)[0-9a-f]{64}(_\d+)?\.\w+$')
+UN_AN = 365 * 24 * 3600
+
+
+def is_immutable(storage, name):
+    """
+    Un chemin hashé ne change plus une fois écrit : les miniatures sont écrites
+    une seule fois, l'originale une fois son traitement terminé.
+    """
+    match = CHEMIN_HASHE.search(name)
+    if not match:
+        return False
+    if match.group(2):
+        return True
+    tailles, formats = get_tailles_miniatures(), get_formats_miniatures()
+    return bool(tailles and formats) and storage.exists(nom_miniature(name, tailles[-1], formats[-1]))
+
+
+def compute_etag(stat):
+    """ETag fort à la manière de nginx : date de modification + taille"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _etag_correspond(request, etag):
+    entete = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return any(valeur.strip() in (etag, '*') for valeur in entete.split(','))
+
+
+def media_response(request, storage, name, immutable=False):
+    """
+    Réponse pour un fichier média déjà autorisé :
+    - X-Accel-Redirect (nginx) ou X-Sendfile (Apache/lighttpd) selon MEDIA_DELIVERY_BACKEND
+    - FileResponse en repli quand aucun proxy n'est configuré
+    Avec ETag fort, Last-Modified et Cache-Control (immutable pour les chemins hashés).
+
+    Lève FileNotFoundError si le fichier n'existe pas.
+    """
+    chemin = storage.path(name)
+    stat = os.stat(chemin)
+    etag = compute_etag(stat)
+
+    if immutable:
+        cache_control = f"private, max-age={UN_AN}, immutable"
+    else:
+        cache_control = "private, no-cache"
+
+    if _etag_correspond(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        backend = getattr(settings, 'MEDIA_DELIVERY_BACKEND', '')
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if backend == 'nginx':
+            prefixe = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = prefixe.rstrip('/') + '/' + quote(name.replace('\\', '/'))
+        elif backend == 'sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = chemin
+        else:
+            response = FileResponse(open(chemin, 'rb'), content_type=content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    return response
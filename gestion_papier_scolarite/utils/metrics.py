@@ -0,0 +1,194 @@
+# gestion_papier_scolarite/utils/metrics.py
+
+import atexit
+import glob
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+# ====================== DÉFINITIONS ======================
+BUCKETS_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_TAILLE = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+BUCKETS_REQUETES = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# nom → (type, aide, buckets)
+METRIQUES = {
+    'http_requests_total': ('counter', "Requêtes HTTP traitées", None),
+    'http_request_duration_seconds': ('histogram', "Durée de traitement des requêtes HTTP", BUCKETS_DUREE),
+    'http_response_size_bytes': ('histogram', "Taille du corps des réponses HTTP", BUCKETS_TAILLE),
+    'db_queries_per_request': ('histogram', "Requêtes SQL exécutées par requête HTTP", BUCKETS_REQUETES),
+    'emails_sent_total': ('counter', "Emails envoyés", None),
+    'emails_failed_total': ('counter', "Envois d'email en échec", None),
+    'demandes_creees_total': ('counter', "Demandes créées, par type", None),
+    'demandes_transitions_total': ('counter', "Changements de statut des demandes", None),
+}
+
+
+def _cle(nom, labels):
+    return nom, tuple(sorted(labels.items()))
+
+
+class Registre:
+    """
+    Compteurs et histogrammes du processus (thread-safe, en mémoire).
+
+    En multi-processus (METRICS_MULTIPROC_DIR), chaque processus écrit son état
+    dans <dossier>/<pid>.json au plus toutes les METRICS_FLUSH_SECONDS secondes ;
+    /metrics additionne les fichiers de tous les processus.
+    """
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.compteurs = {}
+        self.histogrammes = {}  # clé → [compte par bucket (+Inf inclus), somme]
+        self.dernier_flush = 0.0
+
+    def incrementer(self, nom, valeur=1, **labels):
+        cle = _cle(nom, labels)
+        with self.verrou:
+            self.compteurs[cle] = self.compteurs.get(cle, 0) + valeur
+        self._flush_periodique()
+
+    def observer(self, nom, valeur, **labels):
+        buckets = METRIQUES[nom][2]
+        cle = _cle(nom, labels)
+        with self.verrou:
+            histogramme = self.histogrammes.get(cle)
+            if histogramme is None:
+                histogramme = self.histogrammes[cle] = [[0] * (len(buckets) + 1), 0.0]
+            histogramme[0][bisect_left(buckets, valeur)] += 1
+            histogramme[1] += valeur
+        self._flush_periodique()
+
+    # ---------- multi-processus ----------
+    def etat(self):
+        with self.verrou:
+            return {
+                'compteurs': [[nom, list(labels), valeur] for (nom, labels), valeur in self.compteurs.items()],
+                'histogrammes': [
+                    [nom, list(labels), list(comptes), somme]
+                    for (nom, labels), (comptes, somme) in self.histogrammes.items()
+                ],
+            }
+
+    def flush(self):
+        dossier = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+        if not dossier:
+            return
+        os.makedirs(dossier, exist_ok=True)
+        chemin = os.path.join(dossier, f"{os.getpid()}.json")
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as fichier:
+            json.dump(self.etat(), fichier)
+        os.replace(temporaire, chemin)
+        self.dernier_flush = time.monotonic()
+
+    def _flush_periodique(self):
+        if (
+            getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+            and time.monotonic() - self.dernier_flush >= getattr(settings, 'METRICS_FLUSH_SECONDS', 5)
+        ):
+            self.flush()
+
+    def etat_agrege(self):
+        """État de ce processus, additionné à celui des autres en mode multi-processus"""
+        dossier = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+        if not dossier:
+            return self.etat()
+        self.flush()
+        compteurs, histogrammes = {}, {}
+        for chemin in glob.glob(os.path.join(dossier, '*.json')):
+            try:
+                with open(chemin, encoding='utf-8') as fichier:
+                    etat = json.load(fichier)
+            except (OSError, ValueError):
+                continue
+            for nom, labels, valeur in etat['compteurs']:
+                cle = (nom, tuple(map(tuple, labels)))
+                compteurs[cle] = compteurs.get(cle, 0) + valeur
+            for nom, labels, comptes, somme in etat['histogrammes']:
+                cle = (nom, tuple(map(tuple, labels)))
+                total = histogrammes.setdefault(cle, [[0] * len(comptes), 0.0])
+                total[0] = [a + b for a, b in zip(total[0], comptes)]
+                total[1] += somme
+        return {
+            'compteurs': [[nom, list(labels), valeur] for (nom, labels), valeur in compteurs.items()],
+            'histogrammes': [[nom, list(labels), comptes, somme] for (nom, labels), (comptes, somme) in histogrammes.items()],
+        }
+
+
+registre = Registre()
+atexit.register(registre.flush)
+
+
+# ====================== FORMAT TEXTE PROMETHEUS ======================
+def _echapper(valeur):
+    return str(valeur).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(labels, **supplementaires):
+    paires = list(labels) + list(supplementaires.items())
+    if not paires:
+        return ''
+    return '{' + ','.join(f'{cle}="{_echapper(valeur)}"' for cle, valeur in paires) + '}'
+
+
+def _nombre(valeur):
+    if isinstance(valeur, float) and math.isinf(valeur):
+        return '+Inf'
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+
+def exposition(etat):
+    """Texte au format d'exposition Prometheus 0.0.4"""
+    series = {nom: [] for nom in METRIQUES}
+    for nom, labels, valeur in sorted(etat['compteurs'], key=lambda e: (e[0], e[1])):
+        series.setdefault(nom, []).append(f"{nom}{_labels(labels)} {_nombre(valeur)}")
+    for nom, labels, comptes, somme in sorted(etat['histogrammes'], key=lambda e: (e[0], e[1])):
+        buckets = METRIQUES[nom][2]
+        cumul = 0
+        for borne, compte in zip(list(buckets) + [math.inf], comptes):
+            cumul += compte
+            series[nom].append(f"{nom}_bucket{_labels(labels, le=_nombre(float(borne)))} {cumul}")
+        series[nom].append(f"{nom}_sum{_labels(labels)} {_nombre(float(somme))}")
+        series[nom].append(f"{nom}_count{_labels(labels)} {cumul}")
+
+    lignes = []
+    for nom, (type_metrique, aide, _) in METRIQUES.items():
+        lignes.append(f"# HELP {nom} {aide}")
+        lignes.append(f"# TYPE {nom} {type_metrique}")
+        lignes.extend(series[nom])
+    return '\n'.join(lignes) + '\n'
+
+
+# ====================== SIGNAUX DES DEMANDES ======================
+TYPES_DEMANDE = {
+    'releveNote.ReleveNote': 'releve',
+    'CertificatScolarite.CertificatScolarite': 'certificat',
+    'Attestation.Attestation': 'attestation',
+}
+
+
+def compter_demande(sender, instance, created, **kwargs):
+    """post_save : créations et changements de statut (valeurs suivies par ChangeTrackingMixin)"""
+    type_demande = TYPES_DEMANDE[sender._meta.label]
+    if created:
+        registre.incrementer('demandes_creees_total', type=type_demande)
+    elif instance.has_changed('statut'):
+        registre.incrementer(
+            'demandes_transitions_total',
+            type=type_demande, ancien=instance.get_original('statut'), nouveau=instance.statut,
+        )
+
+
+def connecter_signaux():
+    from django.apps import apps
+    from django.db.models.signals import post_save
+
+    for label in TYPES_DEMANDE:
+        post_save.connect(compter_demande, sender=apps.get_model(label), dispatch_uid=f'metriques_{label}')
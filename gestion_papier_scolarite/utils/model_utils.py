@@ -0,0 +1,95 @@
+# gestion_papier_scolarite/utils/model_utils.py
+
+import copy
+
+from django.db.models import FileField
+
+
+class ChangeTrackingMixin:
+    """
+    Mémorise les valeurs des champs au chargement depuis la base.
+
+    - has_changed('champ') / get_original('champ') / get_dirty_fields()
+      permettent aux signaux de savoir ce qui a changé sans requête
+    - save_dirty_fields_only = True (sur le modèle ou l'instance) : save() sans
+      update_fields n'écrit que les colonnes modifiées. Désactivé par défaut, car
+      un UPDATE partiel change le comportement de save() :
+        * une instance dont la ligne a été supprimée lève DatabaseError
+          ("did not affect any rows") au lieu d'être réinsérée ;
+        * un champ modifié par une surcharge de save() *après* l'appel à
+          super().save() du mixin n'est pas écrit (les modifications faites
+          avant, comme dans User.save(), le sont).
+    """
+    save_dirty_fields_only = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def _valeur_suivie(self, field):
+        value = getattr(self, field.attname)
+        if isinstance(field, FileField):
+            return value.name or None
+        return copy.deepcopy(value)
+
+    def _snapshot(self, fields=None):
+        deferred = self.get_deferred_fields()
+        if not hasattr(self, '_original_values'):
+            self._original_values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            self._original_values[field.attname] = self._valeur_suivie(field)
+
+    def get_original(self, name):
+        """Valeur du champ telle que chargée depuis la base"""
+        field = self._meta.get_field(name)
+        return getattr(self, '_original_values', {}).get(field.attname)
+
+    def has_changed(self, name):
+        """True si le champ a été modifié depuis le chargement (ou si l'instance est nouvelle)"""
+        originals = getattr(self, '_original_values', None)
+        field = self._meta.get_field(name)
+        if originals is None or field.attname not in originals:
+            return self._state.adding or field.attname in self.__dict__
+        return self._valeur_suivie(field) != originals[field.attname]
+
+    def get_dirty_fields(self):
+        """Noms des champs modifiés depuis le chargement"""
+        originals = getattr(self, '_original_values', None)
+        if originals is None:
+            return [field.name for field in self._meta.concrete_fields]
+        deferred = self.get_deferred_fields()
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname in deferred:
+                continue
+            if field.attname not in originals:
+                dirty.append(field.name)
+            elif getattr(field, 'auto_now', False):
+                dirty.append(field.name)
+            elif self._valeur_suivie(field) != originals[field.attname]:
+                dirty.append(field.name)
+        return dirty
+
+    def save(self, *args, **kwargs):
+        if (
+            self.save_dirty_fields_only
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not self._state.adding
+            and hasattr(self, '_original_values')
+        ):
+            kwargs['update_fields'] = self.get_dirty_fields()
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._snapshot(set(update_fields) if update_fields is not None else None)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot(fields)
@@ -0,0 +1,175 @@
+# gestion_papier_scolarite/utils/profiling.py
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+
+MODES = ('cpu', 'memoire')
+SEL = 'gestion_papier_scolarite.profilage'
+
+NB_FONCTIONS = 40
+NB_ALLOCATIONS = 30
+PROFONDEUR_TRACEMALLOC = 10
+
+_ID_VALIDE = re.compile(r'^\d{8}T\d{12}Z-[0-9a-f]{8}$')
+
+# Un seul profilage à la fois par processus : tracemalloc est global,
+# et un profil ne doit pas mesurer le profilage concurrent d'une autre requête
+_verrou = threading.Lock()
+
+
+# ====================== JETONS SIGNÉS ======================
+def creer_jeton(mode, user):
+    """Jeton à passer dans l'en-tête X-Profilage, valable pour les requêtes de `user` uniquement"""
+    return signing.dumps({'mode': mode, 'user': user.pk}, salt=SEL)
+
+
+def lire_jeton(jeton):
+    """{'mode', 'user'} si le jeton est valide et non expiré, sinon None"""
+    try:
+        donnees = signing.loads(jeton, salt=SEL, max_age=getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600))
+    except signing.BadSignature:
+        return None
+    if not isinstance(donnees, dict) or donnees.get('mode') not in MODES:
+        return None
+    return donnees
+
+
+# ====================== PROFILAGE ======================
+def _dossier():
+    return str(getattr(settings, 'PROFILING_DIR'))
+
+
+def _rapport_cpu(profil):
+    flux = io.StringIO()
+    stats = pstats.Stats(profil, stream=flux).strip_dirs()
+    flux.write(f"=== {NB_FONCTIONS} fonctions les plus coûteuses (temps cumulé) ===\n")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(NB_FONCTIONS)
+    flux.write(f"\n=== {NB_FONCTIONS} fonctions les plus coûteuses (temps propre) ===\n")
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(NB_FONCTIONS)
+    return flux.getvalue()
+
+
+def _rapport_memoire(avant, apres):
+    filtres = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ]
+    avant, apres = avant.filter_traces(filtres), apres.filter_traces(filtres)
+    lignes = [f"=== {NB_ALLOCATIONS} sites d'allocation (mémoire encore allouée en fin de requête) ==="]
+    lignes += [str(stat) for stat in apres.compare_to(avant, 'lineno')[:NB_ALLOCATIONS]]
+    lignes.append(f"\n=== {NB_ALLOCATIONS} piles d'appel les plus allocatrices ===")
+    for stat in apres.compare_to(avant, 'traceback')[:NB_ALLOCATIONS]:
+        lignes.append(str(stat))
+        lignes += [f"    {ligne}" for ligne in stat.traceback.format()]
+    return '\n'.join(lignes)
+
+
+def profiler(mode, appeler):
+    """
+    Exécute appeler() sous cProfile ('cpu') ou tracemalloc ('memoire').
+    Retourne (résultat, rapport texte, profil cProfile ou None, durée en s) ;
+    rapport None si un autre profilage est déjà en cours dans ce processus.
+    """
+    if not _verrou.acquire(blocking=False):
+        return appeler(), None, None, None
+    try:
+        debut = time.perf_counter()
+        if mode == 'cpu':
+            profil = cProfile.Profile()
+            resultat = profil.runcall(appeler)
+            duree = time.perf_counter() - debut
+            return resultat, _rapport_cpu(profil), profil, duree
+
+        deja_actif = tracemalloc.is_tracing()
+        if not deja_actif:
+            tracemalloc.start(PROFONDEUR_TRACEMALLOC)
+        try:
+            avant = tracemalloc.take_snapshot()
+            resultat = appeler()
+            duree = time.perf_counter() - debut
+            apres = tracemalloc.take_snapshot()
+            pic = tracemalloc.get_traced_memory()[1]
+        finally:
+            if not deja_actif:
+                tracemalloc.stop()
+        return resultat, f"Pic mémoire tracée : {pic / 1024:.1f} Kio\n\n{_rapport_memoire(avant, apres)}", None, duree
+    finally:
+        _verrou.release()
+
+
+# ====================== STOCKAGE ======================
+def enregistrer(meta, rapport, profil=None):
+    """Écrit <id>.json (métadonnées), <id>.txt (rapport) et <id>.prof (pstats) ; retourne l'id"""
+    dossier = _dossier()
+    os.makedirs(dossier, exist_ok=True)
+    # Horodatage en tête (microsecondes) : l'ordre alphabétique est l'ordre chronologique
+    identifiant = f"{datetime.now(dt_timezone.utc):%Y%m%dT%H%M%S%fZ}-{uuid.uuid4().hex[:8]}"
+    base = os.path.join(dossier, identifiant)
+    with open(f"{base}.txt", 'w', encoding='utf-8') as fichier:
+        fichier.write(rapport)
+    if profil is not None:
+        profil.dump_stats(f"{base}.prof")
+    meta = dict(meta, id=identifiant, date=datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+                pstats=profil is not None)
+    with open(f"{base}.json", 'w', encoding='utf-8') as fichier:
+        json.dump(meta, fichier, ensure_ascii=False)
+    _purger(dossier)
+    return identifiant
+
+
+def _purger(dossier):
+    """Ne conserve que les PROFILING_MAX_PROFILES profils les plus récents"""
+    identifiants = sorted(nom[:-5] for nom in os.listdir(dossier) if nom.endswith('.json'))
+    for identifiant in identifiants[:-getattr(settings, 'PROFILING_MAX_PROFILES', 50) or None]:
+        supprimer(identifiant)
+
+
+def lister():
+    """Métadonnées des profils, du plus récent au plus ancien"""
+    dossier = _dossier()
+    if not os.path.isdir(dossier):
+        return []
+    profils = []
+    for nom in sorted(os.listdir(dossier), reverse=True):
+        if not nom.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(dossier, nom), encoding='utf-8') as fichier:
+                profils.append(json.load(fichier))
+        except (OSError, ValueError):
+            continue
+    return profils
+
+
+def chemin(identifiant, extension):
+    """Chemin d'un fichier de profil, None si l'identifiant est invalide ou le fichier absent"""
+    if not _ID_VALIDE.match(identifiant or ''):
+        return None
+    fichier = os.path.join(_dossier(), f"{identifiant}.{extension}")
+    return fichier if os.path.exists(fichier) else None
+
+
+def supprimer(identifiant):
+    if not _ID_VALIDE.match(identifiant or ''):
+        return False
+    trouve = False
+    for extension in ('json', 'txt', 'prof'):
+        try:
+            os.remove(os.path.join(_dossier(), f"{identifiant}.{extension}"))
+            trouve = True
+        except FileNotFoundError:
+            pass
+    return trouve
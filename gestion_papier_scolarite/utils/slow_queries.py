@@ -0,0 +1,158 @@
+# gestion_papier_scolarite/utils/slow_queries.py
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+logger = logging.getLogger('gestion_papier_scolarite.slow_queries')
+
+# Vue en cours d'exécution (renseignée par SlowQueryMiddleware.process_view)
+_vue_courante = ContextVar('vue_courante', default=None)
+# Vrai pendant l'EXPLAIN : ses propres requêtes ne sont pas mesurées
+_explain_en_cours = ContextVar('explain_en_cours', default=False)
+
+LONGUEUR_MAX_PARAMS = 500
+
+_IN_LISTE = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_LITTERAUX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACES = re.compile(r'\s+')
+
+
+def empreinte(sql):
+    """
+    Identifiant d'une requête indépendant de ses valeurs :
+    littéraux et listes IN (%s, %s, ...) de longueur variable sont neutralisés.
+    """
+    normalise = _IN_LISTE.sub('(%s...)', sql)
+    normalise = _LITTERAUX.sub('?', normalise)
+    normalise = _ESPACES.sub(' ', normalise).strip()
+    return hashlib.sha1(normalise.encode()).hexdigest()[:16]
+
+
+# ====================== AGRÉGATION PAR EMPREINTE ======================
+class RegistreRequetesLentes:
+    """
+    Requêtes lentes agrégées par empreinte, dans un tampon borné :
+    au-delà de `taille` empreintes, la moins récemment vue est oubliée.
+    Le plan EXPLAIN n'est capturé qu'à la première occurrence d'une empreinte.
+    """
+
+    def __init__(self, taille):
+        self.taille = taille
+        self.entrees = OrderedDict()
+        self.verrou = threading.Lock()
+
+    def enregistrer(self, cle, sql, params, duree, vue):
+        """Retourne True si l'empreinte est nouvelle (plan à capturer)"""
+        with self.verrou:
+            entree = self.entrees.get(cle)
+            nouvelle = entree is None
+            if nouvelle:
+                entree = self.entrees[cle] = {
+                    'empreinte': cle,
+                    'sql': sql,
+                    'nombre': 0,
+                    'duree_totale_ms': 0.0,
+                    'duree_max_ms': 0.0,
+                    'vues': {},
+                    'plan': None,
+                }
+                if len(self.entrees) > self.taille:
+                    self.entrees.popitem(last=False)
+            else:
+                self.entrees.move_to_end(cle)
+
+            duree_ms = duree * 1000
+            entree['nombre'] += 1
+            entree['duree_totale_ms'] += duree_ms
+            entree['duree_max_ms'] = max(entree['duree_max_ms'], duree_ms)
+            entree['derniers_params'] = params
+            entree['derniere_occurrence'] = time.time()
+            if vue:
+                entree['vues'][vue] = entree['vues'].get(vue, 0) + 1
+            return nouvelle
+
+    def enregistrer_plan(self, cle, plan):
+        with self.verrou:
+            if cle in self.entrees:
+                self.entrees[cle]['plan'] = plan
+
+    def resume(self):
+        """Empreintes de la plus coûteuse (durée cumulée) à la moins coûteuse"""
+        with self.verrou:
+            entrees = [dict(entree, vues=dict(entree['vues'])) for entree in self.entrees.values()]
+        for entree in entrees:
+            entree['duree_moyenne_ms'] = round(entree['duree_totale_ms'] / entree['nombre'], 2)
+            entree['duree_totale_ms'] = round(entree['duree_totale_ms'], 2)
+            entree['duree_max_ms'] = round(entree['duree_max_ms'], 2)
+        return sorted(entrees, key=lambda entree: entree['duree_totale_ms'], reverse=True)
+
+    def vider(self):
+        with self.verrou:
+            self.entrees.clear()
+
+
+registre = RegistreRequetesLentes(getattr(settings, 'SLOW_QUERY_BUFFER_SIZE', 200))
+
+
+# ====================== HOOK connection.execute_wrapper ======================
+def _expliquer(connexion, sql, params):
+    """Plan d'exécution de la requête (SELECT uniquement), None si indisponible"""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    jeton = _explain_en_cours.set(True)
+    try:
+        # Savepoint : un EXPLAIN en échec n'interrompt pas la transaction de la vue
+        with transaction.atomic(using=connexion.alias):
+            with connexion.cursor() as cursor:
+                cursor.execute(f"{connexion.ops.explain_query_prefix()} {sql}", params)
+                return '\n'.join(' '.join(str(colonne) for colonne in ligne) for ligne in cursor.fetchall())
+    except DatabaseError as exc:
+        return f"EXPLAIN impossible : {exc}"
+    finally:
+        _explain_en_cours.reset(jeton)
+
+
+class DetecteurRequetesLentes:
+    """Wrapper connection.execute_wrapper() : journalise et agrège les requêtes au-delà du seuil"""
+
+    def __init__(self, connexion, seuil_ms):
+        self.connexion = connexion
+        self.seuil = seuil_ms / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        if _explain_en_cours.get():
+            return execute(sql, params, many, context)
+
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duree = time.perf_counter() - debut
+            if duree >= self.seuil:
+                self.signaler(sql, params, many, duree)
+
+    def signaler(self, sql, params, many, duree):
+        vue = _vue_courante.get()
+        params_texte = repr(params)[:LONGUEUR_MAX_PARAMS]
+        cle = empreinte(sql)
+        nouvelle = registre.enregistrer(cle, sql, params_texte, duree, vue)
+
+        plan = None
+        if nouvelle and not many:
+            plan = _expliquer(self.connexion, sql, params)
+            registre.enregistrer_plan(cle, plan)
+
+        logger.warning(
+            "Requête lente %.1f ms [%s] vue=%s base=%s : %s | params=%s%s",
+            duree * 1000, cle, vue, self.connexion.alias, sql, params_texte,
+            f"\nPlan :\n{plan}" if plan else '',
+            extra={'empreinte': cle, 'duree_ms': round(duree * 1000, 1), 'vue': vue},
+        )
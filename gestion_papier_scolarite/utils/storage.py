@@ -0,0 +1,32 @@
+# gestion_papier_scolarite/utils/storage.py
+
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# profile_photos/ab/ab12...ef.jpg (SHA-256 du fichier uploadé)
+CHEMIN_ADRESSE_CONTENU = re.compile(r'^[\w-]+/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+
+
+def content_addressed_name(prefixe, digest, ext):
+    return os.path.join(prefixe, digest[:2], f"{digest}.{ext.lower()}")
+
+
+def is_content_addressed(name):
+    return bool(name and CHEMIN_ADRESSE_CONTENU.match(name.replace('\\', '/')))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage sous MEDIA_ROOT où les fichiers nommés par leur empreinte
+    ne sont écrits qu'une seule fois : un fichier identique déjà présent
+    est réutilisé au lieu d'être stocké à nouveau.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is not None and is_content_addressed(name) and self.exists(name):
+            return name.replace('\\', '/')
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,100 @@
+# gestion_papier_scolarite/utils/testing.py
+
+import logging
+import shutil
+import tempfile
+from contextlib import ExitStack
+
+from django.core.cache import caches
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from gestion_papier_scolarite.utils.factories import creer_etudiants, creer_scolarites
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    NOTIFICATIONS_ASYNC=False,
+)
+class RequetesBorneesTestCase(APITestCase):
+    """
+    Base des tests de nombre de requêtes SQL par endpoint.
+
+    assertRequetesBornees() appelle l'endpoint avec 1, 10 puis 1000 lignes en base
+    et échoue si une exécution dépasse `maximum` requêtes ou si le nombre
+    de requêtes change avec le volume (N+1).
+    """
+    TAILLES = (1, 10, 1000)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._media_root = tempfile.mkdtemp()
+        cls._media = override_settings(MEDIA_ROOT=cls._media_root)
+        cls._media.enable()
+        # Logs INFO (créations, emails...) : bruit dans la sortie des tests
+        logging.disable(logging.INFO)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+        cls._media.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.etudiant = creer_etudiants(1)[0]
+        self.scolarite = creer_scolarites(1)[0]
+        # Autres étudiants propriétaires des demandes générées
+        self.etudiants = creer_etudiants(10)
+
+    def connecter_etudiant(self):
+        self.client.force_authenticate(self.etudiant.user)
+
+    def connecter_scolarite(self):
+        self.client.force_authenticate(self.scolarite.user)
+
+    def connecter_admin(self):
+        """Session de l'admin Django (superutilisateur : toutes les permissions de modèle)"""
+        user = self.scolarite.user
+        user.is_superuser = True
+        user.save(update_fields=['is_superuser'])
+        self.client.force_login(user)
+
+    def assertRequetesBornees(self, maximum, appeler, peupler, preparer=None, statuts=(200,)):
+        """
+        peupler(n)        : ajoute n lignes (appelé pour porter le volume à 1, 10 puis 1000)
+        preparer()        : arguments de appeler(), construits hors mesure (objet ciblé, payload)
+        appeler(**kwargs) : requête HTTP mesurée
+        """
+        comptes = {}
+        deja = 0
+        for taille in self.TAILLES:
+            peupler(taille - deja)
+            deja = taille
+            arguments = preparer() if preparer else {}
+            # Les compteurs de limitation (throttling) ne doivent pas interférer
+            for cache in caches.all():
+                cache.clear()
+
+            with ExitStack() as pile:
+                captures = [pile.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+                response = appeler(**arguments)
+            comptes[taille] = sum(len(capture) for capture in captures)
+
+            self.assertIn(
+                response.status_code, statuts,
+                f"Statut {response.status_code} inattendu avec {taille} lignes : {getattr(response, 'data', '')}"
+            )
+
+        self.assertLessEqual(
+            max(comptes.values()), maximum,
+            f"Plus de {maximum} requêtes SQL : {comptes}"
+        )
+        self.assertEqual(
+            len(set(comptes.values())), 1,
+            f"Le nombre de requêtes SQL varie avec le volume : {comptes}"
+        )
@@ -2,10 +2,71 @@
 
 import secrets
 from datetime import timedelta
+from django.conf import settings
+from django.db.models import F
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
 
 def generate_reset_token():
     return secrets.token_hex(3)  # exemple : 6 caractères hexadécimaux
 
 def get_token_expiration(minutes=10):
-    return timezone.now() + timedelta(minutes=minutes)
\ No newline at end of file
+    return timezone.now() + timedelta(minutes=minutes)
+
+
+# ====================== CODES DE RÉINITIALISATION (TABLE DÉDIÉE) ======================
+def hash_reset_code(email, code):
+    """HMAC du code lié à l'email : un dump de la table ne permet pas de retrouver les codes"""
+    valeur = f"{email.strip().lower()}:{code.strip().lower()}"
+    return salted_hmac('password-reset-code', valeur, algorithm='sha256').hexdigest()
+
+
+def create_reset_code(email):
+    """
+    Crée un nouveau code pour cet email (les précédents sont supprimés)
+    et retourne le code en clair, à envoyer par email.
+    """
+    from api.models import PasswordResetCode
+
+    code = generate_reset_token()
+    PasswordResetCode.objects.filter(email=email).delete()
+    PasswordResetCode.objects.create(
+        email=email,
+        code_hash=hash_reset_code(email, code),
+        expires_at=get_token_expiration(),
+    )
+    return code
+
+
+def check_reset_code(email, code):
+    """
+    Vérifie le code sans toucher à la table User.
+    Retourne (entree, None) si le code est valide, sinon (None, message d'erreur).
+    Chaque code faux incrémente le compteur ; au-delà de
+    PASSWORD_RESET_MAX_ATTEMPTS le code est inutilisable.
+    """
+    from api.models import PasswordResetCode
+
+    entree = PasswordResetCode.objects.filter(email=email).order_by('-expires_at').first()
+    if entree is None:
+        return None, 'Aucun code de réinitialisation trouvé'
+
+    if entree.expires_at < timezone.now():
+        return None, 'Le code a expiré. Veuillez demander un nouveau code'
+
+    if entree.tentatives >= getattr(settings, 'PASSWORD_RESET_MAX_ATTEMPTS', 5):
+        return None, 'Trop de tentatives. Veuillez demander un nouveau code'
+
+    if not constant_time_compare(entree.code_hash, hash_reset_code(email, code)):
+        PasswordResetCode.objects.filter(pk=entree.pk).update(tentatives=F('tentatives') + 1)
+        return None, 'Code incorrect'
+
+    return entree, None
+
+
+def consume_reset_code(entree):
+    """Supprime le code utilisé ; False s'il a déjà été consommé par une requête concurrente"""
+    from api.models import PasswordResetCode
+
+    supprimes, _ = PasswordResetCode.objects.filter(pk=entree.pk).delete()
+    return supprimes > 0
@@ -0,0 +1,128 @@
+# gestion_papier_scolarite/utils/upload_handlers.py
+
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+from PIL import Image
+
+# Taille maximale de l'en-tête lu pour identifier l'image (type + dimensions)
+TAILLE_MAX_ENTETE = 256 * 1024
+
+
+class PhotoUploadRejected(MultiPartParserError):
+    """Upload de photo refusé pendant la réception (DRF le transforme en 400)"""
+
+
+def content_hash(fichier):
+    """
+    Empreinte SHA-256 d'un fichier uploadé.
+    Réutilise celle calculée pendant la réception si disponible.
+    """
+    digest = getattr(fichier, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    if hasattr(fichier, 'seek'):
+        fichier.seek(0)
+    for chunk in fichier.chunks() if hasattr(fichier, 'chunks') else iter(lambda: fichier.read(65536), b''):
+        sha256.update(chunk)
+    if hasattr(fichier, 'seek'):
+        fichier.seek(0)
+    return sha256.hexdigest()
+
+
+class PhotoUploadHandler(TemporaryFileUploadHandler):
+    """
+    Handler d'upload pour les photos de profil (champs PHOTO_UPLOAD_FIELDS) :
+    - écrit directement sur disque, sans mise en mémoire
+    - interrompt la réception dès que PHOTO_UPLOAD_MAX_SIZE est dépassé
+    - identifie le type et les dimensions depuis l'en-tête, sans décoder l'image
+    - calcule le SHA-256 au fil de l'eau (stockage adressé par contenu)
+
+    Les autres champs sont transmis tels quels aux handlers suivants.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        self.actif = field_name in getattr(settings, 'PHOTO_UPLOAD_FIELDS', ['photo_profil'])
+        if not self.actif:
+            # Ne pas créer de fichier temporaire : les handlers suivants s'en chargent
+            super(TemporaryFileUploadHandler, self).new_file(field_name, *args, **kwargs)
+            return
+
+        super().new_file(field_name, *args, **kwargs)
+        self.taille_max = getattr(settings, 'PHOTO_UPLOAD_MAX_SIZE', 5 * 1024 * 1024)
+        if self.content_length and self.content_length > self.taille_max:
+            self._refuser_taille()
+
+        self.sha256 = hashlib.sha256()
+        self.entete = b''
+        self.image_format = None
+        self.image_size = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.actif:
+            return raw_data
+
+        if start + len(raw_data) > self.taille_max:
+            self._refuser_taille()
+
+        if self.image_format is None:
+            self._identifier(raw_data)
+
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.actif:
+            return None
+
+        if self.image_format is None:
+            self._refuser("Fichier image invalide ou corrompu")
+
+        fichier = super().file_complete(file_size)
+        fichier.sha256 = self.sha256.hexdigest()
+        fichier.image_format = self.image_format
+        fichier.image_size = self.image_size
+        return fichier
+
+    def upload_interrupted(self):
+        if getattr(self, 'actif', False):
+            super().upload_interrupted()
+
+    def _identifier(self, raw_data):
+        if len(self.entete) >= TAILLE_MAX_ENTETE:
+            return
+        self.entete += raw_data[:TAILLE_MAX_ENTETE - len(self.entete)]
+        try:
+            image = Image.open(BytesIO(self.entete))
+        except Image.DecompressionBombError:
+            self._refuser("Dimensions de l'image trop grandes")
+        except Exception:
+            # En-tête incomplet : on réessaie au prochain morceau
+            if len(self.entete) >= TAILLE_MAX_ENTETE:
+                self._refuser("Fichier image invalide ou corrompu")
+            return
+
+        formats = getattr(settings, 'PHOTO_UPLOAD_FORMATS', ['JPEG', 'PNG', 'GIF'])
+        if image.format not in formats:
+            self._refuser("Format d'image non supporté. Utilisez JPG, PNG ou GIF")
+
+        largeur, hauteur = image.size
+        if largeur * hauteur > getattr(settings, 'PHOTO_UPLOAD_MAX_PIXELS', 40_000_000):
+            self._refuser("Dimensions de l'image trop grandes")
+
+        self.image_format = image.format
+        self.image_size = image.size
+        self.entete = b''
+
+    def _refuser_taille(self):
+        mb = self.taille_max // (1024 * 1024)
+        self._refuser(f"La taille de l'image ne doit pas dépasser {mb} MB")
+
+    def _refuser(self, message):
+        self.upload_interrupted()
+        raise PhotoUploadRejected(message)
@@ -1,6 +1,38 @@
 from django.contrib import admin
 
-# Register your models here.
-from .models import ReleveNote
+from gestion_papier_scolarite.utils.admin_utils import DemandeAdmin
+from .models import ReleveNote, ReleveNoteAnnee, ReleveNoteLigne
 
 
+class ReleveNoteLigneInline(admin.TabularInline):
+    """Lignes recalculées par ReleveNote.save() : consultation seule"""
+    model = ReleveNoteLigne
+    fields = ('niveau', 'quantite')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class ReleveNoteAnneeInline(ReleveNoteLigneInline):
+    model = ReleveNoteAnnee
+    fields = ('annee',)
+    readonly_fields = fields
+
+
+@admin.register(ReleveNote)
+class ReleveNoteAdmin(DemandeAdmin):
+    type_demande = 'releve'
+    champ_numero = 'id_releve'
+    list_display = ('id_releve', 'etudiant', 'detail_niveaux', 'annees_display', 'statut', 'date_demande', 'date_traitement')
+    inlines = [ReleveNoteLigneInline, ReleveNoteAnneeInline]
+
+    @admin.display(description='Niveaux')
+    def detail_niveaux(self, obj):
+        return obj.detail_niveaux()
+
+    @admin.display(description='Années')
+    def annees_display(self, obj):
+        return obj.annees_display()
@@ -0,0 +1,37 @@
+# releveNote/filters.py
+
+import django_filters
+
+from gestion_papier_scolarite.utils.filters import DemandeFilterSet
+
+from .models import ReleveNote, ReleveNoteAnnee, ReleveNoteLigne
+
+
+class ReleveNoteFilterSet(DemandeFilterSet):
+    """En plus des filtres communs : ?niveau=L3&annee=2023 (relevés portant sur ce niveau et cette année)"""
+    niveau = django_filters.ChoiceFilter(choices=ReleveNote.NIVEAU_CHOICES, method='filtrer_lignes')
+    annee = django_filters.NumberFilter(method='filtrer_lignes', min_value=2000, max_value=2100)
+
+    class Meta(DemandeFilterSet.Meta):
+        model = ReleveNote
+
+    def filtrer_lignes(self, queryset, name, value):
+        niveau = self.form.cleaned_data.get('niveau')
+        annee = self.form.cleaned_data.get('annee')
+        # niveau et annee sont appliqués ensemble, une seule fois
+        if name == 'annee' and niveau:
+            return queryset
+
+        if queryset.model is not ReleveNote:
+            # Archives : pas de lignes normalisées, recherche dans le JSON
+            if niveau:
+                queryset = queryset.filter(demandes__icontains=f'"{niveau}"')
+            if annee is not None:
+                queryset = queryset.filter(annee_universitaire__icontains=str(int(annee)))
+            return queryset
+
+        if niveau:
+            queryset = queryset.filter(pk__in=ReleveNoteLigne.objects.filter(niveau=niveau).values('releve_id'))
+        if annee is not None:
+            queryset = queryset.filter(pk__in=ReleveNoteAnnee.objects.filter(annee=int(annee)).values('releve_id'))
+        return queryset
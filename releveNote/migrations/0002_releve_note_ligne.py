@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releveNote', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReleveNoteLigne',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('niveau', models.CharField(choices=[('L1', 'Licence 1'), ('L2', 'Licence 2'), ('L3', 'Licence 3'), ('M1', 'Master 1'), ('M2', 'Master 2')], max_length=5)),
+                ('annee', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('quantite', models.PositiveIntegerField(default=1)),
+                ('releve', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lignes', to='releveNote.relevenote')),
+            ],
+            options={
+                'verbose_name': 'Ligne de relevé de notes',
+                'verbose_name_plural': 'Lignes de relevés de notes',
+                'indexes': [models.Index(fields=['niveau', 'annee'], name='releveNote__niveau_51700a_idx'), models.Index(fields=['annee', 'niveau'], name='releveNote__annee_282c0b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:41
+
+from django.db import migrations
+
+
+def remplir_lignes(apps, schema_editor):
+    """Crée les lignes des relevés existants à partir des champs JSON (par lots)"""
+    ReleveNote = apps.get_model('releveNote', 'ReleveNote')
+    ReleveNoteLigne = apps.get_model('releveNote', 'ReleveNoteLigne')
+
+    lot = []
+    releves = ReleveNote.objects.only('id', 'demandes', 'annee_universitaire').order_by('pk')
+    for releve in releves.iterator(chunk_size=1000):
+        annees = []
+        for annee in releve.annee_universitaire if isinstance(releve.annee_universitaire, list) else []:
+            try:
+                annees.append(int(str(annee).strip()))
+            except (ValueError, TypeError):
+                continue
+        for demande in releve.demandes if isinstance(releve.demandes, list) else []:
+            if not isinstance(demande, dict) or 'niveau' not in demande or 'quantite' not in demande:
+                continue
+            for annee in annees or [None]:
+                lot.append(ReleveNoteLigne(
+                    releve_id=releve.pk,
+                    niveau=str(demande['niveau']).upper(),
+                    annee=annee,
+                    quantite=int(demande['quantite']),
+                ))
+        if len(lot) >= 5000:
+            ReleveNoteLigne.objects.bulk_create(lot)
+            lot = []
+    ReleveNoteLigne.objects.bulk_create(lot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releveNote', '0002_releve_note_ligne'),
+    ]
+
+    operations = [
+        migrations.RunPython(remplir_lignes, migrations.RunPython.noop),
+    ]
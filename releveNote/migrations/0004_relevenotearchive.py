@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_password_reset_code'),
+        ('releveNote', '0003_remplir_releve_note_ligne'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReleveNoteArchive',
+            fields=[
+                ('id_releve', models.CharField(blank=True, db_index=True, editable=False, max_length=10, unique=True)),
+                ('demandes', models.JSONField(blank=True, default=list, help_text='Format: [{"niveau": "L1", "quantite": 2}]')),
+                ('annee_universitaire', models.JSONField(blank=True, default=list, help_text='Format: [2022, 2023, 2024] ou ["2022", "2023"]', verbose_name='Années universitaires')),
+                ('date_traitement', models.DateTimeField(blank=True, null=True)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('pret', 'Prêt à retirer')], db_index=True, default='en_attente', max_length=15)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_demande', models.DateTimeField()),
+                ('archive_le', models.DateTimeField(auto_now_add=True)),
+                ('etudiant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='releves_archives', to='api.etudiant')),
+            ],
+            options={
+                'verbose_name': 'Relevé de notes archivé',
+                'verbose_name_plural': 'Relevés de notes archivés',
+                'ordering': ['-date_demande'],
+                'indexes': [models.Index(fields=['statut', '-date_demande'], name='releve_arch_statut_date_idx'), models.Index(fields=['-date_demande'], name='releve_arch_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releveNote', '0004_relevenotearchive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='relevenote',
+            name='statut',
+            field=models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('pret', 'Prêt à retirer'), ('rejete', 'Rejeté')], db_index=True, default='en_attente', max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='relevenotearchive',
+            name='statut',
+            field=models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('pret', 'Prêt à retirer'), ('rejete', 'Rejeté')], db_index=True, default='en_attente', max_length=15),
+        ),
+    ]
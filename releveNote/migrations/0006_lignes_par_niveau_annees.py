@@ -0,0 +1,87 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def reconstruire_lignes(apps, schema_editor):
+    """
+    Les lignes (niveau × année) répétaient la quantité pour chaque année : une ligne
+    par niveau et une ligne par année à la place, recalculées depuis le JSON (par lots)
+    """
+    ReleveNote = apps.get_model('releveNote', 'ReleveNote')
+    ReleveNoteLigne = apps.get_model('releveNote', 'ReleveNoteLigne')
+    ReleveNoteAnnee = apps.get_model('releveNote', 'ReleveNoteAnnee')
+
+    ReleveNoteLigne.objects.all().delete()
+    lignes, annees = [], []
+    releves = ReleveNote.objects.only('id', 'demandes', 'annee_universitaire').order_by('pk')
+    for releve in releves.iterator(chunk_size=1000):
+        distinctes = set()
+        for annee in releve.annee_universitaire if isinstance(releve.annee_universitaire, list) else []:
+            try:
+                distinctes.add(int(str(annee).strip()))
+            except (ValueError, TypeError):
+                continue
+        annees += [ReleveNoteAnnee(releve_id=releve.pk, annee=annee) for annee in sorted(distinctes)]
+        for demande in releve.demandes if isinstance(releve.demandes, list) else []:
+            if not isinstance(demande, dict) or 'niveau' not in demande or 'quantite' not in demande:
+                continue
+            lignes.append(ReleveNoteLigne(
+                releve_id=releve.pk,
+                niveau=str(demande['niveau']).upper(),
+                quantite=int(demande['quantite']),
+            ))
+        if len(lignes) + len(annees) >= 5000:
+            ReleveNoteLigne.objects.bulk_create(lignes)
+            ReleveNoteAnnee.objects.bulk_create(annees)
+            lignes, annees = [], []
+    ReleveNoteLigne.objects.bulk_create(lignes)
+    ReleveNoteAnnee.objects.bulk_create(annees)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releveNote', '0005_statut_rejete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReleveNoteAnnee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annee', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Année de relevé de notes',
+                'verbose_name_plural': 'Années de relevés de notes',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='relevenoteligne',
+            name='releveNote__niveau_51700a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='relevenoteligne',
+            name='releveNote__annee_282c0b_idx',
+        ),
+        migrations.RemoveField(
+            model_name='relevenoteligne',
+            name='annee',
+        ),
+        migrations.AddIndex(
+            model_name='relevenoteligne',
+            index=models.Index(fields=['niveau'], name='releve_ligne_niveau_idx'),
+        ),
+        migrations.AddField(
+            model_name='relevenoteannee',
+            name='releve',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='annees', to='releveNote.relevenote'),
+        ),
+        migrations.AddIndex(
+            model_name='relevenoteannee',
+            index=models.Index(fields=['annee'], name='releve_annee_idx'),
+        ),
+        migrations.RunPython(reconstruire_lignes, migrations.RunPython.noop),
+    ]
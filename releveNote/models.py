@@ -1,12 +1,15 @@
 # releveNote/models.py
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import json
+from gestion_papier_scolarite.utils.model_utils import ChangeTrackingMixin
 
 
-class ReleveNote(models.Model):
+class ReleveNoteBase(models.Model):
+    """Champs et méthodes communs aux demandes en cours (ReleveNote) et archivées"""
+
     NIVEAU_CHOICES = [
         ('L1', 'Licence 1'),
         ('L2', 'Licence 2'),
@@ -23,13 +26,6 @@ class ReleveNote(models.Model):
         db_index=True
     )
 
-    etudiant = models.ForeignKey(
-        'api.Etudiant', 
-        on_delete=models.CASCADE, 
-        related_name='demandes_releve',
-        db_index=True
-    )
-
     demandes = models.JSONField(
         default=list,
         blank=True,
@@ -43,13 +39,13 @@ class ReleveNote(models.Model):
         help_text='Format: [2022, 2023, 2024] ou ["2022", "2023"]'
     )
 
-    date_demande = models.DateTimeField(auto_now_add=True, db_index=True)
     date_traitement = models.DateTimeField(null=True, blank=True)
 
     STATUT_CHOICES = [
         ('en_attente', 'En attente'),
         ('en_cours', 'En cours'),
-        ('pret', 'Prêt à retirer')
+        ('pret', 'Prêt à retirer'),
+        ('rejete', 'Rejeté'),
     ]
     statut = models.CharField(
         max_length=15, 
@@ -59,13 +55,7 @@ class ReleveNote(models.Model):
     )
 
     class Meta:
-        ordering = ['-date_demande']
-        verbose_name = "Relevé de notes"
-        verbose_name_plural = "Relevés de notes"
-        indexes = [
-            models.Index(fields=['etudiant', 'statut']),
-            models.Index(fields=['date_demande']),
-        ]
+        abstract = True
 
     def clean(self):
         if not isinstance(self.demandes, list):
@@ -110,9 +100,33 @@ class ReleveNote(models.Model):
             return ", ".join(map(str, annees))
         return f"{', '.join(map(str, annees[:3]))}... (+{len(annees)-3})"
 
+    def __str__(self):
+        return f"{self.id_releve} - {self.etudiant} ({self.annees_display()})"
+
+
+class ReleveNote(ChangeTrackingMixin, ReleveNoteBase):
+    etudiant = models.ForeignKey(
+        'api.Etudiant', 
+        on_delete=models.CASCADE, 
+        related_name='demandes_releve',
+        db_index=True
+    )
+
+    date_demande = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-date_demande']
+        verbose_name = "Relevé de notes"
+        verbose_name_plural = "Relevés de notes"
+        indexes = [
+            models.Index(fields=['etudiant', 'statut']),
+            models.Index(fields=['date_demande']),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.id_releve:
-            dernier = ReleveNote.objects.order_by('-id').first()
+            # Les archives gardent leurs numéros : ne pas les réattribuer
+            dernier = ReleveNote.objects.order_by('-id').first() or ReleveNoteArchive.objects.order_by('-id').first()
             numero = (dernier.id + 1) if dernier else 1
             self.id_releve = f"R-{numero:04d}"
         
@@ -120,8 +134,27 @@ class ReleveNote(models.Model):
         self.annee_universitaire = self._normaliser_annees(self.annee_universitaire)
         
         self.full_clean()
-        
-        super().save(*args, **kwargs)
+
+        # Lignes à recalculer si les champs JSON changent (comparaison sans requête)
+        update_fields = kwargs.get('update_fields')
+        synchroniser = (
+            (update_fields is None or {'demandes', 'annee_universitaire'} & set(update_fields))
+            and (self.has_changed('demandes') or self.has_changed('annee_universitaire'))
+        )
+
+        creation = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if synchroniser:
+                self.synchroniser_lignes(creation)
+
+    def synchroniser_lignes(self, creation=False):
+        """Recrée les lignes (niveau, quantité) et les années à partir de demandes / annee_universitaire"""
+        if not creation:
+            self.lignes.all().delete()
+            self.annees.all().delete()
+        ReleveNoteLigne.objects.bulk_create(lignes_releve(self))
+        ReleveNoteAnnee.objects.bulk_create(annees_releve(self))
 
     def _normaliser_demandes(self, demandes):
         if not isinstance(demandes, list):
@@ -155,5 +188,76 @@ class ReleveNote(models.Model):
         
         return sorted(list(normalized))
 
+
+class ReleveNoteArchive(ReleveNoteBase):
+    """
+    Demande de relevé traitée depuis plus de ARCHIVE_APRES_ANNEES ans,
+    déplacée par manage.py archiver_demandes (même identifiant qu'à l'origine)
+    """
+    id = models.BigIntegerField(primary_key=True)
+    etudiant = models.ForeignKey('api.Etudiant', on_delete=models.CASCADE, related_name='releves_archives')
+    date_demande = models.DateTimeField()
+    archive_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-date_demande']
+        verbose_name = "Relevé de notes archivé"
+        verbose_name_plural = "Relevés de notes archivés"
+        indexes = [
+            models.Index(fields=['statut', '-date_demande'], name='releve_arch_statut_date_idx'),
+            models.Index(fields=['-date_demande'], name='releve_arch_date_idx'),
+        ]
+
+
+def lignes_releve(releve):
+    """
+    Une ReleveNoteLigne par niveau demandé, quantité comprise une seule fois :
+    la somme des quantités reste égale à total_exemplaires().
+    """
+    return [
+        ReleveNoteLigne(releve=releve, niveau=demande['niveau'], quantite=demande['quantite'])
+        for demande in releve.demandes
+    ]
+
+
+def annees_releve(releve):
+    """Une ReleveNoteAnnee par année universitaire du relevé"""
+    return [ReleveNoteAnnee(releve=releve, annee=annee) for annee in releve.annee_universitaire]
+
+
+class ReleveNoteLigne(models.Model):
+    """
+    Forme normalisée de ReleveNote.demandes (une ligne par niveau),
+    maintenue par ReleveNote.save() : agrégats et filtres par niveau en SQL.
+    Les champs JSON restent la source affichée par l'API ; les relevés archivés
+    ne gardent que le JSON (lignes supprimées en cascade avec la demande courante).
+    """
+    releve = models.ForeignKey(ReleveNote, on_delete=models.CASCADE, related_name='lignes')
+    niveau = models.CharField(max_length=5, choices=ReleveNote.NIVEAU_CHOICES)
+    quantite = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Ligne de relevé de notes"
+        verbose_name_plural = "Lignes de relevés de notes"
+        indexes = [
+            models.Index(fields=['niveau'], name='releve_ligne_niveau_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantite}×{self.niveau}"
+
+
+class ReleveNoteAnnee(models.Model):
+    """Forme normalisée de ReleveNote.annee_universitaire (une ligne par année), maintenue par save()"""
+    releve = models.ForeignKey(ReleveNote, on_delete=models.CASCADE, related_name='annees')
+    annee = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name = "Année de relevé de notes"
+        verbose_name_plural = "Années de relevés de notes"
+        indexes = [
+            models.Index(fields=['annee'], name='releve_annee_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.id_releve} - {self.etudiant} ({self.annees_display()})"
\ No newline at end of file
+        return str(self.annee)
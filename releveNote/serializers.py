@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import ReleveNote
 from api.models import Etudiant
+import logging
+
+logger = logging.getLogger(__name__)
 
 # 1.LISTE et DÉTAIL 
 class ReleveNoteListSerializer(serializers.ModelSerializer):
@@ -170,16 +173,15 @@ class ReleveNoteCreateSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        print("Création ReleveNote avec:")
-        print(f"  - Demandes: {validated_data.get('demandes')}")
-        print(f"  - Années: {validated_data.get('annee_universitaire')}")
-        
         instance = super().create(validated_data)
-        
-        print(f"  ReleveNote créé: {instance.id_releve}")
-        print(f"  - Demandes sauvegardées: {instance.demandes}")
-        print(f"  - Années sauvegardées: {instance.annee_universitaire}")
-        
+        logger.info(
+            "ReleveNote créé : %s", instance.id_releve,
+            extra={
+                'id_releve': instance.id_releve,
+                'demandes': instance.demandes,
+                'annee_universitaire': instance.annee_universitaire,
+            },
+        )
         return instance
 
     def to_representation(self, instance):
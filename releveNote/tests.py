@@ -1,3 +1,214 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from gestion_papier_scolarite.utils import admin_utils
+from gestion_papier_scolarite.utils.factories import creer_etudiants, creer_releves
+from gestion_papier_scolarite.utils.testing import RequetesBorneesTestCase
+
+from .models import ReleveNote
+
+
+class ReleveNoteRequetesTests(RequetesBorneesTestCase):
+
+    def peupler(self, nombre):
+        creer_releves(self.etudiants, nombre)
+
+    def peupler_etudiant(self, nombre):
+        creer_releves([self.etudiant], nombre)
+
+    def nouvelle_demande(self):
+        return {'pk': creer_releves([self.etudiant], 1, statut='en_attente')[0].pk}
+
+    # ---------- Étudiant ----------
+    def test_creer(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(
+            10,
+            lambda: self.client.post(
+                '/api/relevenote/creer/',
+                {'demandes': [{'niveau': 'L1', 'quantite': 2}], 'annee_universitaire': [2023, 2024]},
+                format='json',
+            ),
+            self.peupler_etudiant,
+            statuts=(201,),
+        )
+
+    def test_mes_demandes(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(3, lambda: self.client.get('/api/relevenote/mes-demandes/'), self.peupler_etudiant)
+
+    def test_detail(self):
+        self.connecter_etudiant()
+        self.assertRequetesBornees(
+            1,
+            lambda pk: self.client.get(f'/api/relevenote/detail/{pk}/'),
+            self.peupler_etudiant,
+            preparer=self.nouvelle_demande,
+        )
+
+    # ---------- Scolarité ----------
+    def test_liste(self):
+        self.connecter_scolarite()
+        for url in ('/api/relevenote/liste/', '/api/relevenote/liste/?statut=en_attente&niveau=L1'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(2, lambda: self.client.get(url), self.peupler)
+
+    def test_valider(self):
+        self.connecter_scolarite()
+        self.assertRequetesBornees(
+            8,
+            lambda pk: self.client.post(f'/api/relevenote/{pk}/valider/'),
+            self.peupler,
+            preparer=self.nouvelle_demande,
+        )
+
+    def test_rejeter(self):
+        self.connecter_scolarite()
+        self.assertRequetesBornees(
+            8,
+            lambda pk: self.client.post(f'/api/relevenote/{pk}/rejeter/', {'motif': "Incomplet"}, format='json'),
+            self.peupler,
+            preparer=self.nouvelle_demande,
+        )
+
+    def test_etudiant_par_numero(self):
+        self.connecter_scolarite()
+        self.assertRequetesBornees(
+            1,
+            lambda numero: self.client.get(f'/api/relevenote/etudiant-par-numero/{numero}/'),
+            self.peupler,
+            preparer=lambda: {'numero': creer_releves([self.etudiant], 1)[0].id_releve},
+        )
+
+    # ---------- Admin ----------
+    def test_admin_liste(self):
+        self.connecter_admin()
+        for url in ('/admin/releveNote/relevenote/', '/admin/releveNote/relevenote/?statut__exact=en_attente'):
+            with self.subTest(url=url):
+                self.assertRequetesBornees(6, lambda: self.client.get(url), self.peupler)
+
+    def selection_admin(self):
+        return {'pks': [demande.pk for demande in creer_releves(self.etudiants, 5, statut='en_attente')]}
+
+    def test_admin_action_statut(self):
+        self.connecter_admin()
+        self.assertRequetesBornees(
+            5,
+            lambda pks: self.client.post('/admin/releveNote/relevenote/', {'action': 'passer_pret', '_selected_action': pks}),
+            self.peupler,
+            preparer=self.selection_admin,
+            statuts=(302,),
+        )
+
+    def test_admin_action_notifie(self):
+        self.connecter_admin()
+        pks = self.selection_admin()['pks']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/releveNote/relevenote/', {'action': 'passer_en_cours', '_selected_action': pks})
+        self.assertEqual(ReleveNote.objects.filter(pk__in=pks, statut='en_cours').count(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(ADMIN_ACTION_MAX_SELECTION=4)
+    def test_admin_action_refusee_au_dela_du_maximum(self):
+        self.connecter_admin()
+        pks = self.selection_admin()['pks']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/releveNote/relevenote/', {'action': 'passer_en_cours', '_selected_action': pks})
+        self.assertFalse(ReleveNote.objects.filter(pk__in=pks).exclude(statut='en_attente').exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_admin_action_par_lots(self):
+        self.connecter_admin()
+        pks = self.selection_admin()['pks']
+        with mock.patch.object(admin_utils, 'TAILLE_LOT_STATUT', 2), CaptureQueriesContext(connection) as requetes:
+            self.client.post('/admin/releveNote/relevenote/', {'action': 'passer_en_cours', '_selected_action': pks})
+        mises_a_jour = [q['sql'] for q in requetes.captured_queries if q['sql'].startswith('UPDATE "releveNote_relevenote"')]
+        self.assertEqual(len(mises_a_jour), 3)
+        self.assertEqual(ReleveNote.objects.filter(pk__in=pks, statut='en_cours').count(), 5)
+
+
+# ====================== LIGNES NORMALISÉES ======================
+class LignesReleveTests(RequetesBorneesTestCase):
+
+    def creer(self, demandes, annees):
+        return ReleveNote.objects.create(etudiant=self.etudiant, demandes=demandes, annee_universitaire=annees)
+
+    def contenu(self, releve):
+        return (
+            sorted(releve.lignes.values_list('niveau', 'quantite')),
+            sorted(releve.annees.values_list('annee', flat=True)),
+        )
+
+    def test_creation(self):
+        releve = self.creer([{'niveau': 'l3', 'quantite': 2}, {'niveau': 'M1', 'quantite': 1}], [2023, "2022"])
+        self.assertEqual(self.contenu(releve), ([('L3', 2), ('M1', 1)], [2022, 2023]))
+
+    def test_modification(self):
+        releve = self.creer([{'niveau': 'L1', 'quantite': 1}], [2021])
+        releve.demandes = [{'niveau': 'L2', 'quantite': 3}]
+        releve.annee_universitaire = [2022, 2023]
+        releve.save()
+        self.assertEqual(self.contenu(releve), ([('L2', 3)], [2022, 2023]))
+
+    def test_statut_seul(self):
+        releve = self.creer([{'niveau': 'L1', 'quantite': 1}], [2021])
+        releve.statut = 'en_cours'
+        # UPDATE du statut uniquement : lignes ni supprimées ni recréées
+        with CaptureQueriesContext(connection) as requetes:
+            releve.save()
+        self.assertFalse([
+            requete for requete in requetes
+            if 'relevenoteligne' in requete['sql'].lower() or 'relevenoteannee' in requete['sql'].lower()
+        ])
+        self.assertEqual(self.contenu(releve), ([('L1', 1)], [2021]))
+
+    def test_statistiques(self):
+        self.creer([{'niveau': 'L3', 'quantite': 2}], [2022, 2023])
+        self.creer([{'niveau': 'L3', 'quantite': 1}, {'niveau': 'M1', 'quantite': 4}], [2023])
+        self.connecter_scolarite()
+        stats = self.client.get('/api/scolarite/statistiques/').data['statistiques']
+        self.assertEqual(stats['releves_par_niveau'], {'L3': 3, 'M1': 4})
+        self.assertEqual(
+            sum(stats['releves_par_niveau'].values()),
+            sum(releve.total_exemplaires() for releve in ReleveNote.objects.all()),
+        )
+        self.assertEqual(stats['releves_par_annee'], {'2022': 2, '2023': 7})
+
+
+class MigrationLignesReleveTests(TransactionTestCase):
+    """0003 remplit les lignes des relevés existants, 0006 les ramène à une ligne par niveau"""
+
+    def migrer(self, cible):
+        executor = MigrationExecutor(connection)
+        executor.migrate([cible])
+        executor.loader.build_graph()
+        return executor.loader.project_state(cible).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_remplissage(self):
+        apps = self.migrer(('releveNote', '0002_releve_note_ligne'))
+        etudiant = creer_etudiants(1)[0]
+        ReleveNote = apps.get_model('releveNote', 'ReleveNote')
+        releve = ReleveNote.objects.create(
+            etudiant_id=etudiant.pk, id_releve="R-0001",
+            demandes=[{'niveau': 'l3', 'quantite': 2}, {'niveau': 'M1'}],
+            annee_universitaire=[2022, "2023", "x"],
+        )
+
+        apps = self.migrer(('releveNote', '0003_remplir_releve_note_ligne'))
+        lignes = apps.get_model('releveNote', 'ReleveNoteLigne').objects.filter(releve_id=releve.pk)
+        self.assertEqual(sorted(lignes.values_list('niveau', 'annee', 'quantite')), [('L3', 2022, 2), ('L3', 2023, 2)])
+
+        apps = self.migrer(('releveNote', '0006_lignes_par_niveau_annees'))
+        lignes = apps.get_model('releveNote', 'ReleveNoteLigne').objects.filter(releve_id=releve.pk)
+        annees = apps.get_model('releveNote', 'ReleveNoteAnnee').objects.filter(releve_id=releve.pk)
+        self.assertEqual(list(lignes.values_list('niveau', 'quantite')), [('L3', 2)])
+        self.assertEqual(sorted(annees.values_list('annee', flat=True)), [2022, 2023])
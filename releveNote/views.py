@@ -10,8 +10,11 @@ from django.utils.html import strip_tags
 from django.conf import settings
 from django.db import transaction
 
-from api.models import Etudiant
-from .models import ReleveNote
+from api.permissions import IsEtudiantOrScolarite, filtrer_demandes_accessibles
+from gestion_papier_scolarite.utils.filters import filtrer
+from .filters import ReleveNoteFilterSet
+from gestion_papier_scolarite.utils.archive import avec_archives
+from .models import ReleveNote, ReleveNoteArchive
 from .serializers import ReleveNoteCreateSerializer, ReleveNoteListSerializer
 import logging
 
@@ -24,9 +27,8 @@ class CreerDemandeReleveView(APIView):
         if request.user.role != 'etudiant':
             return Response({"erreur": "Seuls les étudiants peuvent créer une demande."}, status=403)
 
-        try:
-            etudiant = Etudiant.objects.get(user=request.user)
-        except Etudiant.DoesNotExist:
+        etudiant = request.etudiant
+        if not etudiant:
             return Response({"erreur": "Profil étudiant manquant."}, status=403)
 
         data = request.data.copy()
@@ -56,12 +58,16 @@ class MesDemandesView(APIView):
         if request.user.role != 'etudiant':
             return Response({"erreur": "Accès réservé aux étudiants."}, status=403)
 
-        try:
-            etudiant = Etudiant.objects.get(user=request.user)
-        except Etudiant.DoesNotExist:
+        etudiant = request.etudiant
+        if not etudiant:
             return Response({"erreur": "Profil étudiant manquant."}, status=403)
 
-        demandes = ReleveNote.objects.filter(etudiant=etudiant).order_by('-date_demande')
+        demandes, erreurs = filtrer(
+            ReleveNoteFilterSet, request,
+            ReleveNote.objects.select_related('etudiant__user').filter(etudiant=etudiant).order_by('-date_demande')
+        )
+        if erreurs:
+            return Response({"erreur": "Filtres invalides.", "details": erreurs}, status=400)
         serializer = ReleveNoteListSerializer(demandes, many=True)
         return Response({
             "total": demandes.count(),
@@ -72,12 +78,21 @@ class MesDemandesView(APIView):
 #Special scolarité: lister toutes les demandes
 class ListeDemandesScolariteView(APIView):
     permission_classes = [IsAuthenticated]
+    lecture_replica = True
 
     def get(self, request):
         if request.user.role != 'scolarite':
             return Response({"erreur": "Réservé à la scolarité."}, status=403)
 
-        demandes = ReleveNote.objects.select_related('etudiant__user').order_by('-date_demande')
+        # ?archive=1 : demandes archivées
+        modele = ReleveNoteArchive if avec_archives(request) else ReleveNote
+        demandes, erreurs = filtrer(
+            ReleveNoteFilterSet, request,
+            modele.objects.select_related('etudiant__user').order_by('-date_demande')
+        )
+        if erreurs:
+            return Response({"erreur": "Filtres invalides.", "details": erreurs}, status=400)
+
         serializer = ReleveNoteListSerializer(demandes, many=True)
         return Response({
             "total": demandes.count(),
@@ -88,22 +103,14 @@ class ListeDemandesScolariteView(APIView):
 
 # 4.DÉTAIL D'UNE DEMANDE
 class DetailDemandeView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsEtudiantOrScolarite]
 
     def get(self, request, pk):
-        demande = get_object_or_404(ReleveNote, pk=pk)
-
-        if request.user.role == 'etudiant':
-            try:
-                etudiant = Etudiant.objects.get(user=request.user)
-                if demande.etudiant != etudiant:
-                    return Response({"erreur": "Accès refusé."}, status=403)
-            except Etudiant.DoesNotExist:
-                return Response({"erreur": "Profil étudiant manquant."}, status=403)
-
-        elif request.user.role != 'scolarite':
-            return Response({"erreur": "Accès refusé."}, status=403)
-
+        # Propriété vérifiée dans la requête SQL (etudiant__user=request.user pour un étudiant)
+        demande = get_object_or_404(
+            filtrer_demandes_accessibles(request, ReleveNote.objects.select_related('etudiant__user')),
+            pk=pk
+        )
         serializer = ReleveNoteListSerializer(demande)
         return Response(serializer.data)
 